@@ -0,0 +1,57 @@
+"""
+Benchmark the MaterialX node creation of the TexToMtlX tool, prototype copy against node by node creation
+Needs to run inside hython
+
+Usage:
+    hython benchmarks/ls_bench_mtlx_nodes.py --materials 500
+"""
+
+import argparse
+
+import hou
+
+from ls_bench_utils import Timer, create_texture_list, print_speedup, print_timing
+from tools import ls_tex_to_mtlx
+
+def build_materials(texture_list, use_prototype):
+    """
+    Build all the materials in a new material library
+    Return:
+        duration in seconds
+    """
+
+    library = hou.node("/stage").createNode("materiallibrary", "prototype" if use_prototype else "node_by_node")
+
+    common_data = {
+        "mtlTX" : False,
+        "path" : library.path(),
+        "node" : library,
+        "folder_path" : "/textures"
+    }
+
+    with Timer() as timer:
+        for material_name in texture_list:
+            material = ls_tex_to_mtlx.MtlxMaterial(material_name, **common_data, texture_list = texture_list,
+                                                   use_prototype = use_prototype)
+            material.create_materialx()
+
+        ls_tex_to_mtlx.MtlxMaterial.release_prototype()
+
+    return timer.duration
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark the MaterialX node creation")
+    parser.add_argument("--materials", type = int, default = 500)
+    args = parser.parse_args()
+
+    texture_list = create_texture_list(args.materials)
+
+    node_time = build_materials(texture_list, use_prototype = False)
+    prototype_time = build_materials(texture_list, use_prototype = True)
+
+    print_timing("Node by node creation", node_time, args.materials)
+    print_timing("Prototype copy", prototype_time, args.materials)
+    print_speedup(node_time, prototype_time)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the in place material update of the TexToMtlX tool against a full rebuild, after a few textures changed
+Needs to run inside hython
+
+Usage:
+    hython benchmarks/ls_bench_mtlx_sync.py --materials 300 --changes 2
+"""
+
+import argparse
+
+import hou
+
+from ls_bench_utils import Timer, create_texture_list, print_speedup, print_timing
+from tools import ls_tex_to_mtlx
+
+def run_materials(library, texture_list, sync):
+    """
+    Create or update all the materials of the texture list in the library
+    Return:
+        (duration in seconds, list of the material diffs when synced)
+    """
+
+    common_data = {
+        "mtlTX" : False,
+        "path" : library.path(),
+        "node" : library,
+        "folder_path" : "/textures"
+    }
+
+    diffs = []
+
+    with Timer() as timer:
+        for material_name in texture_list:
+            material = ls_tex_to_mtlx.MtlxMaterial(material_name, **common_data, texture_list = texture_list)
+
+            if sync:
+                diffs.append(material.sync_materialx())
+            else:
+                material.create_materialx()
+
+        ls_tex_to_mtlx.MtlxMaterial.release_prototype()
+
+    return timer.duration, diffs
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark the in place material update")
+    parser.add_argument("--materials", type = int, default = 300)
+    parser.add_argument("--changes", type = int, default = 2)
+    args = parser.parse_args()
+
+    texture_list = create_texture_list(args.materials)
+    library = hou.node("/stage").createNode("materiallibrary", "sync")
+
+    build_time, _ = run_materials(library, texture_list, sync = False)
+
+    # Move a few textures
+    for material_name in list(texture_list)[:args.changes]:
+        texture_list[material_name]["texturesRough"].file = f"{material_name}_roughness_v002.png"
+
+    # The update runs first, the rebuild doesn't depend on the existing materials
+    sync_time, diffs = run_materials(library, texture_list, sync = True)
+    rebuild_time, _ = run_materials(library, texture_list, sync = False)
+
+    updated = sum(diff["status"] == "updated" for diff in diffs)
+
+    print_timing("Initial build", build_time)
+    print_timing("Full rebuild", rebuild_time)
+    print_timing("In place update", sync_time, updated, unit = "updated material")
+    print_speedup(rebuild_time, sync_time)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark the texture channel classifier of the TexToMtlX tool against the previous nested substring loops
+
+Usage:
+    python benchmarks/ls_bench_texture_classifier.py --names 1000000
+"""
+
+import argparse
+import random
+
+from ls_bench_utils import Timer, print_speedup
+from modules import ls_texture_index
+
+# Texture type list used by get_texture_details before the classifier
+LEGACY_TEXTURE_TYPE = [
+    "diffuse", "diff", "albedo", "alb", "base", "col", "color", "basecolor",
+    "metallic", "metalness", "metal", "mtl", "met",
+    "specularity", "specular", "spec", "spc",
+    "roughness", "rough", "rgh",
+    "glossiness", "glossy", "gloss", "translucency",
+    "transmission", "transparency", "trans",
+    "emission", "emissive", "emit", "emm", "alpha", "opacity", "opac",
+    "ao", "ambient_occlusion", "occlusion", "cavity"
+    "bump", "bmp", "height", "displacement", "displace", "disp", "dsp", "heightmap", "user", "mask"
+    "normal", "nor", "nr", "nrml", "norm"
+]
+
+def generate_file_names(count, seed = 0):
+    """
+    Generate texture file names using every alias of the alias table
+    """
+
+    generator = random.Random(seed)
+    aliases = [alias for channel in ls_texture_index.TEXTURE_ALIASES.values() for alias in channel]
+    suffixes = ["", "_4K", "_1001", "_2K_1012"]
+    extensions = [".png", ".exr", ".tif", ".jpg"]
+
+    return [f"mat{index}_{generator.choice(aliases)}{generator.choice(suffixes)}{generator.choice(extensions)}"
+            for index in range(count)]
+
+def legacy_classify(file_names):
+    """
+    Reproduce the previous texture type search of get_texture_details
+    """
+
+    for file in file_names:
+        split_text = file.split("_")
+
+        for tex_type in LEGACY_TEXTURE_TYPE:
+            for tex in split_text[1:]:
+                if tex_type in tex.lower():
+                    break
+
+def classify(file_names):
+    """
+    Classify every file name with the compiled classifier
+    """
+
+    classify_texture = ls_texture_index.classify_texture
+
+    for file in file_names:
+        classify_texture(file)
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark the texture channel classifier")
+    parser.add_argument("--names", type = int, default = 1000000)
+    args = parser.parse_args()
+
+    file_names = generate_file_names(args.names)
+
+    timings = {}
+    for label, function in (("Legacy nested loops", legacy_classify), ("Compiled classifier", classify)):
+        with Timer() as timer:
+            function(file_names)
+
+        timings[label] = timer.duration
+
+    for label, duration in timings.items():
+        print(f"{label:<22}: {duration:.3f} s ({args.names / duration:,.0f} names/s)")
+
+    print_speedup(timings["Legacy nested loops"], timings["Compiled classifier"])
+
+if __name__ == "__main__":
+    main()
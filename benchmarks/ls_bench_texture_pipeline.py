@@ -0,0 +1,262 @@
+"""
+Benchmark suite of the TexToMtlX texture pipeline outside of Houdini
+A synthetic texture library is generated, then every stage of the pipeline is timed :
+folder scan, channel classification, material sorting, index building with and without the cache,
+TX conversion scheduling against a fake imaketx, and the texture paths of the material nodes when run inside hython
+The results are written as JSON, a previous result file can be given to compare the stages
+
+Usage:
+    python benchmarks/ls_bench_texture_pipeline.py --materials 2000 --channels 6 --udims 4 --depth 2 --output results.json
+    python benchmarks/ls_bench_texture_pipeline.py --latency 0.05 --workers 8 --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from ls_bench_utils import CHANNELS, SCRIPTS_FOLDER, Timer, create_synthetic_library, time_call
+
+# Stages slower than the compared result by more than this ratio are reported as regressions
+REGRESSION_RATIO = 1.1
+
+FAKE_IMAKETX = '''import os, shutil, sys, time
+time.sleep(float(os.environ.get("LS_BENCH_LATENCY", "0")))
+shutil.copyfile(sys.argv[1], sys.argv[2])
+'''
+
+def create_fake_imaketx(folder):
+    """
+    Write a fake imaketx copying the source to the output after a delay, the delay comes from LS_BENCH_LATENCY
+    Return:
+        path of the executable
+    """
+
+    script_path = os.path.join(folder, "fake_imaketx.py")
+    with open(script_path, "w") as script_file:
+        script_file.write(FAKE_IMAKETX)
+
+    if os.name == "nt":
+        executable_path = os.path.join(folder, "fake_imaketx.bat")
+        with open(executable_path, "w") as executable_file:
+            executable_file.write(f'@"{sys.executable}" "{script_path}" %*\n')
+    else:
+        executable_path = os.path.join(folder, "fake_imaketx")
+        with open(executable_path, "w") as executable_file:
+            executable_file.write(f"#!{sys.executable}\n" + FAKE_IMAKETX)
+        os.chmod(executable_path, 0o755)
+
+    return executable_path
+
+def stage_time(function, *args, repeat = 3, setup = None):
+    """
+    Return the best time of several calls, rounded for the JSON results, see ls_bench_utils.time_call
+    """
+
+    return round(time_call(function, *args, repeat = repeat, setup = setup), 4)
+
+def git_revision():
+    """
+    Get the commit of the benchmarked tree, None outside of a git checkout
+    """
+
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd = SCRIPTS_FOLDER,
+                                capture_output = True, text = True)
+    except OSError:
+        return None
+
+    return result.stdout.strip() or None
+
+def run_suite(args, work_folder):
+    """
+    Generate the library and time every stage
+    Return:
+        dictionnary {stage : seconds or stage details}
+    """
+
+    root = os.path.join(work_folder, "library", "")
+    file_count = create_synthetic_library(root, args.materials, args.channels, args.udims, args.depth, args.image_size)
+
+    # The modules read their cache folders when they are imported
+    os.environ["LS_TEXTURE_CACHE"] = os.path.join(work_folder, "cache")
+    os.environ.pop("LS_TX_CACHE_DIR", None)
+
+    from modules import ls_texture_index
+    from modules import ls_tx_converter
+
+    results = {"files" : file_count}
+
+    textures, _, _ = ls_texture_index.scan_texture_folder(root)
+    file_names = [file for _, file in textures]
+    classifier = ls_texture_index.compile_classifier(ls_texture_index.TEXTURE_ALIASES)
+
+    def classify():
+        for file_name in file_names:
+            ls_texture_index.classify_texture(file_name, classifier)
+
+    def clear_cache():
+        shutil.rmtree(ls_texture_index.CACHE_DIR, ignore_errors = True)
+
+    results["scan"] = stage_time(ls_texture_index.scan_texture_folder, root, repeat = args.repeat)
+    results["classify"] = stage_time(classify, repeat = args.repeat)
+    results["sort"] = stage_time(ls_texture_index.sort_textures, textures, repeat = args.repeat)
+    results["index_cold"] = stage_time(ls_texture_index.build_texture_index, root, True, True,
+                                       repeat = args.repeat, setup = clear_cache)
+    results["index_cached"] = stage_time(ls_texture_index.build_texture_index, root, True, True, repeat = args.repeat)
+
+    materials = ls_texture_index.build_texture_index(root, probe = True)["materials"]
+
+    # Conversion scheduling, only a slice of the library so the fake imaketx latency doesn't dominate the suite
+    os.environ["LS_BENCH_LATENCY"] = str(args.latency)
+    imaketx_path = create_fake_imaketx(work_folder)
+    manifest_path = os.path.join(work_folder, "tx_manifest.json")
+    converted_materials = list(materials)[:args.tx_materials]
+
+    def schedule():
+        scheduler = ls_tx_converter.TxConversionScheduler(imaketx_path, max_workers = args.workers,
+                                                          manifest = ls_tx_converter.TxManifest(manifest_path),
+                                                          metrics_path = False, dedupe = args.dedupe)
+
+        for material_name in converted_materials:
+            material = materials[material_name]
+            texture_info = ls_texture_index.material_texture_info(root, material)
+
+            for udim in (False, True):
+                scheduler.add(ls_texture_index.material_texture_paths(root, material, udim = udim),
+                              material = material_name, texture_info = texture_info, dedupe = not udim)
+
+        return scheduler.run()
+
+    cold_summary = schedule()
+
+    with Timer() as warm_timer:
+        warm_summary = schedule()
+
+    # Time the fake imaketx needs with a perfect worker pool, the rest is the process start and scheduling overhead
+    ideal_time = cold_summary["converted"] * args.latency / args.workers
+
+    results["tx_schedule"] = {
+        "textures" : cold_summary["total"],
+        "duration" : cold_summary["duration"],
+        "ideal" : round(ideal_time, 4),
+        "overhead" : round(cold_summary["duration"] - ideal_time, 4),
+        "queue_wait" : cold_summary["queue_wait"],
+        "run_time" : cold_summary["run_time"],
+        "failed" : cold_summary["failed"]
+    }
+    results["tx_up_to_date"] = round(warm_timer.duration, 4)
+
+    if warm_summary["skipped"] != cold_summary["converted"]:
+        print(f"Warning : {warm_summary['skipped']} of {cold_summary['converted']} textures found up to date")
+
+    # Paths of the material nodes, needs hou and PySide2 to import the tool
+    try:
+        from tools import ls_tex_to_mtlx
+    except ImportError as e:
+        print(f"Skipping the material node paths : {str(e)}")
+        return results
+
+    def texture_paths():
+        for material_name, material in materials.items():
+            builder = ls_tex_to_mtlx.MtlxMaterial.__new__(ls_tex_to_mtlx.MtlxMaterial)
+            builder.material_to_create = material_name
+            builder.mtlTX = True
+            builder.folder_path = root
+            builder.preview_resolutions = None
+
+            for channel in material:
+                builder._get_texture_path(channel, material)
+
+    results["node_paths"] = stage_time(texture_paths, repeat = args.repeat)
+
+    return results
+
+def compare_results(results, baseline):
+    """
+    Print the ratio of each timed stage against a previous result
+    Return:
+        list of the stages slower than REGRESSION_RATIO
+    """
+
+    regressions = []
+
+    for stage, value in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+
+        # Stages with details are compared on their duration
+        if isinstance(value, dict):
+            value, previous = value.get("duration"), (previous or {}).get("duration")
+
+        if not isinstance(value, float) or not previous:
+            continue
+
+        ratio = value / previous
+        flag = ""
+
+        if ratio > REGRESSION_RATIO:
+            regressions.append(stage)
+            flag = "  <- regression"
+
+        print(f"{stage:<16}: {previous:.4f} s -> {value:.4f} s ({ratio:.2f}x){flag}")
+
+    return regressions
+
+def parse_args(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the texture pipeline on a synthetic library")
+    parser.add_argument("--materials", type = int, default = 1000)
+    parser.add_argument("--channels", type = int, default = 6, choices = range(1, len(CHANNELS) + 1))
+    parser.add_argument("--udims", type = int, default = 0, help = "UDIM tiles per channel, 0 for single textures")
+    parser.add_argument("--depth", type = int, default = 1, help = "nested folders above the asset folders")
+    parser.add_argument("--image-size", type = int, default = 4096, help = "resolution written in the texture headers")
+    parser.add_argument("--tx-materials", type = int, default = 50, help = "materials sent to the TX conversion")
+    parser.add_argument("--latency", type = float, default = 0.02, help = "seconds the fake imaketx takes per texture")
+    parser.add_argument("--workers", type = int, default = 4)
+    parser.add_argument("--dedupe", action = "store_true")
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("--output", help = "JSON file receiving the results")
+    parser.add_argument("--compare", help = "previous JSON result to compare with")
+
+    return parser.parse_args(argv)
+
+def main(argv = None):
+    args = parse_args(argv)
+
+    work_folder = tempfile.mkdtemp(prefix = "ls_bench_pipeline_")
+
+    try:
+        stages = run_suite(args, work_folder)
+    finally:
+        shutil.rmtree(work_folder, ignore_errors = True)
+
+    results = {
+        "revision" : git_revision(),
+        "time" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python" : platform.python_version(),
+        "platform" : platform.platform(),
+        "cpu_count" : os.cpu_count(),
+        "parameters" : {key : value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "stages" : stages
+    }
+
+    print(json.dumps(results, indent = 2))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent = 2)
+
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            regressions = compare_results(results, json.load(baseline_file))
+
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
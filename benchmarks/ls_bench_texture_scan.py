@@ -0,0 +1,87 @@
+"""
+Benchmark the texture folder scan of the TexToMtlX tool on a synthetic texture library
+
+Usage:
+    python benchmarks/ls_bench_texture_scan.py --files 100000 --folders 200
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from ls_bench_utils import create_synthetic_library, print_speedup, print_timing, time_call
+from modules import ls_texture_index
+
+# Channels of each synthetic material
+CHANNEL_COUNT = 8
+
+def legacy_scan(path):
+    """
+    Reproduce the previous os.walk scan of TxToMtlx.folder_with_texture and get_texture_details
+    """
+
+    valid_files = []
+    folders = []
+
+    # folder_with_texture
+    for root, dir, files in os.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            if os.path.isfile(file_path) and file.lower().endswith(ls_texture_index.TEXTURE_EXT) and "_" in file:
+                break
+
+    # get_texture_details
+    for root, dir, files in os.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+
+            is_file = os.path.isfile(file_path)
+            valid_extension = file.lower().endswith(ls_texture_index.TEXTURE_EXT)
+
+            if is_file and valid_extension and "_" in file:
+                folders.append(file_path.split(path)[1].split(file)[0])
+                valid_files.append(file)
+
+    return valid_files
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark the texture folder scan")
+    parser.add_argument("--files", type = int, default = 100000)
+    parser.add_argument("--folders", type = int, default = 200)
+    parser.add_argument("--root", default = None, help = "Existing texture library to scan instead of a synthetic one")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix = "ls_bench_textures_")
+
+    try:
+        if not args.root:
+            material_count = max(1, args.files // CHANNEL_COUNT)
+            create_synthetic_library(root, material_count, CHANNEL_COUNT,
+                                     materials_per_folder = max(1, material_count // args.folders))
+
+        legacy_time = time_call(legacy_scan, root)
+        scan_time = time_call(ls_texture_index.scan_texture_folder, root)
+
+        # Keep the index cache away from the user cache, every repeat of the cold index scans the folder
+        with tempfile.TemporaryDirectory(prefix = "ls_bench_cache_") as cache_dir:
+            ls_texture_index.CACHE_DIR = cache_dir
+
+            cold_time = time_call(ls_texture_index.build_texture_index, root, False)
+
+            # The first build writes the cache, the timed ones only read it
+            ls_texture_index.build_texture_index(root)
+            warm_time = time_call(ls_texture_index.build_texture_index, root)
+
+        print_timing("Legacy os.walk scan", legacy_time)
+        print_timing("Single scandir scan", scan_time)
+        print_timing("Texture index (cold)", cold_time)
+        print_timing("Texture index (warm)", warm_time)
+        print_speedup(legacy_time, scan_time, label = "Scan speed up")
+
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors = True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark the material creation of the asset builder, USD layer authoring against the Material Library LOP
+The node based timing includes the cook of the Material Library stage
+Needs to run inside hython
+
+Usage:
+    hython benchmarks/ls_bench_usd_materials.py --materials 500
+"""
+
+import argparse
+import os
+import tempfile
+
+import hou
+
+from ls_bench_utils import Timer, create_texture_list, print_speedup, print_timing
+from modules import ls_usd_material_writer
+from tools import ls_tex_to_mtlx
+
+def build_material_library(texture_list):
+    """
+    Build all the materials in a Material Library LOP and cook its stage
+    Return:
+        duration in seconds
+    """
+
+    library = hou.node("/stage").createNode("materiallibrary", "node_based")
+    library.parm("matpathprefix").set("/ASSET/mtl/")
+
+    common_data = {
+        "mtlTX" : False,
+        "path" : library.path(),
+        "node" : library,
+        "folder_path" : "/textures"
+    }
+
+    with Timer() as timer:
+        for material_name in texture_list:
+            material = ls_tex_to_mtlx.MtlxMaterial(material_name, **common_data, texture_list = texture_list)
+            material.create_materialx()
+
+        ls_tex_to_mtlx.MtlxMaterial.release_prototype()
+        library.stage()
+
+    return timer.duration
+
+def build_usd_layer(texture_list, layer_path):
+    """
+    Author all the materials in a USD layer and load it with a sublayer LOP
+    Return:
+        (authoring duration, duration including the sublayer cook) in seconds
+    """
+
+    with Timer() as layer_timer:
+        with Timer() as author_timer:
+            ls_usd_material_writer.write_material_layer(layer_path, texture_list, "/textures", material_root = "/ASSET/mtl")
+
+        sublayer = hou.node("/stage").createNode("sublayer", "usd_layer")
+        sublayer.parm("filepath1").set(layer_path)
+        sublayer.stage()
+
+    return author_timer.duration, layer_timer.duration
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark the USD material authoring")
+    parser.add_argument("--materials", type = int, default = 500)
+    args = parser.parse_args()
+
+    texture_list = create_texture_list(args.materials)
+
+    node_time = build_material_library(texture_list)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        author_time, layer_time = build_usd_layer(texture_list, os.path.join(temp_dir, "materials.usda"))
+
+    print_timing("Material Library LOP", node_time, args.materials)
+    print_timing("USD layer authoring", author_time, args.materials)
+    print_timing("USD layer with cook", layer_time, args.materials)
+    print_speedup(node_time, layer_time)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Helpers shared by the benchmarks : the import path of the tools, the synthetic texture libraries and the timers
+Importing this module adds scripts/python to the import path, the benchmarks import it before the tool modules
+"""
+
+import os
+import struct
+import sys
+import time
+import zlib
+
+SCRIPTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "python")
+
+if SCRIPTS_FOLDER not in sys.path:
+    sys.path.insert(0, SCRIPTS_FOLDER)
+
+# Channel names written in the synthetic file names, one alias of a different texture channel each
+CHANNELS = ["diffuse", "roughness", "metallic", "normal", "displacement", "ao", "opacity", "emission", "specular", "sss"]
+
+# Channels of the in memory texture lists, see create_texture_list
+TEXTURE_LIST_CHANNELS = {
+    "texturesColor" : "diffuse",
+    "texturesRough" : "roughness",
+    "texturesMetal" : "metallic",
+    "texturesNormal" : "normal",
+    "texturesDisp" : "displacement",
+    "texturesAO" : "ao"
+}
+
+def png_header(width, height):
+    """
+    Build the smallest PNG file the texture probe can read, the pixels are never decoded
+    """
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr
+            + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr)))
+
+def create_synthetic_library(root, material_count, channel_count, udim_count = 0, depth = 0, image_size = 4096,
+                             materials_per_folder = 10):
+    """
+    Create a texture library made of PNG headers
+    Args:
+        root = folder where the library is created
+        material_count = amount of materials
+        channel_count = amount of channels per material, taken from CHANNELS
+        udim_count = amount of UDIM tiles per channel, 0 for single textures
+        depth = amount of nested folders between the root and the textures
+        image_size = width and height written in the headers
+        materials_per_folder = amount of materials sharing an asset folder
+    Return:
+        amount of texture files created
+    """
+
+    header = png_header(image_size, image_size)
+    tiles = [1001 + tile for tile in range(udim_count)] or [None]
+    file_count = 0
+
+    for material_index in range(material_count):
+        folder_index = material_index // materials_per_folder
+        folder = os.path.join(root, *[f"level{level}_{folder_index % 7}" for level in range(depth)],
+                              f"asset_{folder_index:05d}")
+        os.makedirs(folder, exist_ok = True)
+
+        for channel in CHANNELS[:channel_count]:
+            for tile in tiles:
+                suffix = f"_{tile}" if tile else ""
+
+                with open(os.path.join(folder, f"mat{material_index}_{channel}_4K{suffix}.png"), "wb") as texture_file:
+                    texture_file.write(header)
+
+                file_count += 1
+
+    return file_count
+
+def create_texture_list(material_count):
+    """
+    Create a texture index with the same layout as ls_texture_index.sort_textures, without any file on disk
+    """
+
+    from modules import ls_texture_index
+
+    texture_list = {}
+
+    for index in range(material_count):
+        material_name = f"mat{index:05d}"
+        channels = {channel : ls_texture_index.TextureChannel(f"{material_name}_{alias}.png")
+                    for channel, alias in TEXTURE_LIST_CHANNELS.items()}
+
+        texture_list[material_name] = ls_texture_index.TextureMaterial("/", channels)
+
+    return texture_list
+
+class Timer:
+    """
+    Time the block of a with statement, the duration in seconds is set when the block ends
+    E.g : with Timer() as timer: ... then timer.duration
+    """
+
+    def __enter__(self):
+        self.duration = None
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self.start_time
+
+def time_call(function, *args, repeat = 3, setup = None):
+    """
+    Return the best time of several calls
+    Args:
+        setup = called before each call, not timed
+    """
+
+    timings = []
+
+    for _ in range(repeat):
+        if setup:
+            setup()
+
+        with Timer() as timer:
+            function(*args)
+
+        timings.append(timer.duration)
+
+    return min(timings)
+
+def print_timing(label, duration, count = None, unit = "material"):
+    """
+    Print the duration of a benchmarked stage, with the time per item when the amount of items is given
+    """
+
+    line = f"{label:<22}: {duration:.3f} s"
+
+    if count:
+        line += f" ({duration / count * 1000:.1f} ms per {unit})"
+
+    print(line)
+
+def print_speedup(slow_duration, fast_duration, label = "Speed up"):
+    """
+    Print the ratio between the previous implementation and the new one
+    """
+
+    print(f"{label:<22}: {slow_duration / fast_duration:.1f}x")
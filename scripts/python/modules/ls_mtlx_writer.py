@@ -0,0 +1,285 @@
+import os
+import xml.etree.ElementTree as ET
+
+from modules import ls_texture_probe
+from modules import ls_tx_cache
+
+MTLX_VERSION = "1.38"
+
+# Standard surface inputs driven by a texture channel : (input name, input type, image type)
+SURFACE_INPUTS = {
+    "texturesMetal" : ("metalness", "float", "float"),
+    "texturesSpecular" : ("specular", "float", "float"),
+    "texturesRough" : ("specular_roughness", "float", "float"),
+    "texturesGloss" : ("specular_roughness", "float", "float"),
+    "texturesTrans" : ("transmission", "float", "float"),
+    "texturesEmm" : ("emission", "float", "float"),
+    "texturesAlpha" : ("opacity", "color3", "float"),
+    "texturesSSS" : ("subsurface_color", "color3", "color3")
+}
+
+def material_output_name(material_name, material):
+    """
+    Get the name of the created material, the texture size is added when it is known
+    Args:
+        material_name = name of the material in the texture index
+        material = material entry of the texture index
+    Return:
+        name of the material
+    """
+
+    if material.size:
+        return f"{material_name}_{material.size}"
+
+    return material_name
+
+def texture_file_path(root, material, channel, use_tx = False):
+    """
+    Get the file path of a channel as written in the document, UDIM textures keep the <UDIM> token
+    Args:
+        root = the texture folder the index was built from
+        material = material entry of the texture index
+        channel = texture channel, E.g : texturesColor
+        use_tx = point at the .tx files instead of the source textures
+    Return:
+        path of the texture
+    """
+
+    texture_path = f"{root}{material.folder}{material[channel].file}"
+
+    if use_tx:
+        # Texture identical to another one, the .tx file is shared
+        if material[channel].tx_path:
+            return material[channel].tx_path
+
+        return ls_tx_cache.tx_output_path(texture_path)
+
+    return texture_path
+
+class MaterialGraph:
+    """
+    Shading network of a material, independent of the format it is written to
+    Each node is a dictionnary : {
+        "name" : unique name in the material,
+        "category" : MaterialX node category, E.g : image,
+        "type" : output type,
+        "nodedef" : MaterialX node definition, E.g : ND_image_color3,
+        "inputs" : list of (input name, input type, {"value" : value} or {"nodename" : node name}, colorspace or None)
+    }
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes = []
+        self.surface = None
+        self.displacement = None
+
+    def add_node(self, category, name, node_type, inputs = None, nodedef = None):
+        """
+        Add a node to the graph
+        Args:
+            category = MaterialX node category, E.g : image
+            name = unique name of the node
+            node_type = output type of the node
+            inputs = list of inputs, see the class description
+            nodedef = node definition, ND_<category>_<type> if not given
+        Return:
+            name of the node
+        """
+
+        self.nodes.append({
+            "name" : name,
+            "category" : category,
+            "type" : node_type,
+            "nodedef" : nodedef or f"ND_{category}_{node_type}",
+            "inputs" : inputs or []
+        })
+
+        return name
+
+def material_graph(material_name, material, root, use_tx = False):
+    """
+    Build the standard surface network of a material entry, wired the same way as the node based path
+    Args:
+        material_name = name of the material in the texture index
+        material = material entry of the texture index
+        root = the texture folder the index was built from
+        use_tx = point at the .tx files instead of the source textures
+    Return:
+        MaterialGraph
+    """
+
+    name = material_output_name(material_name, material)
+    graph = MaterialGraph(name)
+
+    # Image nodes, tiled image for the textures without UDIM like the node based path does
+    category = "image" if material.udim else "tiledimage"
+
+    def image(channel, image_type):
+        colorspace = ls_texture_probe.texture_colorspace(channel, material[channel].info)
+        colorspace = None if colorspace == "raw" else colorspace
+        file_path = texture_file_path(root, material, channel, use_tx)
+
+        return graph.add_node(category, f"{name}_{channel.replace('textures', '').lower()}", image_type, [
+            ("file", "filename", {"value" : file_path}, colorspace)
+        ])
+
+    def connect(input_name, input_type, node_name):
+        return (input_name, input_type, {"nodename" : node_name}, None)
+
+    surface_inputs = []
+
+    # Base color, multiplied by the ambient occlusion when there is one
+    if "texturesColor" in material:
+        color_node = image("texturesColor", "color3")
+
+        if "texturesAO" in material:
+            ao_node = image("texturesAO", "float")
+            color_node = graph.add_node("multiply", f"{name}_mtlxMultiply", "color3", [
+                connect("in1", "color3", color_node),
+                connect("in2", "float", ao_node)
+            ], nodedef = "ND_multiply_color3FA")
+
+        surface_inputs.append(connect("base_color", "color3", color_node))
+
+    # Inputs driven directly by a texture
+    for channel, (input_name, input_type, image_type) in SURFACE_INPUTS.items():
+        if channel not in material:
+            continue
+
+        texture_node = image(channel, image_type)
+
+        if input_type != image_type:
+            texture_node = graph.add_node("convert", f"{texture_node}_convert", input_type, [
+                connect("in", image_type, texture_node)
+            ], nodedef = f"ND_convert_{image_type}_{input_type}")
+
+        surface_inputs.append(connect(input_name, input_type, texture_node))
+
+        if channel == "texturesSSS":
+            surface_inputs.append(("subsurface", "float", {"value" : 1.0}, None))
+
+    # Normal and bump, the normal map is plugged in the bump node when there are both
+    normal_node = None
+
+    if "texturesNormal" in material:
+        normal_node = graph.add_node("normalmap", f"{name}_mtlxNormal", "vector3", [
+            connect("in", "vector3", image("texturesNormal", "vector3"))
+        ], nodedef = "ND_normalmap")
+
+    if "texturesBump" in material:
+        bump_inputs = [connect("height", "float", image("texturesBump", "float"))]
+
+        if normal_node:
+            bump_inputs.append(connect("normal", "vector3", normal_node))
+
+        normal_node = graph.add_node("bump", f"{name}_mtlxBump", "vector3", bump_inputs)
+
+    if normal_node:
+        surface_inputs.append(connect("normal", "vector3", normal_node))
+
+    graph.surface = graph.add_node("standard_surface", f"{name}_mtlxSurface", "surfaceshader", surface_inputs)
+
+    # Displacement
+    if "texturesDisp" in material:
+        graph.displacement = graph.add_node("displacement", f"{name}_mtlxDisplacement", "displacementshader", [
+            connect("displacement", "float", image("texturesDisp", "float")),
+            ("scale", "float", {"value" : 0.1}, None)
+        ], nodedef = "ND_displacement_float")
+
+    return graph
+
+def add_material(document, material_name, material, root, use_tx = False):
+    """
+    Add a standard surface material built from the textures of a material entry
+    Args:
+        document = materialx root element
+        material_name = name of the material in the texture index
+        material = material entry of the texture index
+        root = the texture folder the index was built from
+        use_tx = point at the .tx files instead of the source textures
+    Return:
+        name of the material added
+    """
+
+    graph = material_graph(material_name, material, root, use_tx)
+
+    for node in graph.nodes:
+        element = ET.SubElement(document, node["category"], name = node["name"], type = node["type"])
+
+        for input_name, input_type, source, colorspace in node["inputs"]:
+            attributes = {key : str(value) for key, value in source.items()}
+            if colorspace:
+                attributes["colorspace"] = colorspace
+
+            ET.SubElement(element, "input", name = input_name, type = input_type, **attributes)
+
+    material_element = ET.SubElement(document, "surfacematerial", name = graph.name, type = "material")
+    ET.SubElement(material_element, "input", name = "surfaceshader", type = "surfaceshader", nodename = graph.surface)
+
+    if graph.displacement:
+        ET.SubElement(material_element, "input", name = "displacementshader", type = "displacementshader", 
+                      nodename = graph.displacement)
+
+    return graph.name
+
+def create_document():
+    """
+    Create an empty MaterialX document
+    Return:
+        the materialx root element
+    """
+
+    return ET.Element("materialx", version = MTLX_VERSION)
+
+def write_document(document, file_path):
+    """
+    Write a MaterialX document to disk
+    Args:
+        document = the materialx root element
+        file_path = path of the .mtlx file
+    """
+
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok = True)
+
+    tree = ET.ElementTree(document)
+    ET.indent(tree, space = "  ")
+    tree.write(file_path, encoding = "utf-8", xml_declaration = True)
+
+def write_material_documents(texture_list, root, output_path, material_names = None, use_tx = False, single_file = False):
+    """
+    Write the materials of a texture index as MaterialX documents
+    Args:
+        texture_list = materials of the texture index
+        root = the texture folder the index was built from
+        output_path = folder receiving one .mtlx per material, or the .mtlx library file when single_file is True
+        material_names = materials to write, all of them if not given
+        use_tx = point at the .tx files instead of the source textures
+        single_file = write all the materials in one library file
+    Return:
+        list of the written .mtlx files
+    """
+
+    material_names = list(texture_list) if material_names is None else material_names
+    written = []
+
+    if single_file:
+        document = create_document()
+
+        for material_name in material_names:
+            add_material(document, material_name, texture_list[material_name], root, use_tx)
+
+        write_document(document, output_path)
+        written.append(output_path)
+
+        return written
+
+    for material_name in material_names:
+        document = create_document()
+        name = add_material(document, material_name, texture_list[material_name], root, use_tx)
+
+        file_path = os.path.join(output_path, f"{name}.mtlx")
+        write_document(document, file_path)
+        written.append(file_path)
+
+    return written
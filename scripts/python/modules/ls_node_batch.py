@@ -0,0 +1,28 @@
+import hou
+
+from contextlib import contextmanager
+
+@contextmanager
+def node_build_batch(label):
+    """
+    Group a node building tool run in a single undo block and pause the cooking and UI updates during the build
+    The update mode is restored when the build ends, even on error, the nodes are cooked once at that point
+    Can be nested, only the outer batch changes the update mode
+    Can also decorate a function : @ls_node_batch.node_build_batch("Batch Import")
+    Args:
+        label = name of the undo block, E.g : Batch Import
+    """
+
+    # Only the interactive session redraws and cooks on every change
+    previous_mode = hou.updateModeSetting() if hou.isUIAvailable() else None
+
+    with hou.undos.group(label):
+        if previous_mode is not None and previous_mode != hou.updateMode.Manual:
+            hou.setUpdateMode(hou.updateMode.Manual)
+
+        try:
+            yield
+
+        finally:
+            if previous_mode is not None and previous_mode != hou.updateMode.Manual:
+                hou.setUpdateMode(previous_mode)
@@ -0,0 +1,95 @@
+import os
+import hashlib
+
+# Bytes hashed at the start and at the end of a file for the partial hash
+PARTIAL_HASH_SIZE = 64 * 1024
+FULL_HASH_CHUNK = 1024 * 1024
+
+def partial_hash(file_path, file_size):
+    """
+    Hash the size, the first and the last bytes of a file
+    Two files with a different partial hash can't be identical, two files with the same one still need a full hash
+    Args:
+        file_path = full path of the file
+        file_size = size of the file in bytes
+    Return:
+        hex digest
+    """
+
+    digest = hashlib.blake2b(str(file_size).encode("ascii"), digest_size = 16)
+
+    with open(file_path, "rb") as file:
+        digest.update(file.read(PARTIAL_HASH_SIZE))
+
+        if file_size > PARTIAL_HASH_SIZE * 2:
+            file.seek(-PARTIAL_HASH_SIZE, os.SEEK_END)
+            digest.update(file.read(PARTIAL_HASH_SIZE))
+
+    return digest.hexdigest()
+
+def full_hash(file_path):
+    """
+    Hash the whole content of a file
+    Args:
+        file_path = full path of the file
+    Return:
+        hex digest
+    """
+
+    digest = hashlib.blake2b(digest_size = 32)
+
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda : file.read(FULL_HASH_CHUNK), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def _group_by(file_paths, key_function):
+    """
+    Group files by a key, the files whose key can't be computed are left out
+    Return:
+        list of the groups with more than one file
+    """
+
+    groups = {}
+
+    for file_path in file_paths:
+        try:
+            key = key_function(file_path)
+        except OSError:
+            continue
+
+        groups.setdefault(key, []).append(file_path)
+
+    return [group for group in groups.values() if len(group) > 1]
+
+def find_duplicate_files(file_paths, file_sizes = None):
+    """
+    Find the byte identical files of a list
+    Files are grouped by size first, then by partial hash, the full content is only hashed for the partial hash collisions
+    Args:
+        file_paths = list of full file paths
+        file_sizes = dictionnary {file path : size in bytes} already known, the missing sizes are read from disk
+    Return:
+        dictionnary {duplicated file path : path of the first identical file in the list}, the unique files are not listed
+    """
+
+    file_sizes = dict(file_sizes or {})
+    order = {file_path : index for index, file_path in enumerate(file_paths)}
+
+    def file_size(file_path):
+        if file_path not in file_sizes:
+            file_sizes[file_path] = os.stat(file_path).st_size
+        return file_sizes[file_path]
+
+    duplicates = {}
+
+    for size_group in _group_by(file_paths, file_size):
+        for partial_group in _group_by(size_group, lambda file_path : partial_hash(file_path, file_sizes[file_path])):
+            for identical_group in _group_by(partial_group, full_hash):
+                identical_group.sort(key = order.get)
+
+                for file_path in identical_group[1:]:
+                    duplicates[file_path] = identical_group[0]
+
+    return duplicates
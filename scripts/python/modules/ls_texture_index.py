@@ -0,0 +1,595 @@
+import os
+import re
+import sys
+import json
+import hashlib
+
+from array import array
+from collections.abc import Mapping
+from modules import ls_texture_probe
+
+# Texture related constant
+TEXTURE_EXT = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".exr", ".tga")
+
+# Single alias table : every texture channel with the names it can be found with in a file name
+TEXTURE_ALIASES = {
+    "texturesColor" : ("diffuse", "diff", "albedo", "alb", "base", "col", "color", "basecolor"),
+    "texturesMetal" : ("metallic", "metalness", "metal", "mtl", "met"),
+    "texturesSpecular" : ("specularity", "specular", "spec", "spc"),
+    "texturesRough" : ("roughness", "rough", "rgh"),
+    "texturesGloss" : ("glossiness", "glossy", "gloss"),
+    "texturesTrans" : ("transmission", "transparency", "trans"),
+    "texturesEmm" : ("emission", "emissive", "emit", "emm"),
+    "texturesAlpha" : ("alpha", "opacity", "opac"),
+    "texturesAO" : ("ao", "ambient_occlusion", "occlusion", "cavity"),
+    "texturesBump" : ("bump", "bmp", "heightmap", "height"),
+    "texturesDisp" : ("displacement", "displace", "disp", "dsp"),
+    "texturesExtra" : ("user", "mask"),
+    "texturesNormal" : ("normal", "nor", "nrm", "nrml", "norm"),
+    "texturesSSS" : ("translucency", "sss")
+}
+
+# Aliases shorter than this are only matched when they are a whole token (E.g: "ao" doesn't match "aov")
+MIN_PARTIAL_ALIAS = 3
+
+# UDIM tile number, the last token of the file name before the extension (E.g : wood_diff_1001.png, wood_diff.1001.exr)
+UDIM_PATTERN = re.compile(r"[._](1\d{3}|[2-9]\d{3})$")
+UDIM_TOKEN = "<UDIM>"
+SIZE_PATTERN = re.compile(r"(?:_)?(\d+[Kk])")
+
+# Index cache, stored outside of the texture folders so read-only libraries can be cached too
+CACHE_DIR = os.environ.get("LS_TEXTURE_CACHE", os.path.join(os.path.expanduser("~"), ".ls_tools", "cache"))
+INDEX_CACHE_VERSION = 3
+
+# Channels a material needs to be complete, any channel of a group is enough
+REQUIRED_CHANNELS = {
+    "Color" : ("texturesColor",),
+    "Roughness" : ("texturesRough", "texturesGloss"),
+    "Normal" : ("texturesNormal", "texturesBump")
+}
+
+class TextureChannel:
+    """
+    Texture set of a material channel, slotted so the index of a large library stays small
+    Attributes:
+        file = the file name, with <UDIM> instead of the tile number for UDIM textures
+        udim = True if the channel is made of UDIM tiles
+        tiles = sorted array of the tile numbers, empty for a single texture
+        bounds = (first tile, last tile) or None
+        info = image details from ls_texture_probe, only when the index is built with probe = True
+        tx_path = full path of the .tx file to use instead of the one of the texture, see apply_tx_outputs
+    """
+
+    __slots__ = ("file", "udim", "tiles", "bounds", "info", "tx_path")
+
+    def __init__(self, file, udim = False):
+        self.file = file
+        self.udim = udim
+        self.tiles = array("H")
+        self.bounds = None
+        self.info = None
+        self.tx_path = None
+
+    def __repr__(self):
+        return f"TextureChannel({self.file!r}, udim = {self.udim}, tiles = {len(self.tiles)})"
+
+class TextureMaterial(Mapping):
+    """
+    Textures of a material, a read only mapping {channel : TextureChannel}
+    The material details are attributes, so iterating a material only gives its channels
+    Attributes:
+        folder = folder of the textures relative to the index root, interned since every material of a folder shares it
+        udim = True if a channel of the material is made of UDIM tiles
+        size = resolution found in the file names, E.g : 4K, None if there is none
+        channels = dictionnary {channel : TextureChannel}
+    """
+
+    __slots__ = ("folder", "udim", "size", "channels")
+
+    def __init__(self, folder, channels = None):
+        self.folder = sys.intern(folder)
+        self.channels = channels if channels is not None else {}
+        self.udim = False
+        self.size = None
+
+    def __getitem__(self, channel):
+        return self.channels[channel]
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __repr__(self):
+        return f"TextureMaterial({self.folder!r}, {list(self.channels)})"
+
+def is_texture_file(file_name):
+    """
+    Check if a file name follows the expected texture formating
+    Args:
+        file_name = name of the file, without its folder
+    Return:
+        True if the file has a supported extension and at least one underscore
+    """
+
+    return "_" in file_name and file_name.lower().endswith(TEXTURE_EXT)
+
+def scan_texture_folder(root, cached_folders = None):
+    """
+    Walk the texture root once and collect every valid texture file
+    Uses os.scandir so the file type comes from the directory entry instead of an extra stat per file
+    Folders whose modification time didn't change since the cached scan are not listed again
+    Args:
+        root = the texture folder to scan
+        cached_folders = folder listing from a previous scan, see load_index_cache
+    Return:
+        tuple = (
+            list of (folder, file) tuples, folder being relative to the root so that root + folder + file is the full path,
+            dictionnary with the listing of every folder to store in the cache,
+            list of the folders that had to be listed again
+        )
+    """
+
+    cached_folders = cached_folders or {}
+
+    textures = []
+    folders = {}
+    rescanned = []
+    pending = [root]
+
+    while pending:
+        current = pending.pop()
+
+        # Folder relative to the root, keeps the separators the same way os.walk and os.path.join would
+        folder = os.path.join(current, "")[len(root):]
+
+        try:
+            # A folder mtime only changes when files are added, removed or renamed inside it
+            mtime = os.stat(current).st_mtime_ns
+            cached = cached_folders.get(folder)
+
+            if cached and cached["mtime"] == mtime:
+                # The cached entry is kept whole, with the classification of its files
+                folders[folder] = cached
+                files = cached["files"]
+                sub_folders = cached["dirs"]
+            else:
+                files = []
+                sub_folders = []
+
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        # Linked folders are not followed, like os.walk, a link loop would never end
+                        if entry.is_dir(follow_symlinks = False):
+                            sub_folders.append(entry.name)
+                        elif entry.is_file() and is_texture_file(entry.name):
+                            files.append(entry.name)
+
+                folders[folder] = {"mtime" : mtime, "files" : files, "dirs" : sub_folders}
+                rescanned.append(folder)
+
+        except (OSError, PermissionError):
+            # Unreadable sub folders are skipped, the root itself is validated by the caller
+            if current == root:
+                raise
+            continue
+
+        textures.extend((folder, file) for file in files)
+        pending.extend(os.path.join(current, name) for name in sub_folders)
+
+    # Keep a stable order between scans, scandir order depends on the file system
+    textures.sort()
+
+    return textures, folders, rescanned
+
+def build_texture_index(root, use_cache = True, probe = False):
+    """
+    Build the texture index for a folder, scanning the folder only once
+    Args:
+        root = the texture folder to scan
+        use_cache = reuse and update the on-disk index cache of the folder
+        probe = read the header of the textures, see probe_materials
+    Return:
+        dict = {
+            "root" : the scanned folder,
+            "textures" : list of (folder, file) for every valid texture file,
+            "materials" : dictionnary with the textures sorted per material and texture channel,
+            "rescanned" : list of the folders listed again during this scan,
+            "probed" : list of the textures whose header had to be read again
+        }
+    """
+
+    if not os.path.isdir(root):
+        raise ValueError(f"Path : '{root}' doesn't exist")
+
+    cached_folders, cached_probes = load_index_cache(root) if use_cache else ({}, {})
+    textures, folders, rescanned = scan_texture_folder(root, cached_folders)
+
+    # Only the files of the folders listed again are classified, the others reuse the cached classification
+    for listing in folders.values():
+        if "classified" not in listing:
+            listing["classified"] = classify_files(listing["files"])
+
+    materials = fold_textures((folder, folders[folder]["classified"]) for folder in sorted(folders))
+
+    probes = cached_probes
+    probed = []
+
+    if probe:
+        probes, probed = probe_materials(root, materials, cached_probes, rescanned = rescanned)
+
+    # Only write the cache when the folder structure or a texture changed
+    if use_cache and (rescanned or probed or len(folders) != len(cached_folders)):
+        save_index_cache(root, folders, probes)
+
+    return {
+        "root" : root,
+        "textures" : textures,
+        "materials" : materials,
+        "rescanned" : rescanned,
+        "probed" : probed
+    }
+
+def probe_materials(root, materials, cached_probes = None, rescanned = None):
+    """
+    Add the image details read by ls_texture_probe to the channels of the materials, as channel.info
+    Only the first tile of a UDIM channel is read, the tiles of a texture set share the same format
+    Textures whose size and modification time didn't change keep the cached details
+    Args:
+        root = the texture folder the index was built from
+        materials = materials of the texture index, updated in place
+        cached_probes = probes from a previous build, see load_index_cache
+        rescanned = folders listed again by the scan, the cached details of the other folders are used without a stat
+                    Every texture is checked when not given
+    Return:
+        tuple = (
+            dictionnary {folder + file : [size, mtime, details or None]} to store in the cache,
+            list of the textures whose header was read
+        )
+    """
+
+    cached_probes = cached_probes or {}
+    rescanned = set(rescanned) if rescanned is not None else None
+
+    probes = {}
+    probed = []
+
+    for material in materials.values():
+        folder = material.folder
+        trusted = rescanned is not None and folder not in rescanned
+
+        for channel in material.values():
+            relative_path = folder + channel_files(channel)[0]
+            texture_path = root + relative_path
+
+            # The folder content didn't change since the cached probe
+            if trusted and relative_path in cached_probes:
+                probes[relative_path] = cached_probes[relative_path]
+                channel.info = cached_probes[relative_path][2]
+                continue
+
+            try:
+                texture_stat = os.stat(texture_path)
+            except OSError:
+                continue
+
+            cached = cached_probes.get(relative_path)
+
+            if cached and cached[0] == texture_stat.st_size and cached[1] == texture_stat.st_mtime_ns:
+                texture_info = cached[2]
+            else:
+                texture_info = ls_texture_probe.probe_texture(texture_path)
+                probed.append(relative_path)
+
+            probes[relative_path] = [texture_stat.st_size, texture_stat.st_mtime_ns, texture_info]
+
+            if texture_info:
+                channel.info = texture_info
+
+    return probes, probed
+
+def index_cache_path(root):
+    """
+    Get the cache file used for a texture folder
+    Args:
+        root = the texture folder
+    Return:
+        path of the cache file, named after a hash of the normalized folder path
+    """
+
+    key = os.path.normcase(os.path.abspath(root)).encode("utf-8")
+
+    return os.path.join(CACHE_DIR, "texture_index", hashlib.md5(key).hexdigest() + ".json")
+
+def load_index_cache(root):
+    """
+    Load the folder listing and the texture details cached for a texture folder
+    Args:
+        root = the texture folder
+    Return:
+        tuple = (cached listing per folder, cached texture details per texture), empty if there is no valid cache
+    """
+
+    try:
+        with open(index_cache_path(root), "r") as cache_file:
+            data = json.load(cache_file)
+
+    except (OSError, ValueError):
+        return {}, {}
+
+    if data.get("version") != INDEX_CACHE_VERSION or data.get("root") != root:
+        return {}, {}
+
+    return data.get("folders", {}), data.get("probes", {})
+
+def save_index_cache(root, folders, probes = None):
+    """
+    Save the folder listing and the texture details of a texture folder in its cache file
+    Args:
+        root = the texture folder
+        folders = listing per folder returned by scan_texture_folder
+        probes = texture details returned by probe_materials
+    """
+
+    cache_path = index_cache_path(root)
+    data = {"version" : INDEX_CACHE_VERSION, "root" : root, "folders" : folders, "probes" : probes or {}}
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok = True)
+
+        # Write to a temporary file first so a crash never leaves a broken cache,
+        # one per process so two sessions saving the same folder don't write in the same file
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(data, cache_file, separators = (",", ":"))
+
+        os.replace(temp_path, cache_path)
+
+    except OSError:
+        # The cache is only an optimization
+        pass
+
+def compile_classifier(aliases):
+    """
+    Compile an alias table into the lookups used by classify_texture
+    Args:
+        aliases = dictionnary with the list of aliases for each texture channel
+    Return:
+        tuple = (dictionnary alias -> channel, regex matching the aliases that can be part of a token, longest first)
+    """
+
+    alias_to_channel = {}
+
+    for channel, channel_aliases in aliases.items():
+        for alias in channel_aliases:
+            alias_to_channel[alias.lower()] = channel
+
+    partial_aliases = sorted((alias for alias in alias_to_channel if len(alias) >= MIN_PARTIAL_ALIAS), 
+                             key = lambda alias : (-len(alias), alias))
+    partial_pattern = re.compile("|".join(re.escape(alias) for alias in partial_aliases))
+
+    return alias_to_channel, partial_pattern
+
+_ALIAS_TO_CHANNEL, _PARTIAL_ALIAS_PATTERN = compile_classifier(TEXTURE_ALIASES)
+
+def classify_texture(file_name, classifier = None):
+    """
+    Find the material name and the texture channel of a texture file
+    The file name is split on underscores, the first token being the material name
+    Rules, applied in a single pass over the other tokens:
+        - a token equal to an alias matches that alias
+        - otherwise the leftmost and longest alias found inside the token matches
+        - the longest matched alias of the whole file name wins, the first token wins a tie
+    Args:
+        file_name = name of the texture file, E.g : wood_basecolor_1001.png
+        classifier = result of compile_classifier, the default alias table is used if not given
+    Return:
+        tuple = (material name, channel) or None if the file doesn't match any channel
+    """
+
+    alias_to_channel, partial_pattern = classifier or (_ALIAS_TO_CHANNEL, _PARTIAL_ALIAS_PATTERN)
+
+    tokens = file_name.rsplit(".", 1)[0].split("_")
+
+    if len(tokens) < 2:
+        return None
+
+    best_alias = None
+
+    for token in tokens[1:]:
+        token = token.lower()
+
+        if token in alias_to_channel:
+            alias = token
+        else:
+            match = partial_pattern.search(token)
+            if not match:
+                continue
+            alias = match.group(0)
+
+        if best_alias is None or len(alias) > len(best_alias):
+            best_alias = alias
+
+    if best_alias is None:
+        return None
+
+    return tokens[0], alias_to_channel[best_alias]
+
+def classify_files(files):
+    """
+    Classify the texture files of a folder, the part of the sort that only depends on the file names
+    The result is stored in the index cache so unchanged folders are not classified again
+    Args:
+        files = list of file names of a single folder
+    Return:
+        list of [material name, channel, file name or UDIM template, UDIM tile or 0, size or None], in file name order
+        Files that don't match any channel are left out
+    """
+
+    classified = []
+
+    for file in sorted(files):
+        texture_class = classify_texture(file)
+
+        if not texture_class:
+            continue
+
+        material_name, texture_type = texture_class
+
+        # Get the UDIM and SIZE
+        stem, extension = os.path.splitext(file)
+        udim_match = UDIM_PATTERN.search(stem)
+        size_match = SIZE_PATTERN.search(file)
+
+        if udim_match:
+            template = stem[:udim_match.start(1)] + UDIM_TOKEN + extension
+            tile = int(udim_match.group(1))
+        else:
+            template = file
+            tile = 0
+
+        classified.append([material_name, texture_type, template, tile, size_match.group(1) if size_match else None])
+
+    return classified
+
+def fold_textures(classified_folders):
+    """
+    Fold classified texture files per material and texture channel
+    UDIM tiles of a channel are folded in a single entry
+    Args:
+        classified_folders = iterable of (folder, result of classify_files), in folder order
+    Return:
+        dictionnary {material : TextureMaterial}, each material mapping its channels to a TextureChannel
+    """
+
+    materials = {}
+
+    for folder, classified in classified_folders:
+        for material_name, texture_type, template, tile, size in classified:
+            material = materials.get(material_name)
+            if material is None:
+                material = materials[material_name] = TextureMaterial(folder)
+
+            # Update the texture list, only the first texture set found is kept for each channel
+            channel = material.channels.get(texture_type)
+            if channel is None:
+                channel = material.channels[texture_type] = TextureChannel(template, udim = bool(tile))
+            elif channel.file != template:
+                continue
+
+            if tile:
+                channel.tiles.append(tile)
+                material.udim = True
+
+            if size:
+                material.size = size
+
+    # Sort the tiles and store their bounds
+    for material in materials.values():
+        for channel in material.values():
+            if channel.udim:
+                channel.tiles = array("H", sorted(set(channel.tiles)))
+                channel.bounds = (channel.tiles[0], channel.tiles[-1])
+
+    return materials
+
+def sort_textures(textures):
+    """
+    Sort the texture files per material and texture channel, see classify_files and fold_textures
+    Args:
+        textures = list of (folder, file) tuples, sorted
+    Return:
+        dictionnary {material : TextureMaterial}, each material mapping its channels to a TextureChannel
+    """
+
+    files_per_folder = {}
+
+    for folder, file in textures:
+        files_per_folder.setdefault(folder, []).append(file)
+
+    return fold_textures((folder, classify_files(files)) for folder, files in files_per_folder.items())
+
+def channel_files(channel):
+    """
+    List the actual files of a channel entry, one per UDIM tile
+    Args:
+        channel = TextureChannel of the texture index
+    Return:
+        list of file names
+    """
+
+    if not channel.udim:
+        return [channel.file]
+
+    return [channel.file.replace(UDIM_TOKEN, str(tile)) for tile in channel.tiles]
+
+def material_texture_paths(root, material, udim = None):
+    """
+    List the full path of every texture file used by a material
+    Args:
+        root = the texture folder the index was built from
+        material = material entry of the texture index
+        udim = only list the UDIM tiles when True, only the single textures when False, everything if not given
+    Return:
+        list of texture paths
+    """
+
+    folder = material.folder
+    paths = []
+
+    for channel in material.values():
+        if udim is None or channel.udim == udim:
+            paths.extend(f"{root}{folder}{file}" for file in channel_files(channel))
+
+    return paths
+
+def apply_tx_outputs(root, material, tx_outputs):
+    """
+    Point the channels of a material at the .tx file written by the conversion, E.g : the .tx of an identical texture
+    The channel tx_path is set to the full path of the .tx file to use, the UDIM channels keep the tile names
+    Args:
+        root = the texture folder the index was built from
+        material = material entry of the texture index, updated in place
+        tx_outputs = dictionnary {texture path : .tx path} from the conversion scheduler
+    """
+
+    folder = material.folder
+
+    for channel in material.values():
+        if channel.udim:
+            continue
+
+        # Forget the .tx file shared in a previous conversion
+        channel.tx_path = tx_outputs.get(f"{root}{folder}{channel.file}")
+
+def material_texture_info(root, material):
+    """
+    Get the image details of every texture file used by a material, the UDIM tiles share the details of their channel
+    Args:
+        root = the texture folder the index was built from
+        material = material entry of the texture index, built with probe = True
+    Return:
+        dictionnary {texture path : details from ls_texture_probe}
+    """
+
+    folder = material.folder
+    texture_info = {}
+
+    for channel in material.values():
+        if channel.info:
+            for file in channel_files(channel):
+                texture_info[f"{root}{folder}{file}"] = channel.info
+
+    return texture_info
+
+def missing_channels(material):
+    """
+    List the required channels a material doesn't have, see REQUIRED_CHANNELS
+    Args:
+        material = material entry of the texture index
+    Return:
+        list of the missing channel groups, E.g : ["Roughness"], empty when the material is complete
+    """
+
+    return [name for name, channels in REQUIRED_CHANNELS.items() if not any(channel in material for channel in channels)]
@@ -0,0 +1,187 @@
+import os
+import subprocess
+import threading
+import time
+
+from modules import ls_texture_index
+from modules import ls_texture_probe
+from modules import ls_tx_cache
+from modules import ls_tx_converter
+
+logger = ls_tx_converter.logger
+
+# Longest side of each preview resolution, from the largest to the smallest
+PREVIEW_RESOLUTIONS = {
+    "2k" : 2048,
+    "1k" : 1024
+}
+FULL_RESOLUTION = "full"
+
+# Previews are cached next to the TX cache, or in the texture index cache when there is no TX cache
+PREVIEW_DIR = os.path.join(ls_tx_cache.TX_CACHE_DIR or ls_texture_index.CACHE_DIR, "previews")
+
+# Record of the generated previews, kept apart from the TX manifest
+PREVIEW_MANIFEST_PATH = os.path.join(ls_texture_index.CACHE_DIR, "preview_manifest.json")
+
+def preview_path(texture_path, resolution, preview_dir = None):
+    """
+    Get the preview file of a texture
+    Every resolution and texture folder gets its own sub folder so the file names, and the UDIM tile names, stay the same
+    Args:
+        texture_path = full path of the source texture, can contain the <UDIM> token
+        resolution = preview resolution name, E.g : 1k
+        preview_dir = folder of the previews, PREVIEW_DIR if not given
+    Return:
+        path of the preview, with the extension of the source texture
+    """
+
+    texture_folder, file_name = os.path.split(texture_path)
+    folder_name = ls_tx_cache.cache_folder_name(texture_folder)
+
+    return os.path.join(preview_dir or PREVIEW_DIR, resolution, folder_name, file_name).replace(os.sep, "/")
+
+def preview_size(texture_info, resolution):
+    """
+    Get the size of a preview, the longest side of the texture is scaled down to the resolution
+    Args:
+        texture_info = result of ls_texture_probe.probe_texture for the texture
+        resolution = preview resolution name, E.g : 1k
+    Return:
+        (width, height) or None when the texture is not larger than the preview
+    """
+
+    longest_side = max(texture_info["width"], texture_info["height"])
+    target = PREVIEW_RESOLUTIONS[resolution]
+
+    if longest_side <= target:
+        return None
+
+    scale = target / longest_side
+
+    return max(1, round(texture_info["width"] * scale)), max(1, round(texture_info["height"] * scale))
+
+def needed_resolutions(texture_info, resolutions):
+    """
+    List the previews a texture needs, the textures smaller than a preview are used as they are
+    Args:
+        texture_info = result of ls_texture_probe.probe_texture, None when the header can't be read
+        resolutions = preview resolution names
+    Return:
+        list of the resolution names, from the largest to the smallest
+    """
+
+    if not texture_info:
+        return []
+
+    return [resolution for resolution in PREVIEW_RESOLUTIONS
+            if resolution in resolutions and preview_size(texture_info, resolution)]
+
+def channel_previews(root, material, channel, resolutions, preview_dir = None):
+    """
+    Get the preview files of a channel, the UDIM tiles share the details of the first tile
+    Args:
+        root = the texture folder the index was built from
+        material = material entry of the texture index, built with probe = True
+        channel = texture channel, E.g : texturesColor
+        resolutions = preview resolution names
+    Return:
+        dictionnary {resolution name : preview path} of the previews smaller than the texture
+    """
+
+    texture_path = f"{root}{material.folder}{material[channel].file}"
+
+    return {resolution : preview_path(texture_path, resolution, preview_dir)
+            for resolution in needed_resolutions(material[channel].info, resolutions)}
+
+class PreviewScheduler(ls_tx_converter.TxConversionScheduler):
+    """
+    Generate the preview resolutions of textures with hoiiotool, using the worker pool of the TX conversion
+    Each texture is read once, its previews are resized one after the other from the largest to the smallest
+    Args:
+        image_tool = path of the hoiiotool executable, see ls_tex_to_mtlx.get_image_tool_path
+        resolutions = preview resolution names, all of PREVIEW_RESOLUTIONS if not given
+        preview_dir = folder of the previews, PREVIEW_DIR if not given
+        other arguments = see ls_tx_converter.TxConversionScheduler
+    """
+
+    METRICS_KIND = "preview"
+
+    def __init__(self, image_tool, resolutions = None, preview_dir = None, manifest = None, **kwargs):
+        manifest = manifest if manifest is not None else ls_tx_converter.TxManifest(PREVIEW_MANIFEST_PATH)
+        super().__init__(image_tool, manifest = manifest, **kwargs)
+
+        self.resolutions = list(resolutions or PREVIEW_RESOLUTIONS)
+        self.preview_dir = preview_dir
+
+        # The previews are not part of the size bounded TX cache
+        self.tx_cache = None
+
+    def add(self, texture_paths, material = None, texture_info = None, dedupe = False):
+        """
+        Queue textures for the preview generation, the textures smaller than every preview are ignored
+        Args:
+            texture_info = dictionnary {texture path : ls_texture_probe details} already known,
+                           the header of the other textures is read
+            other arguments = see ls_tx_converter.TxConversionScheduler.add
+        """
+
+        texture_info = dict(texture_info or {})
+        needed_paths = []
+
+        for texture_path in texture_paths:
+            if texture_path not in texture_info:
+                texture_info[texture_path] = ls_texture_probe.probe_texture(texture_path)
+
+            if needed_resolutions(texture_info[texture_path], self.resolutions):
+                needed_paths.append(texture_path)
+
+        super().add(needed_paths, material = material, texture_info = texture_info, dedupe = False)
+
+    def _output_path(self, texture_path):
+        """
+        Get the smallest preview of a texture, every texture with a preview has this one
+        """
+
+        return preview_path(texture_path, self.resolutions[-1], self.preview_dir)
+
+    def _convert_single_texture(self, texture_path):
+        """
+        Resize one texture to all its preview resolutions with a single hoiiotool command
+        Args:
+            texture_path = full path of the texture
+        Return:
+            True if all the previews were written
+        """
+
+        thread_id = threading.current_thread().ident
+        start_time = time.time()
+
+        key = os.path.normcase(os.path.normpath(texture_path))
+        texture_info = self.texture_info.get(key) or ls_texture_probe.probe_texture(texture_path)
+
+        try:
+            logger.info(f"Thread {thread_id} : Starting previews of {os.path.basename(texture_path)}")
+
+            command = [self.tool_path, texture_path]
+
+            for resolution in needed_resolutions(texture_info, self.resolutions):
+                output_path = preview_path(texture_path, resolution, self.preview_dir)
+                os.makedirs(os.path.dirname(output_path), exist_ok = True)
+
+                width, height = preview_size(texture_info, resolution)
+                command.extend(["--resize", f"{width}x{height}", "-o", output_path])
+
+            result = subprocess.run(command, capture_output = True, text = True)
+
+            duration = round(time.time() - start_time, 2)
+
+            if result.returncode == 0:
+                logger.info(f"Thread {thread_id} : Completed previews of {os.path.basename(texture_path)} in {duration} seconds")
+                return True
+            else:
+                logger.error(f"Thread {thread_id} : Failed previews of {os.path.basename(texture_path)} in {result.stderr}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Thread {thread_id} : Error resizing {os.path.basename(texture_path)}: {str(e)}")
+            return False
@@ -0,0 +1,337 @@
+import os
+import struct
+
+# Bytes read at once for the formats whose header is parsed from memory
+EXR_HEADER_SIZE = 64 * 1024
+
+# Channels read as color, the other ones are raw data
+COLOR_CHANNELS = ["texturesColor", "texturesSSS"]
+
+# Channels without a fixed layout, their signature follows the channel count of the file
+FREE_CHANNELS = ["texturesExtra"]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+
+# Channels of each PNG color type : grayscale, RGB, palette, grayscale alpha, RGBA
+PNG_CHANNELS = {0 : 1, 2 : 3, 3 : 3, 4 : 2, 6 : 4}
+
+# JPEG start of frame markers, the other markers of the C0-CF range are tables
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Bits of each EXR pixel type : uint, half, float
+EXR_PIXEL_BITS = {0 : 32, 1 : 16, 2 : 32}
+EXR_TILED_FLAG = 0x200
+
+# Size of the TIFF field types that can hold the image size, bit depth and channel count
+TIFF_TYPE_FORMATS = {1 : "B", 3 : "H", 4 : "I", 16 : "Q"}
+TIFF_TAGS = {
+    256 : "width",
+    257 : "height",
+    258 : "bit_depth",
+    277 : "channels",
+    322 : "tile_width",
+    339 : "sample_format"
+}
+TIFF_FLOAT_FORMAT = 3
+
+def probe_texture(texture_path):
+    """
+    Read the image details of a texture from its header, without decoding any pixel
+    Supports PNG, JPEG, TIFF (and .tx), OpenEXR and TGA files
+    Args:
+        texture_path = full path of the texture
+    Return:
+        dict = {
+            "format" : png, jpeg, tiff, exr or tga,
+            "width" : int,
+            "height" : int,
+            "channels" : int,
+            "bit_depth" : bits per channel,
+            "float" : True if the pixels are stored as floating point,
+            "tiled" : True if the pixels are stored in tiles
+        }
+        or None if the format is not supported or the header can't be read
+    """
+
+    try:
+        with open(texture_path, "rb") as texture_file:
+            magic = texture_file.read(8)
+            texture_file.seek(0)
+
+            if magic.startswith(PNG_SIGNATURE):
+                return _probe_png(texture_file)
+            if magic.startswith(b"\xff\xd8"):
+                return _probe_jpeg(texture_file)
+            if magic[:4] in (b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"):
+                return _probe_tiff(texture_file)
+            if magic.startswith(EXR_MAGIC):
+                return _probe_exr(texture_file)
+
+            # TGA files don't have any magic number
+            if texture_path.lower().endswith(".tga"):
+                return _probe_tga(texture_file)
+
+    except (OSError, struct.error, ValueError, KeyError):
+        pass
+
+    return None
+
+def _image_info(image_format, width, height, channels, bit_depth, is_float = False, tiled = False):
+    """
+    Build the dictionnary returned by probe_texture
+    """
+
+    return {
+        "format" : image_format,
+        "width" : width,
+        "height" : height,
+        "channels" : channels,
+        "bit_depth" : bit_depth,
+        "float" : is_float,
+        "tiled" : tiled
+    }
+
+def _probe_png(texture_file):
+    """
+    Read the IHDR chunk, always the first chunk of the file
+    """
+
+    header = texture_file.read(29)
+
+    if header[12:16] != b"IHDR":
+        return None
+
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", header[16:26])
+
+    # Palette images are expanded to 8 bits RGB
+    if color_type == 3:
+        bit_depth = 8
+
+    return _image_info("png", width, height, PNG_CHANNELS[color_type], bit_depth)
+
+def _probe_jpeg(texture_file):
+    """
+    Walk the JPEG markers until the start of frame, the segments in between are skipped without being read
+    """
+
+    texture_file.seek(2)
+
+    while True:
+        byte = texture_file.read(1)
+
+        if not byte:
+            return None
+
+        if byte != b"\xff":
+            continue
+
+        # Markers can be padded with any amount of 0xFF
+        marker = texture_file.read(1)
+        while marker == b"\xff":
+            marker = texture_file.read(1)
+
+        if not marker:
+            return None
+
+        marker = marker[0]
+
+        # Markers without a segment
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue
+
+        # The image data starts, there is no frame header
+        if marker in (0xD9, 0xDA):
+            return None
+
+        length = struct.unpack(">H", texture_file.read(2))[0]
+
+        if marker in JPEG_SOF_MARKERS:
+            bit_depth, height, width, channels = struct.unpack(">BHHB", texture_file.read(6))
+            return _image_info("jpeg", width, height, channels, bit_depth)
+
+        texture_file.seek(length - 2, os.SEEK_CUR)
+
+def _probe_tiff(texture_file):
+    """
+    Read the first image file directory of a TIFF or BigTIFF file
+    """
+
+    header = texture_file.read(16)
+    byte_order = "<" if header[:2] == b"II" else ">"
+    big_tiff = struct.unpack(byte_order + "H", header[2:4])[0] == 43
+
+    if big_tiff:
+        offset = struct.unpack(byte_order + "Q", header[8:16])[0]
+        count_format, entry_format, value_size = "Q", "HHQ", 8
+    else:
+        offset = struct.unpack(byte_order + "I", header[4:8])[0]
+        count_format, entry_format, value_size = "H", "HHI", 4
+
+    texture_file.seek(offset)
+    count_size = struct.calcsize(count_format)
+    entry_count = struct.unpack(byte_order + count_format, texture_file.read(count_size))[0]
+
+    entry_size = struct.calcsize(byte_order + entry_format) + value_size
+    entries = texture_file.read(entry_count * entry_size)
+
+    values = {"channels" : 1, "bit_depth" : 1}
+
+    for index in range(entry_count):
+        entry = entries[index * entry_size:(index + 1) * entry_size]
+        tag, field_type, value_count = struct.unpack(byte_order + entry_format, entry[:-value_size])
+
+        if tag not in TIFF_TAGS or field_type not in TIFF_TYPE_FORMATS:
+            continue
+
+        field_format = byte_order + TIFF_TYPE_FORMATS[field_type]
+        field_size = struct.calcsize(field_format)
+        value_field = entry[-value_size:]
+
+        # Only the first value is needed, E.g : the bits of the first sample, they are the same for every sample
+        if value_count * field_size > value_size:
+            position = texture_file.tell()
+            texture_file.seek(struct.unpack(byte_order + ("Q" if big_tiff else "I"), value_field)[0])
+            value_field = texture_file.read(field_size)
+            texture_file.seek(position)
+
+        values[TIFF_TAGS[tag]] = struct.unpack(field_format, value_field[:field_size])[0]
+
+    return _image_info("tiff", values["width"], values["height"], values["channels"], values["bit_depth"],
+                       values.get("sample_format") == TIFF_FLOAT_FORMAT, "tile_width" in values)
+
+def _probe_exr(texture_file):
+    """
+    Read the channels, the data window and the tiling of the first part of an OpenEXR file
+    """
+
+    header = texture_file.read(EXR_HEADER_SIZE)
+    version = struct.unpack("<I", header[4:8])[0]
+
+    tiled = bool(version & EXR_TILED_FLAG)
+    channels = []
+    data_window = None
+    position = 8
+
+    def read_string(position):
+        end = header.index(b"\x00", position)
+        return header[position:end].decode("latin-1"), end + 1
+
+    while True:
+        name, position = read_string(position)
+
+        # An empty name closes the header
+        if not name:
+            break
+
+        attribute_type, position = read_string(position)
+        size = struct.unpack("<i", header[position:position + 4])[0]
+        value = header[position + 4:position + 4 + size]
+        position += 4 + size
+
+        if len(value) < size:
+            raise ValueError("Truncated OpenEXR header")
+
+        if name == "channels" and attribute_type == "chlist":
+            # Each channel : name, pixel type, linear flag, 3 reserved bytes, x and y sampling
+            channel_position = 0
+            while value[channel_position:channel_position + 1] not in (b"", b"\x00"):
+                channel_position = value.index(b"\x00", channel_position) + 1
+                channels.append(struct.unpack("<i", value[channel_position:channel_position + 4])[0])
+                channel_position += 16
+
+        elif name == "dataWindow" and attribute_type == "box2i":
+            data_window = struct.unpack("<iiii", value)
+
+        elif name == "tiles" or (name == "type" and value.rstrip(b"\x00") == b"tiledimage"):
+            tiled = True
+
+    if not channels or not data_window:
+        return None
+
+    x_min, y_min, x_max, y_max = data_window
+    bit_depth = max(EXR_PIXEL_BITS.get(pixel_type, 32) for pixel_type in channels)
+    is_float = any(pixel_type != 0 for pixel_type in channels)
+
+    return _image_info("exr", x_max - x_min + 1, y_max - y_min + 1, len(channels), bit_depth, is_float, tiled)
+
+def _probe_tga(texture_file):
+    """
+    Read the fixed size TGA header
+    """
+
+    header = texture_file.read(18)
+    image_type, width, height, pixel_depth, descriptor = struct.unpack("<2xB9xHHBB", header)
+    alpha_bits = descriptor & 0x0F
+
+    # Color mapped, true color and grayscale images, with or without RLE compression
+    if image_type in (1, 9):
+        channels = 3
+    elif image_type in (2, 10):
+        channels = 4 if alpha_bits or pixel_depth == 32 else 3
+    elif image_type in (3, 11):
+        channels = 2 if alpha_bits else 1
+    else:
+        return None
+
+    bit_depth = 8 if image_type in (1, 9) else max(1, pixel_depth // channels)
+
+    return _image_info("tga", width, height, channels, bit_depth)
+
+def texture_colorspace(channel, texture_info = None):
+    """
+    Get the colorspace to read a texture with
+    Color textures are sRGB unless they are stored as floating point, then they are already linear
+    Args:
+        channel = texture channel, E.g : texturesColor
+        texture_info = result of probe_texture for the texture, if known
+    Return:
+        colorspace name
+    """
+
+    if channel not in COLOR_CHANNELS:
+        return "raw"
+
+    if texture_info and texture_info.get("float"):
+        return "lin_rec709"
+
+    return "srgb_texture"
+
+def texture_signature(channel, signature, texture_info = None):
+    """
+    Get the signature of the image node reading a texture
+    Args:
+        channel = texture channel, E.g : texturesExtra
+        signature = signature used for the channel when the texture details are unknown
+        texture_info = result of probe_texture for the texture, if known
+    Return:
+        signature of the image node, E.g : color3
+    """
+
+    if texture_info and channel in FREE_CHANNELS:
+        return "color3" if texture_info["channels"] >= 3 else "float"
+
+    return signature
+
+def texture_description(texture_info):
+    """
+    Format the texture details for the UI
+    Args:
+        texture_info = result of probe_texture
+    Return:
+        description, E.g : 4096x4096 RGB 16 bits float tiled
+    """
+
+    channel_names = {1 : "Gray", 2 : "Gray Alpha", 3 : "RGB", 4 : "RGBA"}
+
+    description = (f"{texture_info['width']}x{texture_info['height']} "
+                   f"{channel_names.get(texture_info['channels'], str(texture_info['channels']) + ' channels')} "
+                   f"{texture_info['bit_depth']} bits")
+
+    if texture_info["float"]:
+        description += " float"
+
+    if texture_info["tiled"]:
+        description += " tiled"
+
+    return description
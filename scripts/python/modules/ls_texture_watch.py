@@ -0,0 +1,188 @@
+import os
+import time
+
+from modules import ls_texture_index
+
+# Seconds between two scans of the watched folder
+POLL_INTERVAL = 5.0
+# Seconds without any new change before the changed materials are reported, artists copy the maps of a set one by one
+DEBOUNCE_DELAY = 10.0
+# Polls between two checks of every texture file, a texture saved again in place doesn't change its folder mtime
+OVERWRITE_CHECK_POLLS = 12
+
+def material_files(material):
+    """
+    Summarize the file names of a material, without reading anything on disk
+    Args:
+        material = material entry of the texture index
+    Return:
+        tuple that can be compared between scans
+    """
+
+    return (material.folder, tuple((channel, channel_data.file, tuple(channel_data.tiles)) 
+                                   for channel, channel_data in sorted(material.items())))
+
+def material_signature(root, material):
+    """
+    Summarize the textures of a material, two signatures differ when a texture was added, removed, renamed or overwritten
+    The size and modification time of every file are part of it, a texture saved again in place changes the signature
+    Args:
+        root = the texture folder the index was built from
+        material = material entry of the texture index
+    Return:
+        tuple that can be compared between scans
+    """
+
+    channels = []
+
+    for channel, channel_data in sorted(material.items()):
+        files = []
+
+        for file in ls_texture_index.channel_files(channel_data):
+            try:
+                file_stat = os.stat(f"{root}{material.folder}{file}")
+                files.append((file, file_stat.st_size, file_stat.st_mtime_ns))
+            except OSError:
+                files.append((file, None, None))
+
+        channels.append((channel, tuple(files)))
+
+    return (material.folder, tuple(channels))
+
+class TextureFolderWatcher:
+    """
+    Poll a texture folder and report the materials whose textures changed
+    A poll is cheap : the texture index cache only lists again the folders whose modification time changed,
+    the texture files are only stated for the materials of those folders, and the headers of the changed textures are read
+    Every overwrite_check polls all the files are stated, to find the textures saved again in place
+    The changes are held until the folder stays the same for the debounce delay, a burst of new files is reported once
+    Args:
+        root = the texture folder to watch
+        debounce = seconds without any new change before the changes are reported
+        require_complete = hold the materials missing required channels, see ls_texture_index.missing_channels
+        overwrite_check = polls between two checks of every texture file, 0 to only check the changed folders
+    """
+
+    def __init__(self, root, debounce = DEBOUNCE_DELAY, require_complete = True, overwrite_check = OVERWRITE_CHECK_POLLS):
+        self.root = root
+        self.debounce = debounce
+        self.require_complete = require_complete
+        self.overwrite_check = overwrite_check
+        self.poll_count = 0
+
+        # Signature of every material at the last report, None until the first scan
+        self.signatures = None
+
+        # File names, signature and material entry of every material at the last poll, their texture details are reused
+        self.probed = {}
+
+        # Changes seen since the last report and the time of the latest one
+        self.pending = {}
+        self.last_change = 0.0
+
+    def poll(self, now = None):
+        """
+        Scan the folder once
+        The first scan only records the current state of the folder, nothing is reported
+        Args:
+            now = current time, time.time() if not given
+        Return:
+            dict = {
+                "index" : texture index of the folder, see ls_texture_index.build_texture_index,
+                "ready" : list of the changed materials to build,
+                "waiting" : list of the changed materials held because they are not complete
+            }
+            or None when there is nothing to report yet
+        """
+
+        now = time.time() if now is None else now
+
+        index = ls_texture_index.build_texture_index(self.root)
+        materials = index["materials"]
+        signatures = self._material_signatures(materials, index["rescanned"])
+
+        self._probe_changed(materials, signatures)
+
+        if self.signatures is None:
+            self.signatures = signatures
+            return None
+
+        changed = {material_name : signature for material_name, signature in signatures.items()
+                   if self.signatures.get(material_name) != signature}
+
+        # New changes restart the debounce delay
+        if changed != self.pending:
+            self.pending = changed
+            self.last_change = now
+            return None
+
+        if not changed or now - self.last_change < self.debounce:
+            return None
+
+        # The held materials are reported again once their missing textures arrive, their signature changes then
+        self.signatures = signatures
+        self.pending = {}
+
+        ready = []
+        waiting = []
+
+        for material_name in changed:
+            if self.require_complete and ls_texture_index.missing_channels(materials[material_name]):
+                waiting.append(material_name)
+            else:
+                ready.append(material_name)
+
+        return {"index" : index, "ready" : ready, "waiting" : waiting}
+
+    def _material_signatures(self, materials, rescanned):
+        """
+        Get the signature of every material, see material_signature
+        The files of a material are only stated when its file names changed or its folder was listed again,
+        the other materials keep the signature of the last poll until the next check of every file
+        Args:
+            materials = materials of the new texture index
+            rescanned = folders listed again by the index, see ls_texture_index.build_texture_index
+        Return:
+            dictionnary {material name : signature}
+        """
+
+        self.poll_count += 1
+        check_all = self.overwrite_check and self.poll_count % self.overwrite_check == 0
+        rescanned = set(rescanned)
+
+        signatures = {}
+
+        for material_name, material in materials.items():
+            previous = self.probed.get(material_name)
+
+            if check_all or not previous or material.folder in rescanned or previous[0] != material_files(material):
+                signatures[material_name] = material_signature(self.root, material)
+            else:
+                signatures[material_name] = previous[1]
+
+        return signatures
+
+    def _probe_changed(self, materials, signatures):
+        """
+        Read the texture details of the materials changed since the last poll, see ls_texture_index.probe_materials
+        The unchanged materials get the details read by a previous poll
+        Args:
+            materials = materials of the new texture index, updated in place
+            signatures = dictionnary {material name : material_signature} of the new index
+        """
+
+        changed = {}
+
+        for material_name, material in materials.items():
+            previous = self.probed.get(material_name)
+
+            if previous and previous[1] == signatures[material_name]:
+                for channel, channel_data in material.items():
+                    channel_data.info = previous[2][channel].info
+            else:
+                changed[material_name] = material
+
+        ls_texture_index.probe_materials(self.root, changed)
+
+        self.probed = {material_name : (material_files(material), signatures[material_name], material) 
+                       for material_name, material in materials.items()}
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import hashlib
+import logging
+
+logger = logging.getLogger("TX cache")
+
+# Central TX cache, the .tx files are written next to their source texture when LS_TX_CACHE_DIR is not set
+TX_CACHE_DIR = os.environ.get("LS_TX_CACHE_DIR")
+# Size limit of the cache in GB
+DEFAULT_CACHE_SIZE = 100.0
+# The eviction frees the cache down to this ratio of the limit, so it doesn't run again for every new texture
+EVICTION_TARGET = 0.9
+
+CACHE_INDEX_NAME = "tx_cache_index.json"
+CACHE_INDEX_VERSION = 1
+
+def cache_folder_name(texture_folder):
+    """
+    Get the cache sub folder of a texture folder
+    Every texture folder gets its own sub folder so the file names, and the UDIM tile names, stay the same
+    Args:
+        texture_folder = folder of the source textures
+    Return:
+        sub folder name, E.g : wood_3f2a9c01b2d4
+    """
+
+    key = os.path.normcase(os.path.abspath(texture_folder)).encode("utf-8")
+    name = os.path.basename(os.path.normpath(texture_folder)) or "root"
+
+    return f"{name}_{hashlib.md5(key).hexdigest()[:12]}"
+
+def tx_output_path(texture_path, cache_dir = None):
+    """
+    Get the .tx file written for a texture
+    Args:
+        texture_path = full path of the source texture, can contain the <UDIM> token
+        cache_dir = central cache folder, TX_CACHE_DIR if not given
+    Return:
+        path of the .tx file, in the cache when there is one, next to the source texture otherwise
+    """
+
+    cache_dir = cache_dir or TX_CACHE_DIR
+    stem = os.path.splitext(texture_path)[0]
+
+    if not cache_dir:
+        return stem + ".tx"
+
+    texture_folder, file_stem = os.path.split(stem)
+
+    return os.path.join(cache_dir, cache_folder_name(texture_folder), file_stem + ".tx").replace(os.sep, "/")
+
+def default_cache_size():
+    """
+    Get the size limit of the cache
+    Return:
+        limit in bytes, from LS_TX_CACHE_SIZE (in GB) or DEFAULT_CACHE_SIZE
+    """
+
+    size = os.environ.get("LS_TX_CACHE_SIZE")
+
+    if size:
+        try:
+            return int(float(size) * 1024 ** 3)
+        except ValueError:
+            logger.warning(f"Invalid LS_TX_CACHE_SIZE value : {size}")
+
+    return int(DEFAULT_CACHE_SIZE * 1024 ** 3)
+
+def default_tx_cache():
+    """
+    Get the cache configured by the environment
+    Return:
+        TxCache or None when LS_TX_CACHE_DIR is not set
+    """
+
+    if not TX_CACHE_DIR:
+        return None
+
+    return TxCache(TX_CACHE_DIR, default_cache_size())
+
+class TxCache:
+    """
+    Central folder of .tx files with a size limit
+    The last access of each .tx file is kept in an index shared by every job using the cache,
+    the least recently used files are removed once the cache is larger than its limit
+    Args:
+        cache_dir = folder of the cache
+        max_size = size limit in bytes
+    """
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.index_path = os.path.join(cache_dir, CACHE_INDEX_NAME)
+        self.accessed = {}
+
+    def output_path(self, texture_path):
+        """
+        Get the .tx file of a texture in this cache
+        """
+
+        return tx_output_path(texture_path, self.cache_dir)
+
+    def touch(self, tx_path):
+        """
+        Record an access to a .tx file of the cache, the index is only written by save
+        Args:
+            tx_path = path of the .tx file
+        """
+
+        self.accessed[self._relative_path(tx_path)] = time.time()
+
+    def _relative_path(self, tx_path):
+        return os.path.relpath(tx_path, self.cache_dir).replace(os.sep, "/")
+
+    def _load(self):
+        """
+        Load the access index
+        Return:
+            dictionnary {relative .tx path : last access time}
+        """
+
+        try:
+            with open(self.index_path, "r") as index_file:
+                data = json.load(index_file)
+
+        except (OSError, ValueError):
+            return {}
+
+        if data.get("version") != CACHE_INDEX_VERSION:
+            return {}
+
+        return data.get("entries", {})
+
+    def _write(self, entries):
+        """
+        Write the access index, through a temporary file so a crash never leaves a broken index
+        """
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok = True)
+
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as index_file:
+                json.dump({"version" : CACHE_INDEX_VERSION, "entries" : entries}, index_file, separators = (",", ":"))
+
+            os.replace(temp_path, self.index_path)
+
+        except OSError as e:
+            logger.warning(f"Unable to save the TX cache index {self.index_path} : {str(e)}")
+
+    def _merged_entries(self):
+        """
+        Merge the recorded accesses with the index on disk, written by other jobs in the meantime
+        """
+
+        entries = self._load()
+
+        for relative_path, access_time in self.accessed.items():
+            entries[relative_path] = max(access_time, entries.get(relative_path, 0))
+
+        return entries
+
+    def save(self):
+        """
+        Write the recorded accesses in the index
+        """
+
+        if not self.accessed:
+            return
+
+        self._write(self._merged_entries())
+        self.accessed = {}
+
+    def _cached_files(self):
+        """
+        List the .tx files of the cache
+        Return:
+            list of (relative path, size, modification time)
+        """
+
+        files = []
+
+        try:
+            with os.scandir(self.cache_dir) as folders:
+                for folder in folders:
+                    if not folder.is_dir():
+                        continue
+
+                    with os.scandir(folder.path) as entries:
+                        for entry in entries:
+                            if entry.is_file() and entry.name.endswith(".tx"):
+                                entry_stat = entry.stat()
+                                files.append((f"{folder.name}/{entry.name}", entry_stat.st_size, entry_stat.st_mtime))
+
+        except OSError as e:
+            logger.warning(f"Unable to list the TX cache {self.cache_dir} : {str(e)}")
+
+        return files
+
+    def evict(self, protected = ()):
+        """
+        Remove the least recently used .tx files until the cache fits in its limit
+        Files without a recorded access are aged by their modification time
+        Args:
+            protected = .tx paths that must be kept, E.g : the files used by the current job
+        Return:
+            list of the removed .tx paths
+        """
+
+        files = self._cached_files()
+        total_size = sum(size for _, size, _ in files)
+
+        if total_size <= self.max_size:
+            self.save()
+            return []
+
+        entries = self._merged_entries()
+        protected = {self._relative_path(tx_path) for tx_path in protected}
+        target_size = self.max_size * EVICTION_TARGET
+
+        removed = []
+
+        for relative_path, size, modification_time in sorted(files, key = lambda file : entries.get(file[0], file[2])):
+            if total_size <= target_size:
+                break
+
+            if relative_path in protected:
+                continue
+
+            tx_path = os.path.join(self.cache_dir, relative_path)
+
+            try:
+                os.remove(tx_path)
+            except OSError:
+                continue
+
+            total_size -= size
+            entries.pop(relative_path, None)
+            removed.append(tx_path)
+
+            # Remove the folders left empty
+            try:
+                os.rmdir(os.path.dirname(tx_path))
+            except OSError:
+                pass
+
+        logger.info(f"TX cache eviction : {len(removed)} files removed, {total_size / 1024 ** 3:.2f} GB used")
+
+        self._write(entries)
+        self.accessed = {}
+
+        return removed
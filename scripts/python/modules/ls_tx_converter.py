@@ -0,0 +1,676 @@
+import os
+import json
+import ctypes
+import socket
+import subprocess
+import time
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from modules import ls_texture_fingerprint
+from modules import ls_texture_index
+from modules import ls_tx_cache
+from modules import ls_texture_probe
+
+logger = logging.getLogger("TX conversion")
+
+# Variables to setup the worker pool
+MAX_WORKERS = os.cpu_count() or 1
+WORKER_LIMIT = max(1, int(MAX_WORKERS * 0.75))
+
+# Memory budget of the conversion jobs, in GB through LS_TX_MEMORY_BUDGET, half of the RAM by default
+MEMORY_BUDGET_RATIO = 0.5
+DEFAULT_TOTAL_MEMORY = 16 * 1024 ** 3
+
+# Decoded size of an image compared to its file size, per format, used when the image size is unknown
+MEMORY_EXPANSION = {
+    ".jpg" : 10.0,
+    ".jpeg" : 10.0,
+    ".png" : 4.0,
+    ".exr" : 3.0,
+    ".tif" : 2.0,
+    ".tiff" : 2.0,
+    ".tga" : 1.5,
+    ".bmp" : 1.0
+}
+# imaketx keeps the source and the mipmaps being built in memory
+MEMORY_OVERHEAD = 2.0
+# Size of a full mipmap chain compared to the first level
+MIPMAP_RATIO = 4.0 / 3.0
+
+# Manifest of the converted textures, shared by every conversion job
+MANIFEST_PATH = os.path.join(ls_texture_index.CACHE_DIR, "tx_manifest.json")
+MANIFEST_VERSION = 1
+
+# Metrics of the conversion jobs, one JSON line per job, LS_TX_METRICS overrides the file
+METRICS_PATH = os.environ.get("LS_TX_METRICS", os.path.join(ls_texture_index.CACHE_DIR, "tx_metrics.jsonl"))
+
+def tx_output_path(texture_path):
+    """
+    Get the .tx file written for a texture
+    Args:
+        texture_path = full path of the source texture
+    Return:
+        path of the .tx file, in the central TX cache when LS_TX_CACHE_DIR is set, next to the source texture otherwise
+    """
+
+    return ls_tx_cache.tx_output_path(texture_path)
+
+def total_memory():
+    """
+    Get the physical memory of the machine
+    Return:
+        amount of RAM in bytes, DEFAULT_TOTAL_MEMORY if it can't be found
+    """
+
+    try:
+        if os.name == "nt":
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong)
+                ]
+
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+
+            return status.ullTotalPhys
+
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+    except (AttributeError, OSError, ValueError):
+        return DEFAULT_TOTAL_MEMORY
+
+def default_memory_budget():
+    """
+    Get the memory the conversion jobs are allowed to use
+    Return:
+        budget in bytes, from LS_TX_MEMORY_BUDGET (in GB) or a ratio of the RAM
+    """
+
+    budget = os.environ.get("LS_TX_MEMORY_BUDGET")
+
+    if budget:
+        try:
+            return int(float(budget) * 1024 ** 3)
+        except ValueError:
+            logger.warning(f"Invalid LS_TX_MEMORY_BUDGET value : {budget}")
+
+    return int(total_memory() * MEMORY_BUDGET_RATIO)
+
+def estimate_memory(texture_path, source_stat, texture_info = None):
+    """
+    Estimate the memory used by imaketx to convert a texture
+    The decoded size comes from the image header, the file size is only used for the formats that can't be probed
+    Args:
+        texture_path = full path of the source texture
+        source_stat = os.stat result of the source texture
+        texture_info = result of ls_texture_probe.probe_texture, the header is read if not given
+    Return:
+        estimated memory in bytes
+    """
+
+    if texture_info is None:
+        texture_info = ls_texture_probe.probe_texture(texture_path)
+
+    if texture_info:
+        decoded_size = (texture_info["width"] * texture_info["height"] * texture_info["channels"] 
+                        * max(1, texture_info["bit_depth"] // 8))
+
+        return int(decoded_size * MIPMAP_RATIO * MEMORY_OVERHEAD)
+
+    extension = os.path.splitext(texture_path)[1].lower()
+
+    return int(source_stat.st_size * MEMORY_EXPANSION.get(extension, 4.0) * MEMORY_OVERHEAD)
+
+class TxManifest:
+    """
+    Record of the converted textures : source size, source mtime and output path
+    A texture whose record matches the source on disk doesn't need imaketx to run again
+    """
+
+    def __init__(self, manifest_path = MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self.entries = self._load()
+        self.updated = {}
+
+    def _load(self):
+        """
+        Load the manifest file
+        Return:
+            dictionnary with the record of each source texture, empty if there is no valid manifest
+        """
+
+        try:
+            with open(self.manifest_path, "r") as manifest_file:
+                data = json.load(manifest_file)
+
+        except (OSError, ValueError):
+            return {}
+
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+
+        return data.get("entries", {})
+
+    def is_up_to_date(self, texture_path, source_stat, output_path):
+        """
+        Check if a texture was already converted from the same source
+        Args:
+            texture_path = full path of the source texture
+            source_stat = os.stat result of the source texture
+            output_path = .tx file expected for the texture
+        Return:
+            True if the recorded conversion can be reused
+        """
+
+        entry = self.entries.get(texture_path)
+
+        if not entry:
+            return False
+
+        return (entry["size"] == source_stat.st_size 
+                and entry["mtime"] == source_stat.st_mtime_ns 
+                and entry["output"] == output_path 
+                and os.path.exists(output_path))
+
+    def record(self, texture_path, source_stat, output_path):
+        """
+        Record a successful conversion
+        """
+
+        entry = {"size" : source_stat.st_size, "mtime" : source_stat.st_mtime_ns, "output" : output_path}
+        self.entries[texture_path] = entry
+        self.updated[texture_path] = entry
+
+    def save(self):
+        """
+        Write the new records in the manifest file
+        The file is read again first so records written by other jobs in the meantime are kept
+        """
+
+        if not self.updated:
+            return
+
+        entries = self._load()
+        entries.update(self.updated)
+
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok = True)
+
+            # Write to a temporary file first so a crash never leaves a broken manifest
+            temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as manifest_file:
+                json.dump({"version" : MANIFEST_VERSION, "entries" : entries}, manifest_file, separators = (",", ":"))
+
+            os.replace(temp_path, self.manifest_path)
+            self.updated = {}
+
+        except OSError as e:
+            logger.warning(f"Unable to save the TX manifest {self.manifest_path} : {str(e)}")
+
+def write_metrics(metrics_path, record):
+    """
+    Append the metrics of a job to a JSON lines file
+    Args:
+        metrics_path = the .jsonl file
+        record = dictionnary written on one line
+    """
+
+    try:
+        os.makedirs(os.path.dirname(metrics_path), exist_ok = True)
+
+        with open(metrics_path, "a") as metrics_file:
+            metrics_file.write(json.dumps(record, separators = (",", ":")) + "\n")
+
+    except OSError as e:
+        logger.warning(f"Unable to write the conversion metrics {metrics_path} : {str(e)}")
+
+class TxConversionScheduler:
+    """
+    Convert textures to .tx files with imaketx, using a single worker pool for a whole job
+    Textures are collected from every material first, duplicated paths are only converted once
+    Textures recorded as up to date in the manifest are skipped without starting imaketx
+    With dedupe, byte identical textures are only converted once, see tx_outputs for the .tx file of each texture
+    Args:
+        imaketx_path = path of the imaketx executable
+        max_workers = size of the worker pool
+        manifest = TxManifest used to skip the up to date textures
+        progress_callback = called with (texture_path, success) each time a texture is done
+        material_callback = called with the material name once all the textures of a material are done
+        cancel_event = threading.Event, the textures not started yet are dropped once it is set
+        memory_budget = memory in bytes the running conversions can use together, see default_memory_budget
+        memory_estimator = function (texture_path, source_stat, texture_info) returning the memory used to convert a texture
+        dedupe = find the byte identical textures and convert them once
+        tx_cache = ls_tx_cache.TxCache receiving the .tx files, the one set by the environment if not given
+        metrics_path = .jsonl file receiving the metrics of each job, METRICS_PATH if not given, False to disable them
+    """
+
+    # Kind of job written in the metrics
+    METRICS_KIND = "tx"
+
+    def __init__(self, imaketx_path, max_workers = None, manifest = None, 
+                 progress_callback = None, material_callback = None, cancel_event = None,
+                 memory_budget = None, memory_estimator = estimate_memory, dedupe = False, tx_cache = None,
+                 metrics_path = None):
+        # Command line tool run for each texture, the subclasses run other tools, E.g : hoiiotool for the previews
+        self.tool_path = imaketx_path
+        self.max_workers = max_workers or WORKER_LIMIT
+        self.memory_budget = memory_budget or default_memory_budget()
+        self.memory_estimator = memory_estimator
+        self.manifest = manifest if manifest is not None else TxManifest()
+        self.progress_callback = progress_callback
+        self.material_callback = material_callback
+        self.cancel_event = cancel_event or threading.Event()
+        self.dedupe = dedupe
+        self.tx_cache = tx_cache if tx_cache is not None else ls_tx_cache.default_tx_cache()
+        self.metrics_path = metrics_path if metrics_path is not None else METRICS_PATH
+
+        # Ordered set of the textures to convert, keyed by normalized path
+        self.textures = {}
+        self.texture_info = {}
+        self.results = {}
+
+        # Metrics of each texture : status, queue wait, run time, input and output bytes
+        self.metrics = {}
+
+        # Textures that can share the .tx of an identical texture, the .tx file used by each texture once run started
+        self.shareable = set()
+        self.tx_outputs = {}
+        self.copies = {}
+
+        # Materials waiting for their textures
+        self.texture_materials = {}
+        self.material_pending = {}
+
+    def add(self, texture_paths, material = None, texture_info = None, dedupe = True):
+        """
+        Queue textures for the conversion, textures already queued are ignored
+        Args:
+            texture_paths = list of full texture paths
+            material = name of the material using the textures, reported by material_callback once they are done
+            texture_info = dictionnary {texture path : ls_texture_probe details} already known, E.g : from the texture index
+            dedupe = the textures can use the .tx of an identical texture, 
+                     False for the UDIM tiles as their .tx files are found from the tile name
+        """
+
+        texture_info = texture_info or {}
+
+        if material is not None:
+            self.material_pending.setdefault(material, set())
+
+        for texture_path in texture_paths:
+            key = os.path.normcase(os.path.normpath(texture_path))
+            self.textures.setdefault(key, texture_path)
+
+            if dedupe:
+                self.shareable.add(key)
+
+            if texture_path in texture_info:
+                self.texture_info.setdefault(key, texture_info[texture_path])
+
+            if material is not None:
+                self.texture_materials.setdefault(key, []).append(material)
+                self.material_pending[material].add(key)
+
+    def cancel(self):
+        """
+        Cancel the conversion, the textures being converted are finished but no new imaketx is started
+        """
+
+        self.cancel_event.set()
+
+    def run(self):
+        """
+        Convert all the queued textures
+        Return:
+            dict = {"total" : int, "skipped" : int, "converted" : int, "deduplicated" : int, "failed" : int, 
+                    "cancelled" : int, "duration" : wall clock seconds, see _job_metrics for the other keys}
+        """
+
+        start_time = time.time()
+
+        total_textures = len(self.textures)
+
+        self.skipped = 0
+        self.converted = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.failures = {}
+
+        # Materials without any texture to convert are ready right away
+        for material, pending in list(self.material_pending.items()):
+            if not pending:
+                self._material_done(material)
+
+        texture_stats = {}
+
+        for key, texture_path in self.textures.items():
+            try:
+                texture_stats[key] = os.stat(texture_path)
+            except OSError as e:
+                logger.error(f"Error reading {os.path.basename(texture_path)}: {str(e)}")
+                self._texture_done(key, False, failure = "unreadable")
+
+        # Identical textures are converted once, the copies are done with the texture they are identical to
+        duplicates = self._find_duplicates(texture_stats) if self.dedupe else {}
+
+        for key in texture_stats:
+            self.tx_outputs[self.textures[key]] = self._output_path(self.textures[duplicates.get(key, key)])
+
+        for key, original_key in duplicates.items():
+            self.copies.setdefault(original_key, []).append(key)
+            del texture_stats[key]
+
+        # Skip the textures that didn't change since their last conversion
+        for key in list(texture_stats):
+            texture_path = self.textures[key]
+
+            if self.manifest.is_up_to_date(texture_path, texture_stats[key], self._output_path(texture_path)):
+                self._texture_done(key, True, skipped = True)
+                del texture_stats[key]
+
+        # Largest jobs first, they are the ones that make the total run time longer
+        costs = {key : self.memory_estimator(self.textures[key], texture_stats[key], self.texture_info.get(key)) 
+                 for key in texture_stats}
+        queue = sorted(texture_stats, key = lambda key : costs[key], reverse = True)
+
+        executor = ThreadPoolExecutor(max_workers = min(self.max_workers, max(1, len(queue))))
+
+        # The queue wait of each texture is measured from here
+        queue_start = time.time()
+
+        running = {}
+        memory_used = 0
+
+        try:
+            while queue or running:
+
+                if self.cancel_event.is_set() and queue:
+                    # Drop the textures not started yet, the running ones are still awaited
+                    logger.info("Conversion cancelled")
+                    queue = []
+
+                # Start the jobs that fit in the memory budget, a job larger than the budget runs alone
+                index = 0
+                while index < len(queue) and len(running) < self.max_workers:
+                    key = queue[index]
+
+                    if running and memory_used + costs[key] > self.memory_budget:
+                        index += 1
+                        continue
+
+                    running[executor.submit(self._timed_conversion, self.textures[key])] = key
+                    memory_used += costs[key]
+                    queue.pop(index)
+
+                if not running:
+                    break
+
+                # Process completed futures as they finish
+                done, _ = wait(running, return_when = FIRST_COMPLETED)
+
+                for future in done:
+                    key = running.pop(future)
+                    memory_used -= costs[key]
+                    texture_path = self.textures[key]
+
+                    timing = {"input_bytes" : texture_stats[key].st_size}
+                    failure = "tool_error"
+
+                    try:
+                        success, conversion_start, conversion_end = future.result()
+                        timing["queue_wait"] = round(conversion_start - queue_start, 3)
+                        timing["run_time"] = round(conversion_end - conversion_start, 3)
+
+                    except Exception as e:
+                        logger.error(f"Error processing {os.path.basename(texture_path)}: {str(e)}")
+                        success = False
+                        failure = "exception"
+
+                    if success:
+                        output_path = self._output_path(texture_path)
+                        self.manifest.record(texture_path, texture_stats[key], output_path)
+
+                        try:
+                            timing["output_bytes"] = os.stat(output_path).st_size
+                        except OSError:
+                            pass
+
+                    self._texture_done(key, success, failure = failure, timing = timing)
+
+                    # Log progress
+                    done_count = len(self.results)
+                    progress = (done_count / total_textures) * 100
+                    logger.info(f" Progress : {progress:.1f}% ({done_count}/{total_textures})")
+
+        finally:
+            executor.shutdown(wait = True)
+            self.manifest.save()
+
+            # Keep the cache in its size limit, the .tx files of this job are the most recent ones
+            if self.tx_cache:
+                self.tx_cache.evict(protected = self.tx_outputs.values())
+
+        duration = round(time.time() - start_time, 2)
+        cancelled = total_textures - len(self.results)
+
+        summary = {
+            "total" : total_textures,
+            "skipped" : self.skipped,
+            "converted" : self.converted,
+            "deduplicated" : self.deduplicated,
+            "failed" : self.failed,
+            "cancelled" : cancelled,
+            "duration" : duration
+        }
+        summary.update(self._job_metrics(duration))
+
+        logger.info(f"Conversion Complete : {duration} seconds, converted : {self.converted}, "
+                    f"skipped (up to date) : {self.skipped}, deduplicated : {self.deduplicated}, "
+                    f"Failed : {self.failed}, Cancelled : {cancelled}, throughput : {summary['throughput']} MB/s")
+
+        if self.metrics_path:
+            write_metrics(self.metrics_path, {
+                "kind" : self.METRICS_KIND,
+                "time" : time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(start_time)),
+                "host" : socket.gethostname(),
+                "cpu_count" : MAX_WORKERS,
+                "memory_budget" : self.memory_budget,
+                **summary,
+                "textures" : [{"path" : texture_path, **texture_metrics} 
+                              for texture_path, texture_metrics in self.metrics.items()]
+            })
+
+        return summary
+
+    def _job_metrics(self, duration):
+        """
+        Aggregate the metrics of the converted textures
+        Args:
+            duration = wall clock seconds of the job
+        Return:
+            dict = {
+                "workers" : size of the worker pool,
+                "input_bytes" : bytes of the converted source textures,
+                "output_bytes" : bytes of the written files,
+                "throughput" : MB of source textures converted per wall clock second,
+                "queue_wait" : mean seconds a texture waited for a worker,
+                "run_time" : mean seconds of a conversion,
+                "max_run_time" : seconds of the longest conversion,
+                "failures" : dictionnary {failure kind : amount}, unreadable, tool_error or exception
+            }
+        """
+
+        converted = [texture_metrics for texture_metrics in self.metrics.values() if "run_time" in texture_metrics]
+        input_bytes = sum(texture_metrics["input_bytes"] for texture_metrics in converted 
+                          if texture_metrics["status"] == "converted")
+        run_times = [texture_metrics["run_time"] for texture_metrics in converted]
+        queue_waits = [texture_metrics["queue_wait"] for texture_metrics in converted]
+
+        return {
+            "workers" : self.max_workers,
+            "input_bytes" : input_bytes,
+            "output_bytes" : sum(texture_metrics.get("output_bytes", 0) for texture_metrics in converted),
+            "throughput" : round(input_bytes / 1024 ** 2 / duration, 2) if duration else 0.0,
+            "queue_wait" : round(sum(queue_waits) / len(queue_waits), 3) if queue_waits else 0.0,
+            "run_time" : round(sum(run_times) / len(run_times), 3) if run_times else 0.0,
+            "max_run_time" : max(run_times, default = 0.0),
+            "failures" : dict(self.failures)
+        }
+
+    def _output_path(self, texture_path):
+        """
+        Get the .tx file written for a texture, in the cache of the scheduler
+        """
+
+        if self.tx_cache:
+            return self.tx_cache.output_path(texture_path)
+
+        return tx_output_path(texture_path)
+
+    def _find_duplicates(self, texture_stats):
+        """
+        Find the byte identical textures among the shareable ones
+        Args:
+            texture_stats = dictionnary {key : os.stat result} of the textures found on disk
+        Return:
+            dictionnary {key of a copy : key of the texture converted for it}
+        """
+
+        keys = [key for key in texture_stats if key in self.shareable]
+        paths = {self.textures[key] : key for key in keys}
+
+        duplicates = ls_texture_fingerprint.find_duplicate_files(
+            list(paths), {self.textures[key] : texture_stats[key].st_size for key in keys})
+
+        if duplicates:
+            logger.info(f"{len(duplicates)} textures are identical to another texture, they won't be converted")
+
+        return {paths[copy_path] : paths[original_path] for copy_path, original_path in duplicates.items()}
+
+    def _texture_done(self, key, success, skipped = False, deduplicated = False, failure = "tool_error", timing = None):
+        """
+        Store the result of a texture and report the materials that don't wait for any other texture
+        The copies of the texture are done at the same time
+        Args:
+            key = normalized path of the texture
+            success = True if the .tx file is available
+            skipped = True if the texture was up to date
+            deduplicated = True if the texture uses the .tx of an identical texture
+            failure = kind of failure counted when the texture failed : unreadable, tool_error or exception
+            timing = metrics measured for the texture, E.g : {"queue_wait" : 0.5, "run_time" : 12.1, "input_bytes" : 1024}
+        """
+
+        texture_path = self.textures[key]
+        self.results[texture_path] = success
+
+        if deduplicated:
+            status = "deduplicated"
+        elif skipped:
+            status = "skipped"
+        elif success:
+            status = "converted"
+        else:
+            status = failure
+            self.failures[failure] = self.failures.get(failure, 0) + 1
+
+        self.metrics[texture_path] = {"status" : status, **(timing or {})}
+
+        if success and self.tx_cache:
+            self.tx_cache.touch(self.tx_outputs[texture_path])
+
+        if deduplicated:
+            self.deduplicated += 1
+        elif skipped:
+            self.skipped += 1
+        elif success:
+            self.converted += 1
+        else:
+            self.failed += 1
+
+        if self.progress_callback:
+            self.progress_callback(texture_path, success)
+
+        for material in self.texture_materials.get(key, []):
+            pending = self.material_pending.get(material)
+
+            if pending is None:
+                continue
+
+            pending.discard(key)
+
+            if not pending:
+                self._material_done(material)
+
+        for copy_key in self.copies.pop(key, []):
+            self._texture_done(copy_key, success, deduplicated = True, failure = failure)
+
+    def _material_done(self, material):
+        """
+        Report a material whose textures are all done
+        """
+
+        # Only report each material once
+        if self.material_pending.pop(material, None) is None:
+            return
+
+        if self.material_callback:
+            self.material_callback(material)
+
+    def _timed_conversion(self, texture_path):
+        """
+        Convert a texture and time it in the worker thread, the times come back with the result
+        so the threads never write any shared counter
+        Return:
+            tuple = (True if the conversion succeeded, start time, end time)
+        """
+
+        conversion_start = time.time()
+        success = self._convert_single_texture(texture_path)
+
+        return success, conversion_start, time.time()
+
+    def _convert_single_texture(self, texture_path):
+        """
+        Convert one texture with imaketx
+        Args:
+            texture_path = full path of the texture to convert
+        Return:
+            True if the conversion succeeded
+        """
+
+        thread_id = threading.current_thread().ident
+        start_time = time.time()
+
+        try:
+            logger.info(f"Thread {thread_id} : Starting conversion of {os.path.basename(texture_path)}")
+
+            # Setup the outfile for the imaketx tool, the cache folder of the texture may not exist yet
+            output_path = self._output_path(texture_path)
+            os.makedirs(os.path.dirname(output_path), exist_ok = True)
+
+            command = [self.tool_path, texture_path, output_path, "--newer"]
+            result = subprocess.run(command, capture_output = True, text = True)
+
+            duration = round(time.time() - start_time, 2)
+
+            if result.returncode == 0:
+                logger.info(f"Thread {thread_id} : Completed conversion of {os.path.basename(texture_path)} in {duration} seconds")
+                return True
+            else:
+                logger.error(f"Thread {thread_id} : Failed to convert {os.path.basename(texture_path)} in {result.stderr}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Thread {thread_id} : Error converting {os.path.basename(texture_path)}: {str(e)}")
+            return False
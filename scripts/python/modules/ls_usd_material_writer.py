@@ -0,0 +1,150 @@
+from pxr import Sdf, Tf
+
+from modules import ls_mtlx_writer
+
+# USD value type of each MaterialX type
+USD_TYPES = {
+    "float" : Sdf.ValueTypeNames.Float,
+    "color3" : Sdf.ValueTypeNames.Color3f,
+    "vector3" : Sdf.ValueTypeNames.Float3,
+    "filename" : Sdf.ValueTypeNames.Asset,
+    "surfaceshader" : Sdf.ValueTypeNames.Token,
+    "displacementshader" : Sdf.ValueTypeNames.Token
+}
+
+def _define_prim(parent_spec, name, type_name):
+    """
+    Define a prim spec, reusing the one already authored in the layer
+    Args:
+        parent_spec = Sdf.PrimSpec or Sdf.Layer.pseudoRoot
+        name = name of the prim
+        type_name = schema of the prim, E.g : Material
+    Return:
+        Sdf.PrimSpec
+    """
+
+    prim_spec = parent_spec.nameChildren.get(name)
+
+    if prim_spec is None:
+        prim_spec = Sdf.PrimSpec(parent_spec, name, Sdf.SpecifierDef, type_name)
+
+    return prim_spec
+
+def _create_attribute(prim_spec, name, type_name, variability = Sdf.VariabilityVarying):
+    """
+    Create an attribute spec, reusing the one already authored on the prim
+    """
+
+    attribute_spec = prim_spec.attributes.get(name)
+
+    if attribute_spec is None:
+        attribute_spec = Sdf.AttributeSpec(prim_spec, name, type_name, variability)
+
+    return attribute_spec
+
+def _connect(attribute_spec, target_path):
+    """
+    Set the connection of an input or output attribute
+    """
+
+    attribute_spec.connectionPathList.explicitItems = [target_path]
+
+def author_material(parent_spec, graph):
+    """
+    Author a UsdShade material with its MaterialX shaders directly in the layer
+    Args:
+        parent_spec = Sdf.PrimSpec the material is created under
+        graph = ls_mtlx_writer.MaterialGraph of the material
+    Return:
+        Sdf.PrimSpec of the material
+    """
+
+    material_spec = _define_prim(parent_spec, Tf.MakeValidIdentifier(graph.name), "Material")
+    material_path = material_spec.path
+
+    # Prim names of the shaders, the graph names are not always valid USD identifiers
+    prim_names = {node["name"] : Tf.MakeValidIdentifier(node["name"]) for node in graph.nodes}
+
+    for node in graph.nodes:
+        shader_spec = _define_prim(material_spec, prim_names[node["name"]], "Shader")
+
+        shader_id = _create_attribute(shader_spec, "info:id", Sdf.ValueTypeNames.Token, Sdf.VariabilityUniform)
+        shader_id.default = node["nodedef"]
+
+        _create_attribute(shader_spec, "outputs:out", USD_TYPES[node["type"]])
+
+        for input_name, input_type, source, colorspace in node["inputs"]:
+            input_spec = _create_attribute(shader_spec, f"inputs:{input_name}", USD_TYPES[input_type])
+
+            if "nodename" in source:
+                target = material_path.AppendChild(prim_names[source["nodename"]]).AppendProperty("outputs:out")
+                _connect(input_spec, target)
+            elif input_type == "filename":
+                input_spec.default = Sdf.AssetPath(source["value"])
+            else:
+                input_spec.default = source["value"]
+
+            if colorspace:
+                input_spec.SetInfo("colorSpace", colorspace)
+
+    # Material outputs for the MaterialX render context
+    surface_output = _create_attribute(material_spec, "outputs:mtlx:surface", Sdf.ValueTypeNames.Token)
+    _connect(surface_output, material_path.AppendChild(prim_names[graph.surface]).AppendProperty("outputs:out"))
+
+    if graph.displacement:
+        displacement_output = _create_attribute(material_spec, "outputs:mtlx:displacement", Sdf.ValueTypeNames.Token)
+        _connect(displacement_output, material_path.AppendChild(prim_names[graph.displacement]).AppendProperty("outputs:out"))
+
+    return material_spec
+
+def author_materials(layer, texture_list, root, material_root = "/materials", material_names = None, use_tx = False):
+    """
+    Author the materials of a texture index in a USD layer
+    All the edits are batched in a single Sdf.ChangeBlock so the layer only sends one change notification
+    Args:
+        layer = Sdf.Layer receiving the materials
+        texture_list = materials of the texture index
+        root = the texture folder the index was built from
+        material_root = scope where the materials are created, E.g : /ASSET/mtl
+        material_names = materials to author, all of them if not given
+        use_tx = point at the .tx files instead of the source textures
+    Return:
+        list of the authored material paths
+    """
+
+    material_names = list(texture_list) if material_names is None else material_names
+    material_paths = []
+
+    with Sdf.ChangeBlock():
+        # Create the scopes leading to the material root
+        parent_spec = layer.pseudoRoot
+        for name in Sdf.Path(material_root).pathString.strip("/").split("/"):
+            parent_spec = _define_prim(parent_spec, name, "Scope")
+
+        for material_name in material_names:
+            graph = ls_mtlx_writer.material_graph(material_name, texture_list[material_name], root, use_tx)
+            material_paths.append(author_material(parent_spec, graph).path)
+
+    return material_paths
+
+def write_material_layer(file_path, texture_list, root, material_root = "/materials", material_names = None, use_tx = False):
+    """
+    Write the materials of a texture index in a new USD layer file
+    Args:
+        file_path = path of the layer to write, E.g : asset_materials.usda
+        other arguments = see author_materials
+    Return:
+        Sdf.Layer written
+    """
+
+    layer = Sdf.Layer.FindOrOpen(file_path)
+
+    if layer:
+        layer.Clear()
+    else:
+        layer = Sdf.Layer.CreateNew(file_path)
+
+    author_materials(layer, texture_list, root, material_root, material_names, use_tx)
+    layer.Save()
+
+    return layer
@@ -1,11 +1,114 @@
 import hou
 import os
+import queue
 import shutil
 import platform
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from PySide2 import QtWidgets, QtCore, QtUiTools
 
+def scan_directory(folder):
+    """
+    List a folder once with os.scandir, the entry types come with the listing instead of an extra stat per entry
+    Args:
+        folder = path of the folder on disk
+    Return:
+        tuple = (size in bytes of the files directly inside the folder, list of the sub folder paths)
+    """
+
+    size = 0
+    sub_folders = []
+
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks = False):
+                        sub_folders.append(entry.path)
+                    elif entry.is_file():
+                        size += entry.stat().st_size
+                except OSError:
+                    continue
+
+    except OSError:
+        pass
+
+    return size, sub_folders
+
+def folder_sizes(folders, executor):
+    """
+    Measure folders and all their sub folders, every folder is listed once as its own task of the executor
+    Large trees are spread over the threads too, the sub folders are queued as soon as their parent is listed
+    Args:
+        folders = paths of the folders to measure
+        executor = concurrent.futures executor running the listings
+    Return:
+        dictionnary {folder : size in bytes} for the given folders and all their sub folders
+    """
+
+    listings = {}
+    submitted = set()
+    results = queue.Queue()
+
+    def submit(folder):
+        if folder in submitted:
+            return
+
+        submitted.add(folder)
+        future = executor.submit(scan_directory, folder)
+        future.add_done_callback(lambda future, folder = folder : results.put((folder, future)))
+
+    for folder in folders:
+        submit(folder)
+
+    while len(listings) < len(submitted):
+        folder, future = results.get()
+        listings[folder] = future.result()
+
+        for sub_folder in listings[folder][1]:
+            submit(sub_folder)
+
+    # Add the sizes up from the deepest folders
+    sizes = {}
+
+    for folder in sorted(listings, key = lambda folder : folder.count(os.sep), reverse = True):
+        size, sub_folders = listings[folder]
+        sizes[folder] = size + sum(sizes.get(sub_folder, 0) for sub_folder in sub_folders)
+
+    return sizes
+
+def list_versions(cache_dir):
+    """
+    List the version folders of a cache, the folders named v followed by the version number
+    Args:
+        cache_dir = folder that contains the version folders
+    Return:
+        list of the version numbers, raises OSError if the folder can't be listed
+    """
+
+    versions = []
+
+    with os.scandir(cache_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith("v") and entry.is_dir():
+                try:
+                    versions.append(int(entry.name[1:]))
+                except ValueError:
+                    continue
+
+    return versions
+
+def file_size(file_path):
+    """
+    Get the size of a file, 0 if it doesn't exist
+    """
+
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
 class CacheManager(QtWidgets.QWidget):
 
     # Class Constant
@@ -15,6 +118,9 @@ class CacheManager(QtWidgets.QWidget):
     MB = KB*1024
     GB = MB*1024
 
+    # Threads reading the cache folders, each stat is a round trip on a network share
+    FILE_SYSTEM_WORKERS = 16
+
     CACHE_NODES = {
         "rop_alembic" : "filename",
         "rop_geometry" : "sopoutput",
@@ -116,6 +222,9 @@ class CacheManager(QtWidgets.QWidget):
             self.cache_tree.clear()
             self.cache_data = []
 
+            # Nodes found in the scene with their cache file, the file system is only read once they are all known
+            scanned_nodes = []
+
             # Fecth all the nodes in the scene. store the node and the output parm
             for node_type, parm_name in self.CACHE_NODES.items():
                 # Find the nodes of cache category among all the nodes in the scene (cfr CACHE_NODES dict)
@@ -131,6 +240,8 @@ class CacheManager(QtWidgets.QWidget):
                         for node in cache_nodes:
 
                             cache_path = node.parm(parm_name).eval()                            
+                            # The evaluated path reads the files, the displayed one can be shortened with $JOB
+                            file_path = cache_path
                             
                             # check the env vars and shortens the cache path if the path is inside the env vars
                             env_var = hou.text.expandString("$JOB")
@@ -152,15 +263,17 @@ class CacheManager(QtWidgets.QWidget):
                                 "node_type" : node_type_name,
                                 "node_cache_path" : cache_path,
                                 "node_current_version" : current_version,
-                                "node_other_version" : self._get_other_version(current_version, cache_path),
-                                "node_last_modified" : self._get_last_modified(cache_path),
-                                "node_total_size" : self._get_total_size(cache_path, node_path)[0],
-                                "unit" : self._get_total_size(cache_path, node_path)[1],
                                 "node_state" : node_state
                             }
 
-                            self._add_to_tree(node_data)
-                            self.cache_data.append(node_data) 
+                            scanned_nodes.append((node_data, file_path, self._is_sequence(node_path)))
+
+            # Versions, dates and sizes of all the caches, read in parallel
+            self._gather_file_stats(scanned_nodes)
+
+            for node_data, file_path, sequence in scanned_nodes:
+                self._add_to_tree(node_data)
+                self.cache_data.append(node_data) 
 
             self._update_statistics()
 
@@ -191,7 +304,7 @@ class CacheManager(QtWidgets.QWidget):
         item.setText(4, str(node_data["node_current_version"]))
         item.setText(5, str(node_data["node_other_version"]))
         item.setText(6, node_data["node_last_modified"])
-        item.setText(7, str(node_data["node_total_size"]) + " " + node_data["unit"])
+        item.setText(7, self._format_size(node_data["node_total_size"]))
         item.setText(8, node_data["node_state"])
 
     def _get_node_details(self, node):
@@ -239,27 +352,26 @@ class CacheManager(QtWidgets.QWidget):
         except AttributeError:
             return "n/a"
 
-    def _get_other_version(self, current_version, cache_path):
+    def _get_other_version(self, current_version, cache_path, listing = None):
         """
         Get a list of version folders in the cache directory
+        Args:
+            current_version = version of the cache node, "n/a" if the node has no versionning
+            cache_path = path of the cache on disk
+            listing = future of list_versions started by the scan, the cache directory is listed here if not given
         """
 
         try:
             if current_version != "n/a":
                 
-                # Get the directory that contains the caches
-                cache_dir = os.path.dirname(os.path.split(cache_path)[0])
-                
                 #find all the version folder by checking which begins with the letter V
-                version =  []
+                if listing is not None:
+                    version = listing.result()
+                else:
+                    # Get the directory that contains the caches
+                    cache_dir = os.path.dirname(os.path.split(hou.text.expandString(cache_path))[0])
+                    version = list_versions(cache_dir)
 
-                for item in os.listdir(cache_dir):
-                    if os.path.isdir(os.path.join(cache_dir, item)) and item.startswith("v"):
-                        try:
-                            version_number = int(item[1:])
-                            version.append(version_number)
-                        except ValueError:
-                            continue
                 if len(version) == 0:
                     other_version = 0
                     self.clean_button.setEnabled(False)
@@ -429,8 +541,8 @@ class CacheManager(QtWidgets.QWidget):
         
         self.unused_versions_label.setText(f" Unused Versions : {unused_versions}")
 
-        total_bytes, size = self._get_cache_size()
-        self.total_cache_size_label.setText(f"Total Cache Size : {total_bytes} {size}")
+        total_bytes = self._get_cache_size()
+        self.total_cache_size_label.setText(f"Total Cache Size : {self._format_size(total_bytes)}")
 
     def _update_cache_details(self, current):
         """
@@ -712,85 +824,97 @@ class CacheManager(QtWidgets.QWidget):
 
         node.parm("reload").pressButton()
 
-    def _get_total_size(self, cache_path, node_path):
+    def _is_sequence(self, node_path):
         """
-        Get the total size of all cache version for a specified cache node
+        Check if a cache node writes a sequence of files or a single file
         Args:
-            path of the cache on disk and the path to the node in the network
-        Return :
-            tuple of two values : Size and Unit - e.g : 4.2, "MB"
+            node_path = path to the node in the network
+        Return:
+            True if the cache is a sequence, its whole folder is measured then
         """
 
-        try:
-            node = hou.node(node_path)
+        node = hou.node(node_path)
 
-            if not node:
-                return 0, "B"
-            
-            node_type = node.type().name()
-            frame_range = node.parm("trange")
-            if frame_range:
-                frame_range = node.parm("trange").eval()
-            elif node_type == "kinefx::characterio::2.0":
-                frame_range = node.parm("animatedpose_motionclipcliprangemode").eval()
+        if not node:
+            return False
 
-            cache_folder = os.path.dirname(cache_path)
+        node_type = node.type().name()
+        frame_range = node.parm("trange")
+        if frame_range:
+            frame_range = node.parm("trange").eval()
+        elif node_type == "kinefx::characterio::2.0":
+            frame_range = node.parm("animatedpose_motionclipcliprangemode").eval()
 
-            if not os.path.exists(cache_folder):
-                return 0, "B"
-            
-            # Check if the node handles a single file or a sequence
-            if frame_range == 0:
-                size = os.path.getsize(cache_path)
-            else:
-                # Check for all directories in the cache_path folder
-                size = 0
-                for root, dir, files in os.walk(cache_folder):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        size += os.path.getsize(file_path)
-
-            if size >= self.GB:
-                return round(size/self.GB, 2), "GB"
-            elif size >= self.MB:
-                return round(size/self.MB, 2), "MB"
-            elif size>= self.KB:
-                return round(size/self.KB, 2), "KB"
-            else:
-                return size, "B"
-            
-        except Exception as e:
-            hou.ui.displayMessage(f"Error calculating the cache size : {str(e)}", severity = hou.severityType.Error)
-            return 0, "B"
-        
-    def _get_cache_size(self):
+        return frame_range != 0
+
+    def _gather_file_stats(self, scanned_nodes):
         """
-        Get the total size of cache in the scene
+        Read the versions, last modified dates and sizes of the caches on a thread pool
+        The threads only access the file system, the results are merged back in the node data here, on the UI thread
+        Every version folder and cache folder is listed once, even when several nodes write in it
+        Args:
+            scanned_nodes = list of (node data, expanded path of the cache file, True if the cache is a sequence)
         """
-        multipliers = {
-            "B" : 1,
-            "KB" : 1024,
-            "MB" : 1024**2,
-            "GB" : 1024**3,
-            "TB" : 1024**4
-        }
 
-        total_bytes = 0
+        with ThreadPoolExecutor(max_workers = self.FILE_SYSTEM_WORKERS) as executor:
+            listings = {}
+            last_modified = []
+            single_sizes = {}
+            folders = set()
+
+            for node_data, file_path, sequence in scanned_nodes:
+                cache_dir = os.path.dirname(os.path.dirname(file_path))
+                cache_folder = os.path.dirname(file_path)
+
+                if node_data["node_current_version"] != "n/a" and cache_dir not in listings:
+                    listings[cache_dir] = executor.submit(list_versions, cache_dir)
+
+                last_modified.append(executor.submit(self._get_last_modified, file_path))
 
-        # Loop through each item in the self.cache_data
-        if len(self.cache_data) > 0:
-            for item_data in self.cache_data:
-                size = float(item_data["node_total_size"])
-                unit = item_data["unit"]
+                if sequence and cache_folder:
+                    folders.add(os.path.normpath(cache_folder))
+                elif not sequence and file_path not in single_sizes:
+                    single_sizes[file_path] = executor.submit(file_size, file_path)
 
-                # Convert to bytes
-                bytes_to_convert = size * multipliers.get(unit, 1)
-                total_bytes += bytes_to_convert
+            # The folder walks share the pool with the stats already queued
+            sizes = folder_sizes(folders, executor)
 
-            for unit in ["B","KB","MB","GB","TB"]:
-                if bytes_to_convert < 1024.0:
-                    return total_bytes, unit
-                bytes_to_convert = total_bytes / (1024.0**3)
-                return f"{bytes_to_convert:.2f}", "GB"
+            for (node_data, file_path, sequence), modified in zip(scanned_nodes, last_modified):
+                cache_dir = os.path.dirname(os.path.dirname(file_path))
+                cache_folder = os.path.dirname(file_path)
+
+                node_data["node_other_version"] = self._get_other_version(node_data["node_current_version"], file_path, 
+                                                                          listings.get(cache_dir))
+                node_data["node_last_modified"] = modified.result()
+
+                if sequence:
+                    node_data["node_total_size"] = sizes.get(os.path.normpath(cache_folder), 0) if cache_folder else 0
+                else:
+                    node_data["node_total_size"] = single_sizes[file_path].result()
+
+    def _format_size(self, size):
+        """
+        Format a size in bytes for display
+        Args:
+            size = size in bytes
+        Return:
+            string with the size and its unit - e.g : 4.2 MB
+        """
+
+        if size >= self.GB:
+            return f"{round(size/self.GB, 2)} GB"
+        elif size >= self.MB:
+            return f"{round(size/self.MB, 2)} MB"
+        elif size >= self.KB:
+            return f"{round(size/self.KB, 2)} KB"
         else:
-            return f"0", "B"
\ No newline at end of file
+            return f"{size} B"
+        
+    def _get_cache_size(self):
+        """
+        Get the total size of cache in the scene
+        Return:
+            size in bytes
+        """
+
+        return sum(item_data["node_total_size"] for item_data in self.cache_data)
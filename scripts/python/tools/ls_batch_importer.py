@@ -1,9 +1,12 @@
 import hou
 
+from modules import ls_node_batch
+
 ''' Batch import of geometry files. 
     The user is requested to choose between multiple source unit to scale the object correctly at import. 
 '''
     
+@ls_node_batch.node_build_batch("Batch Import")
 def batch_import():
     # Declare Variables
     hip_file = hou.text.expandString("$HIP")
@@ -5,10 +5,16 @@ import voptoolutils
 from pxr import UsdGeom
 from tools import ls_tex_to_mtlx
 from modules import ls_misc_utils as mu
+from modules import ls_node_batch
+from modules import ls_texture_index
 
-def create_component_builder(selected_directory = None):
+@ls_node_batch.node_build_batch("Create Component Builder")
+def create_component_builder(selected_directory = None, usd_materials = False):
     """
     Main function to create the component builder based on a provided asset
+    Args:
+        selected_directory = the asset file, a file browser is opened if not given
+        usd_materials = author the materials directly in a USD layer instead of a Material Library LOP
     """
 
     # Get the file
@@ -34,15 +40,20 @@ def create_component_builder(selected_directory = None):
             asset_name =  filename.split(".")[0]
             asset_extension = filename.split(".")[-1]
 
+            # The USD layer needs textures, the placeholder materials are created in a material library
+            use_usd_layer = usd_materials and os.path.exists(folder_texture)
+
             # Create nodes for the component builder setup
             comp_geo = stage_context.createNode("componentgeometry", f"{asset_name}_geo")
-            material_library = stage_context.createNode("materiallibrary", f"{asset_name}_mtl")
+            if use_usd_layer:
+                material_library = stage_context.createNode("sublayer", f"{asset_name}_mtl")
+            else:
+                material_library = _create_material_library(stage_context, asset_name)
             comp_material = stage_context.createNode("componentmaterial", f"{asset_name}_assign")
             comp_out = stage_context.createNode("componentoutput", f"{asset_name}_asset")
 
             # Set parms
             comp_geo.parm("geovariantname").set(asset_name)
-            material_library.parm("matpathprefix").set("/ASSET/mtl/")
             comp_material.parm("nummaterials").set(0)
 
             # Create auto assignment for materials
@@ -75,7 +86,22 @@ def create_component_builder(selected_directory = None):
             _prepare_imported_asset(comp_geo, asset_name, asset_extension, path, comp_out)
 
             # Create materials with the tex_to_mtlx script
-            material_amount = _create_materials(folder_texture, material_library, comp_geo)
+            if use_usd_layer:
+                layer_path = f"{path}/{asset_name}_materials.usda"
+                material_amount = _create_usd_materials(folder_texture, material_library, layer_path)
+
+                # Nothing was authored, E.g : no valid texture set in maps/, use a Material Library instead
+                if not material_amount[1]:
+                    material_library.destroy()
+                    material_library = _create_material_library(stage_context, asset_name)
+                    comp_material.setInput(1, material_library)
+
+                    nodes_to_layout[1] = material_library
+                    stage_context.layoutChildren(items = nodes_to_layout)
+                    use_usd_layer = False
+
+            if not use_usd_layer:
+                material_amount = _create_materials(folder_texture, material_library, comp_geo)
 
             # Add network boxes to organize nodes
             mu.create_organized_net_note(nodes_to_layout)
@@ -92,6 +118,21 @@ def create_component_builder(selected_directory = None):
         hou.ui.displayMessage(f"An error happened creating component builder : {str(e)}", 
                               severity = hou.severityType.Error)
 
+def _create_material_library(stage_context, asset_name):
+    """
+    Create the Material Library LOP holding the asset materials
+    Args:
+        stage_context = the LOP network where the component builder is created
+        asset_name = asset's name
+    Return:
+        the material library node
+    """
+
+    material_library = stage_context.createNode("materiallibrary", f"{asset_name}_mtl")
+    material_library.parm("matpathprefix").set("/ASSET/mtl/")
+
+    return material_library
+
 def _prepare_imported_asset(parent, name, extension, path, out_node):
     """
     Creates the network layout for the default, proxy and sim outputs
@@ -348,16 +389,22 @@ def _create_materials(folder_texture, material_library, comp_geo):
                 }
                     
                 # Create the materials for each texture set
-                for material_name in texture_list:
+                try:
+                    with ls_node_batch.node_build_batch("Create MaterialX"):
+                        for material_name in texture_list:
+
+                            create_material = ls_tex_to_mtlx.MtlxMaterial(
+                                material_name,
+                                **common_data,
+                                texture_list = texture_list
+                            )
 
-                    create_material = ls_tex_to_mtlx.MtlxMaterial(
-                        material_name,
-                        **common_data,
-                        texture_list = texture_list
-                    )
+                            create_material.create_materialx()
+                            material_amount = len(texture_list)
 
-                    create_material.create_materialx()
-                    material_amount = len(texture_list)
+                finally:
+                    # Never leave the prototype network in the scene when a build fails
+                    ls_tex_to_mtlx.MtlxMaterial.release_prototype()
 
                 return True, material_amount
 
@@ -373,6 +420,42 @@ def _create_materials(folder_texture, material_library, comp_geo):
         hou.ui.displayMessage(f"Error creating the materials: {str(e)}", severity = hou.severityType.Error)
         return False, 0
     
+def _create_usd_materials(folder_texture, sublayer_node, layer_path):
+    """
+    Author the asset materials directly in a USD layer and load it with a sublayer node
+    Args:
+        folder_texture = the folder that contains the textures for the asset
+        sublayer_node = the sublayer LOP loading the material layer
+        layer_path = the USD layer file to write
+    Return:
+        tuple = (True if materials were created, amount of materials), no layer is written when there is no texture set
+    """
+
+    # Imported here so the node based path doesn't need the USD writer
+    from modules import ls_usd_material_writer
+
+    try:
+        texture_list = ls_texture_index.build_texture_index(folder_texture)["materials"]
+
+        # The caller falls back to the Material Library
+        if not texture_list:
+            return False, 0
+
+        layer = ls_usd_material_writer.write_material_layer(layer_path, texture_list, folder_texture, 
+                                                            material_root = "/ASSET/mtl")
+        material_amount = len(layer.GetPrimAtPath("/ASSET/mtl").nameChildren)
+
+        if not material_amount:
+            return False, 0
+
+        sublayer_node.parm("filepath1").set(layer_path)
+
+        return True, material_amount
+
+    except Exception as e:
+        hou.ui.displayMessage(f"Error creating the materials: {str(e)}", severity = hou.severityType.Error)
+        return False, 0
+
 def _create_placeholder_materials(material_library, comp_geo):
     """
     Creates placeholder materials in case no textures related to the asset are found
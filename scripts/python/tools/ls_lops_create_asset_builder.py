@@ -5,6 +5,7 @@ from PySide2 import QtCore, QtUiTools, QtWidgets
 from tools import ls_lops_asset_builder as lab
 from tools import ls_lops_light_rig as llr
 from tools import ls_lops_create_lookdev_camera as llc
+from modules import ls_node_batch
 
 class CreateAssetBuilder(QtWidgets.QMainWindow):
 
@@ -31,12 +32,13 @@ class CreateAssetBuilder(QtWidgets.QMainWindow):
         self.ui = QtUiTools.QUiLoader().load(scriptpath, parentWidget = self)
         self.setParent(hou.qt.mainWindow(), QtCore.Qt.Window)
         self.setWindowTitle("LS Create Asset Builder 1.0")
-        self.setMaximumSize(360,430)
+        self.setMaximumSize(360,450)
 
         # SET CONNECTIONS
         # Asset
         self.btn_asset = self.ui.findChild(QtWidgets.QToolButton, "btn_asset")
         self.led_asset = self.ui.findChild(QtWidgets.QLineEdit, "led_asset")
+        self.chkb_usd_materials = self.ui.findChild(QtWidgets.QCheckBox, "chkb_usd_materials")
 
         # Light Rig   
         self.chkb_create_light_rig = self.ui.findChild(QtWidgets.QCheckBox, "chkb_create_light_rig")
@@ -59,6 +61,7 @@ class CreateAssetBuilder(QtWidgets.QMainWindow):
         # CREATE INPUT LIST
         self.user_input = [
             self.led_asset,
+            self.chkb_usd_materials,
             self.chkb_create_light_rig, 
             self.chkb_three_points,
             self.chkb_dome,
@@ -122,6 +125,7 @@ class CreateAssetBuilder(QtWidgets.QMainWindow):
         if filename and asset_extension in valid_extensions:
             self.led_asset.setEnabled(True)
             self.led_asset.setText(filename)
+            self.chkb_usd_materials.setEnabled(True)
             self.chkb_create_light_rig.setEnabled(True)
             self.chkb_create_camera_rig.setEnabled(True)  
             self.btn_create_asset.setEnabled(True)
@@ -129,6 +133,7 @@ class CreateAssetBuilder(QtWidgets.QMainWindow):
         else:
             self.led_asset.setEnabled(False)
             self.led_asset.setText("")
+            self.chkb_usd_materials.setEnabled(False)
             self.chkb_create_light_rig.setEnabled(False)
             self.chkb_create_camera_rig.setEnabled(False)  
             self.btn_create_asset.setEnabled(False)
@@ -219,13 +224,14 @@ class CreateAssetBuilder(QtWidgets.QMainWindow):
         # Refresh the list of checkbox state
         self.camera_options = [self.chkb_include_spheres.checkState(), self.chkb_include_checker.checkState()]
 
+    @ls_node_batch.node_build_batch("Create Asset Builder")
     def create_asset(self, asset_name, selected_directory, light_options, hdr, camera_options):
         """
         Create the asset builder depending on the user selections
         """
 
         if selected_directory:
-            lab.create_component_builder(selected_directory)
+            lab.create_component_builder(selected_directory, usd_materials = self.chkb_usd_materials.isChecked())
 
             if self.chkb_create_camera_rig.checkState():
                 sphere_bool = camera_options[0]
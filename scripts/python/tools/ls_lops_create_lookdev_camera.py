@@ -3,7 +3,9 @@ import voptoolutils
 
 from modules import ls_misc_utils
 from modules import ls_misc_utils as mu
+from modules import ls_node_batch
 
+@ls_node_batch.node_build_batch("Create Lookdev Camera")
 def create_lookdev_camera_node(asset_name = None, spheres = True, checker = True):
     """
     Create a Python node with predefined script to create a look dev camera rig
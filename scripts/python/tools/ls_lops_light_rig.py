@@ -2,7 +2,9 @@ import hou
 import numpy as np
 
 from modules import ls_misc_utils as mu
+from modules import ls_node_batch
 
+@ls_node_batch.node_build_batch("Create Light Rig")
 def create_light_rig(asset_name = None, three_points_bool = True, dome_bool = True, hdr_file = None):
     """
     Creates a three point light setup around selected object in Solaris
@@ -1,9 +1,12 @@
 import hou
 
+from modules import ls_node_batch
+
 ''' This function splits a geometry in multiple separate parts based on a specified attribute.
     The user is asked to choose between point and primitive attribute and have to specify the name of the attribute to use.
 '''
 
+@ls_node_batch.node_build_batch("Split Geometry")
 def split_geo():
         
     # Fetch selected Node.
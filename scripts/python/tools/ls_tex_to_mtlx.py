@@ -1,16 +1,27 @@
 import hou
 import os
-import re
-import subprocess
 import time
 import logging
-import threading
 
+from contextlib import nullcontext
 from PySide2 import QtWidgets, QtGui, QtCore
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules import ls_texture_index
+from modules import ls_texture_probe
+from modules import ls_tx_converter
+from modules import ls_texture_preview
+from modules import ls_texture_watch
+from modules import ls_mtlx_writer
+from modules import ls_node_batch
 
 class TxToMtlx (QtWidgets.QMainWindow):
+
+    # Output modes
+    OUTPUT_NODES = "Houdini Nodes"
+    OUTPUT_FILES = "MaterialX Files (one per material)"
+    OUTPUT_LIBRARY = "MaterialX Library (one file)"
+
+    # Amount of updated materials detailed in the report
+    SYNC_REPORT_LIMIT = 20
     
     def __init__(self):
         super().__init__()
@@ -45,23 +56,38 @@ class TxToMtlx (QtWidgets.QMainWindow):
         self.folder_path = None
 
         # Texture related constant
-        self.TEXTURE_EXT = [".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".exr", ".tga"]
-        self.TEXTURE_TYPE = [
-            "diffuse", "diff", "albedo", "alb", "base", "col", "color", "basecolor",
-            "metallic", "metalness", "metal", "mtl", "met",
-            "specularity", "specular", "spec", "spc",
-            "roughness", "rough", "rgh",
-            "glossiness", "glossy", "gloss", "translucency",
-            "transmission", "transparency", "trans",
-            "emission", "emissive", "emit", "emm", "alpha", "opacity", "opac",
-            "ao", "ambient_occlusion", "occlusion", "cavity"
-            "bump", "bmp", "height", "displacement", "displace", "disp", "dsp", "heightmap", "user", "mask"
-            "normal", "nor", "nr", "nrml", "norm"
-        ]
+        self.TEXTURE_EXT = ls_texture_index.TEXTURE_EXT
+        self.TEXTURE_ALIASES = ls_texture_index.TEXTURE_ALIASES
 
         self.texture_list = {}
-        self.UDIM_PATTERN = re.compile(r"(?:_)?(\d{4}())")
-        self.SIZE_PATTERN = re.compile(r"(?:_)?(\d+[Kk])")
+        self.texture_index = None
+
+        # MaterialX documents output
+        self.mtlx_output_path = None
+        self.materials_to_write = []
+
+        # Diff of the materials updated in place
+        self.sync_report = []
+
+        # Background TX conversion
+        self.tx_thread = None
+        self.tx_worker = None
+
+        # Background preview generation, runs before the TX conversion
+        self.preview_thread = None
+        self.preview_worker = None
+        self.preview_summary = None
+        self.materials_to_create = []
+
+        # Watch mode, the changes found while a job runs are queued
+        self.watch_thread = None
+        self.watch_worker = None
+        self.watch_job = False
+        self.watch_queue = None
+
+        # Houdini tools of the running job, found before it starts
+        self.imaketx_path = None
+        self.image_tool_path = None
  
     def _setup_help_section(self):
         '''Setup the help button section'''
@@ -89,6 +115,30 @@ class TxToMtlx (QtWidgets.QMainWindow):
         self.bt_open_folder.setMinimumHeight(40)
         self.bt_open_folder.setEnabled(False)
         self.material_layout.addWidget(self.bt_open_folder, 0, 1)
+        # OUTPUT MODE
+        self.cb_output = QtWidgets.QComboBox()
+        self.cb_output.addItems([self.OUTPUT_NODES, self.OUTPUT_FILES, self.OUTPUT_LIBRARY])
+        self.material_layout.addWidget(self.cb_output, 2, 0, 1, 2)
+        # SYNC CHECKBOX
+        self.chk_sync = QtWidgets.QCheckBox("Update existing materials in place")
+        self.chk_sync.setToolTip("Only add, remove or repath the texture nodes that changed, the other tweaks are kept")
+        self.material_layout.addWidget(self.chk_sync, 3, 0, 1, 2)
+        # DEDUPE CHECKBOX
+        self.chk_dedupe = QtWidgets.QCheckBox("Convert identical textures once")
+        self.chk_dedupe.setToolTip("Byte identical textures share a single .tx file")
+        self.chk_dedupe.setEnabled(False)
+        self.material_layout.addWidget(self.chk_dedupe, 4, 0, 1, 2)
+        # PREVIEW CHECKBOX
+        self.chk_preview = QtWidgets.QCheckBox("Generate 1K and 2K preview textures")
+        self.chk_preview.setToolTip("The materials get a Texture Resolution parameter to switch between the previews and the full resolution")
+        self.material_layout.addWidget(self.chk_preview, 5, 0, 1, 2)
+        # WATCH CHECKBOX
+        self.chk_watch = QtWidgets.QCheckBox("Watch folder")
+        self.chk_watch.setToolTip("Update the materials in place when their textures are added or changed in the folder")
+        self.chk_watch.setEnabled(False)
+        self.material_layout.addWidget(self.chk_watch, 6, 0)
+        self.lb_watch = QtWidgets.QLabel("")
+        self.material_layout.addWidget(self.lb_watch, 6, 1)
         
         self.main_layout.addLayout(self.material_layout)
         
@@ -110,14 +160,29 @@ class TxToMtlx (QtWidgets.QMainWindow):
         self.header_layout.addWidget(self.bt_sel_all)
         self.header_layout.addWidget(self.bt_sel_non)
 
+        # FILTER LAYOUT
+        self.filter_layout = QtWidgets.QHBoxLayout()
+
+        self.le_filter = QtWidgets.QLineEdit()
+        self.le_filter.setPlaceholderText("Filter by name")
+        self.cb_completeness = QtWidgets.QComboBox()
+        self.cb_completeness.addItems(list(MaterialListModel.COMPLETENESS_FILTERS))
+        self.cb_completeness.setToolTip("Complete materials have a color, a roughness and a normal or bump texture")
+
+        self.filter_layout.addWidget(self.le_filter)
+        self.filter_layout.addWidget(self.cb_completeness)
+
         # MATERIAL LIST
         self.material_list = QtWidgets.QListView()
         self.material_list.setMinimumHeight(200)
-        self.model = QtGui.QStandardItemModel()
+        # Every row has the same height, the view doesn't measure each row of large libraries
+        self.material_list.setUniformItemSizes(True)
+        self.model = MaterialListModel(self)
         self.material_list.setModel(self.model)
         self.material_list.setSelectionMode(QtWidgets.QListView.MultiSelection)
 
         self.list_layout.addLayout(self.header_layout)
+        self.list_layout.addLayout(self.filter_layout)
         self.list_layout.addWidget(self.material_list)
         self.main_layout.addLayout(self.list_layout)
     
@@ -135,8 +200,13 @@ class TxToMtlx (QtWidgets.QMainWindow):
         self.progress_bar.setMinimumHeight(30)
         self.progress_bar.setValue(0)
         
+        # Cancel Button
+        self.bt_cancel = QtWidgets.QPushButton("Cancel")
+        self.bt_cancel.setEnabled(False)
+
         self.create_layout.addWidget(self.bt_create)
         self.create_layout.addWidget(self.progress_bar)
+        self.create_layout.addWidget(self.bt_cancel)
         
         self.main_layout.addLayout(self.create_layout)        
     
@@ -148,7 +218,12 @@ class TxToMtlx (QtWidgets.QMainWindow):
         self.checkbox.stateChanged.connect(self.on_checkbox)
         self.bt_sel_all.clicked.connect(self.select_all_materials)
         self.bt_sel_non.clicked.connect(self.deselect_all_materials)
+        self.le_filter.textChanged.connect(self.filter_materials)
+        self.cb_completeness.currentTextChanged.connect(self.filter_materials)
+        self.chk_watch.stateChanged.connect(self.on_watch)
+        self.cb_output.currentTextChanged.connect(self.on_output_mode)
         self.bt_create.clicked.connect(self.create_materials)
+        self.bt_cancel.clicked.connect(self.cancel_creation)
 
     def instructions_menu(self):
         """Opens a pop up window with the how to use the tools information"""
@@ -200,6 +275,17 @@ class TxToMtlx (QtWidgets.QMainWindow):
                 return
             else:
                 self.bt_open_folder.setEnabled(True)
+                self._update_watch_enabled()
+
+    def on_output_mode(self, output_mode):
+        """
+        The MaterialX documents don't need a material library, the folder can be opened right away
+        """
+
+        self.bt_open_folder.setEnabled(output_mode != self.OUTPUT_NODES or self.node_lib is not None)
+        self.chk_sync.setEnabled(output_mode == self.OUTPUT_NODES)
+        self.chk_preview.setEnabled(output_mode == self.OUTPUT_NODES)
+        self._update_watch_enabled()
 
     def open_folder(self):
         """
@@ -211,10 +297,15 @@ class TxToMtlx (QtWidgets.QMainWindow):
         self.folder_path = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Texture Folder")
 
         if self.folder_path:
+            # Force a new scan of the folder, the watch mode follows the folder that was loaded
+            self.texture_index = None
+            self.chk_watch.setChecked(False)
+
             if self.folder_with_texture(self.folder_path):
                 self.bt_create.setEnabled(True)
                 self.checkbox.setEnabled(True)
                 self.get_texture_details(self.folder_path)
+                self._update_watch_enabled()
             else:
                 self.bt_create.setEnabled(False)
                 self.checkbox.setEnabled(False)
@@ -223,314 +314,1012 @@ class TxToMtlx (QtWidgets.QMainWindow):
                     severity = hou.severityType.Error
                 )
 
-    def get_texture_details(self, path):
+    def get_texture_details(self, path):
+        """
+        Get the details for the textures present in the selected folder
+        """
+
+        try:
+
+            # Reuse the index built by the folder check, otherwise scan the folder once
+            texture_index = self._get_texture_index(path)
+            self.texture_list = texture_index["materials"]
+
+            # Update UI, the model reads the materials straight from the index
+            self.model.set_materials(self.texture_list)
+            self.filter_materials()
+            
+            self. bt_sel_all.setEnabled(True)
+            self. bt_sel_non.setEnabled(True)
+
+            return self.texture_list
+
+        except Exception as e:
+            hou.ui.displayMessage(f"Error retrieving the textures details : {str(e)}", 
+                                  severity = hou.severityType.Error)
+
+    def folder_with_texture(self, folder):
+        """
+        Check if the folder contains any valid texture files
+        """
+
+        if not os.path.exists(folder):
+            return False
+        
+        try:
+            texture_index = self._get_texture_index(folder)
+
+            return bool(texture_index["textures"])
+
+        except (OSError, PermissionError, ValueError) as e:
+            hou.ui.displayMessage(
+                f"Error loading the texture folder '{folder}' : {str(e)}",
+                severity = hou.severityType.Error
+            )
+
+            return False
+
+    def _get_texture_index(self, folder):
+        """
+        Get the texture index for a folder, the folder is only scanned if it is not the one already indexed
+        Args:
+            folder = the texture folder
+        Return:
+            dict = the texture index built by ls_texture_index
+        """
+
+        if self.texture_index is None or self.texture_index["root"] != folder:
+            self.texture_index = ls_texture_index.build_texture_index(folder, probe = True)
+
+        return self.texture_index
+        
+    def on_checkbox(self, state):
+        """
+        Check if the user asks for TX conversion
+        """
+
+        if state == QtCore.Qt.Checked:
+            self.mtlTX = True
+        else:
+            self.mtlTX = False
+
+        self.chk_dedupe.setEnabled(self.mtlTX)
+
+    def filter_materials(self, *args):
+        """
+        Only list the materials matching the name filter and the completeness filter
+        """
+
+        self.model.set_filter(self.le_filter.text(), self.cb_completeness.currentText())
+
+    def select_all_materials(self):
+        """
+        Select all the items present in the material list
+        """
+
+        row_count = self.model.rowCount()
+
+        if not row_count:
+            return
+
+        # A single range selection, selecting the rows one by one stalls on large libraries
+        selection = QtCore.QItemSelection(self.model.index(0, 0), self.model.index(row_count - 1, 0))
+        self.material_list.selectionModel().select(selection, QtCore.QItemSelectionModel.Select)
+
+    def deselect_all_materials(self):
+        """
+        Clear all selected item in the material list
+        """
+
+        self.material_list.clearSelection()
+
+    def create_materials(self):
+        """
+        Call the CreateMaterial class and pass all the data fetched from the user
+        """
+
+        selected_rows = self.material_list.selectedIndexes()
+
+        if len(selected_rows) == 0 :
+            hou.ui.displayMessage("Please select at least one material", severity = hou.severityType.Error)
+            return
+        
+        materials_to_create = [self.model.material_name(index.row()) for index in selected_rows]
+
+        # Get where the MaterialX documents are written
+        self.output_mode = self.cb_output.currentText()
+        self.materials_to_write = []
+        self.sync_report = []
+        self.preview_summary = None
+        self.materials_to_create = materials_to_create
+
+        if self.output_mode == self.OUTPUT_NODES and not self.node_lib:
+            hou.ui.displayMessage("Please select a material library", severity = hou.severityType.Error)
+            return
+
+        if self.output_mode == self.OUTPUT_FILES:
+            self.mtlx_output_path = QtWidgets.QFileDialog.getExistingDirectory(self, "Select the MaterialX Output Folder")
+        elif self.output_mode == self.OUTPUT_LIBRARY:
+            self.mtlx_output_path = QtWidgets.QFileDialog.getSaveFileName(
+                self, "Save the MaterialX Library", self.folder_path, "MaterialX (*.mtlx)")[0]
+
+        if self.output_mode != self.OUTPUT_NODES and not self.mtlx_output_path:
+            return
+
+        self._run_materials(materials_to_create)
+
+    def _run_materials(self, materials_to_create):
+        """
+        Build the materials, after the preview generation and the TX conversion when they are asked for
+        Args:
+            materials_to_create = list of the material names
+        """
+
+        # Find the tools before any texture is processed, a missing tool stops the job before it starts
+        self.imaketx_path = None
+        self.image_tool_path = None
+
+        try:
+            if self.mtlTX:
+                self.imaketx_path = get_imaketx_path()
+                if not self.imaketx_path:
+                    raise RuntimeError("imaketx tool not found, $HB is not set")
+
+            if self._preview_resolutions():
+                self.image_tool_path = get_image_tool_path()
+                if not self.image_tool_path:
+                    raise RuntimeError("hoiiotool not found, the preview textures can't be generated")
+
+        except RuntimeError as e:
+            self._abort_job(str(e))
+            return
+
+        # Common Data
+        self.common_data = {
+            "mtlTX" : self.mtlTX,
+            "path" : self.node_path,
+            "node" : self.node_lib,
+            "folder_path" : self.folder_path,
+            "preview_resolutions" : self._preview_resolutions(),
+            "imaketx_path" : self.imaketx_path
+        }
+
+        # Resize the textures in the background, the TX conversion starts once the previews are done
+        if self.common_data["preview_resolutions"]:
+            self._start_preview_generation(materials_to_create)
+            return
+
+        # Convert the textures in the background, the materials are built once their textures are ready
+        if self.mtlTX:
+            self._start_tx_conversion(materials_to_create)
+            return
+
+        # Set up the progress bar maximum
+        self.progress_bar.setMaximum(len(materials_to_create))
+        self.progress_bar.setValue(0)
+
+        # One undo block for the whole job, the nodes are cooked once when it ends
+        node_batch = nullcontext()
+        if self.output_mode == self.OUTPUT_NODES:
+            node_batch = ls_node_batch.node_build_batch(self._node_batch_label())
+
+        try:
+            with node_batch:
+                for key in materials_to_create:
+                    self._build_material(key)
+
+            self._finish_materials()
+
+        finally:
+            # Never leave the prototype network in the scene when a build fails
+            MtlxMaterial.release_prototype()
+
+        self._show_report("Material creation completed !" + self._sync_report_message())
+
+    def _build_material(self, material_name):
+        """
+        Create the MaterialX nodes of a material and update the progress bar
+        The materials written as MaterialX documents are only collected, the documents are written at the end
+        Args:
+            material_name = name of the material in the texture list
+        """
+
+        # Use the .tx files shared between identical textures
+        if self.tx_worker:
+            ls_texture_index.apply_tx_outputs(self.folder_path, self.texture_list[material_name], 
+                                              self.tx_worker.scheduler.tx_outputs)
+
+        if self.output_mode == self.OUTPUT_NODES:
+            create_material = MtlxMaterial(material_name, **self.common_data, texture_list = self.texture_list, convert_tx = False)
+
+            # The batch only spans this material, the background threads feed the materials between event loop iterations
+            # It is nested in the batch of the whole job when the materials are built right away
+            with ls_node_batch.node_build_batch(self._node_batch_label()):
+                # The watch mode always updates the materials in place
+                if self.chk_sync.isChecked() or self.watch_job:
+                    self.sync_report.append(create_material.sync_materialx())
+                else:
+                    create_material.create_materialx()
+        else:
+            self.materials_to_write.append(material_name)
+
+        self.progress_bar.setValue(self.progress_bar.value() + 1)
+
+    def _finish_materials(self):
+        """
+        Write the MaterialX documents or release the node prototype once all the materials are built
+        """
+
+        if self.output_mode == self.OUTPUT_NODES:
+            MtlxMaterial.release_prototype()
+            return
+
+        try:
+            ls_mtlx_writer.write_material_documents(
+                self.texture_list, 
+                self.folder_path, 
+                self.mtlx_output_path, 
+                material_names = self.materials_to_write, 
+                use_tx = self.mtlTX, 
+                single_file = self.output_mode == self.OUTPUT_LIBRARY
+            )
+
+        except OSError as e:
+            hou.ui.displayMessage(f"Error writing the MaterialX documents : {str(e)}", severity = hou.severityType.Error)
+
+    def _node_batch_label(self):
+        """
+        Get the name of the undo block of the materials built by the job
+        """
+
+        return "Sync MaterialX" if self.chk_sync.isChecked() or self.watch_job else "Create MaterialX"
+
+    def _sync_report_message(self):
+        """
+        Format the diff of the materials updated in place
+        Return:
+            the report, empty when the materials were not synced
+        """
+
+        if not self.sync_report:
+            return ""
+
+        statuses = [diff["status"] for diff in self.sync_report]
+        message = (f"\n\nUpdate : {statuses.count('updated')} updated, {statuses.count('unchanged')} unchanged, "
+                   f"{statuses.count('created')} created, {statuses.count('rebuilt')} rebuilt")
+
+        if "failed" in statuses:
+            message += f", {statuses.count('failed')} failed"
+
+        updated = [diff for diff in self.sync_report if diff["status"] == "updated"]
+
+        # Keep the message readable on large libraries
+        for diff in updated[:self.SYNC_REPORT_LIMIT]:
+            changes = [f"{change} {', '.join(channel.replace('textures', '') for channel in diff[change])}"
+                       for change in ("added", "removed", "repathed") if diff[change]]
+            message += f"\n{diff['material']} : {' | '.join(changes)}"
+
+        if len(updated) > self.SYNC_REPORT_LIMIT:
+            message += f"\n... and {len(updated) - self.SYNC_REPORT_LIMIT} more"
+
+        return message
+
+    def _preview_resolutions(self):
+        """
+        Get the preview resolutions asked by the user
+        Return:
+            list of the resolution names, None when the previews are not generated
+        """
+
+        if self.output_mode != self.OUTPUT_NODES or not self.chk_preview.isChecked():
+            return None
+
+        return list(ls_texture_preview.PREVIEW_RESOLUTIONS)
+
+    def _start_preview_generation(self, materials_to_create):
+        """
+        Resize the textures of all the materials to create with one preview scheduler running in a background thread
+        Without TX conversion the materials are built as soon as their previews are ready
+        Args:
+            materials_to_create = list of the material names
+        """
+
+        logging.basicConfig(level=logging.INFO)
+
+        scheduler = ls_texture_preview.PreviewScheduler(self.image_tool_path, 
+                                                        resolutions = self.common_data["preview_resolutions"])
+
+        for material_name in materials_to_create:
+            material = self.texture_list[material_name]
+            scheduler.add(ls_texture_index.material_texture_paths(self.folder_path, material), material = material_name, 
+                          texture_info = ls_texture_index.material_texture_info(self.folder_path, material))
+
+        # One step per texture, and one per material when they are built with the previews
+        self.progress_bar.setMaximum(len(scheduler.textures) + (0 if self.mtlTX else len(materials_to_create)))
+        self.progress_bar.setValue(0)
+
+        self.preview_thread = QtCore.QThread(self)
+        self.preview_worker = TxConversionWorker(scheduler)
+        self.preview_worker.moveToThread(self.preview_thread)
+
+        self.preview_thread.started.connect(self.preview_worker.run)
+        self.preview_worker.texture_converted.connect(self._on_texture_converted)
+        self.preview_worker.finished.connect(self._on_preview_generation_finished)
+
+        if not self.mtlTX:
+            self.preview_worker.material_ready.connect(self._build_material)
+
+        self._set_job_running(True)
+        self.preview_thread.start()
+
+    def _on_preview_generation_finished(self, preview_summary):
+        """
+        Stop the preview thread, then start the TX conversion or report the result
+        Args:
+            preview_summary = summary returned by the preview scheduler
+        """
+
+        self.preview_thread.quit()
+        self.preview_thread.wait()
+        self.preview_thread = None
+        self.preview_worker = None
+
+        self.preview_summary = preview_summary
+
+        if self.mtlTX and not preview_summary.get("cancelled"):
+            self._start_tx_conversion(self.materials_to_create)
+            return
+
+        self._set_job_running(False)
+        self._finish_materials()
+
+        message = "Material creation completed !"
+        if preview_summary.get("cancelled"):
+            message = "Material creation cancelled, only the materials with generated previews were created"
+
+        self._show_report(message + self._preview_report_message() + self._sync_report_message())
+
+    def _preview_report_message(self):
+        """
+        Format the summary of the preview generation
+        Return:
+            the report, empty when no preview was generated
+        """
+
+        if not self.preview_summary:
+            return ""
+
+        message = (f"\n\nPreviews : {self.preview_summary['converted']} generated, "
+                   f"{self.preview_summary['skipped']} up to date, {self.preview_summary['failed']} failed")
+
+        if self.preview_summary.get("cancelled"):
+            message += f", {self.preview_summary['cancelled']} cancelled"
+
+        return message
+
+    def _start_tx_conversion(self, materials_to_create):
+        """
+        Convert the textures of all the materials to create with one conversion scheduler running in a background thread
+        Args:
+            materials_to_create = list of the material names
+        """
+
+        logging.basicConfig(level=logging.INFO)
+
+        scheduler = ls_tx_converter.TxConversionScheduler(self.imaketx_path, dedupe = self.chk_dedupe.isChecked())
+
+        for material_name in materials_to_create:
+            material = self.texture_list[material_name]
+            texture_info = ls_texture_index.material_texture_info(self.folder_path, material)
+
+            # The UDIM tiles keep their own .tx files, the materials find them from the tile name
+            scheduler.add(ls_texture_index.material_texture_paths(self.folder_path, material, udim = False), 
+                          material = material_name, texture_info = texture_info)
+            scheduler.add(ls_texture_index.material_texture_paths(self.folder_path, material, udim = True), 
+                          material = material_name, texture_info = texture_info, dedupe = False)
+
+        # One step per texture and one per material
+        self.progress_bar.setMaximum(len(scheduler.textures) + len(materials_to_create))
+        self.progress_bar.setValue(0)
+
+        self.tx_thread = QtCore.QThread(self)
+        self.tx_worker = TxConversionWorker(scheduler)
+        self.tx_worker.moveToThread(self.tx_thread)
+
+        # The worker signals are queued, the slots run on the main thread where the nodes can be created
+        self.tx_thread.started.connect(self.tx_worker.run)
+        self.tx_worker.texture_converted.connect(self._on_texture_converted)
+        self.tx_worker.material_ready.connect(self._build_material)
+        self.tx_worker.finished.connect(self._on_tx_conversion_finished)
+
+        self._set_job_running(True)
+        self.tx_thread.start()
+
+    def _on_texture_converted(self, texture_path, success):
+        """
+        Move the progress bar each time a texture is done
+        """
+
+        self.progress_bar.setValue(self.progress_bar.value() + 1)
+
+    def _on_tx_conversion_finished(self, tx_summary):
+        """
+        Stop the conversion thread and report the result
+        Args:
+            tx_summary = summary returned by the conversion scheduler
+        """
+
+        self.tx_thread.quit()
+        self.tx_thread.wait()
+        self.tx_thread = None
+        self.tx_worker = None
+
+        self._set_job_running(False)
+        self._finish_materials()
+
+        message = "Material creation completed !"
+        if tx_summary.get("cancelled"):
+            message = "Material creation cancelled, only the materials with converted textures were created"
+
+        message += (f"\n\nTX conversion : {tx_summary['converted']} converted, "
+                    f"{tx_summary['skipped']} up to date, {tx_summary['deduplicated']} identical, "
+                    f"{tx_summary['failed']} failed")
+
+        if tx_summary.get("cancelled"):
+            message += f", {tx_summary['cancelled']} cancelled"
+
+        message += self._telemetry_message(tx_summary)
+        message += self._preview_report_message()
+        message += self._sync_report_message()
+
+        self._show_report(message)
+
+    def _telemetry_message(self, summary):
+        """
+        Format the metrics of a conversion job, they are written in full in the metrics file
+        Args:
+            summary = summary returned by the conversion scheduler
+        Return:
+            the report, empty when the job didn't run
+        """
+
+        if "throughput" not in summary:
+            return ""
+
+        message = (f"\nWall time : {summary['duration']} s with {summary['workers']} workers, "
+                   f"{summary['input_bytes'] / 1024 ** 2:.1f} MB in, {summary['output_bytes'] / 1024 ** 2:.1f} MB out, "
+                   f"{summary['throughput']} MB/s"
+                   f"\nPer texture : {summary['queue_wait']} s queued, {summary['run_time']} s converting on average, "
+                   f"{summary['max_run_time']} s at most")
+
+        if summary["failures"]:
+            message += "\nFailures : " + ", ".join(f"{count} {kind.replace('_', ' ')}" 
+                                                   for kind, count in summary["failures"].items())
+
+        return message
+
+    def _show_report(self, message):
+        """
+        Show the result of a job, the jobs started by the watch mode only update the watch status
+        The changes found by the watch mode while the job was running are built next
+        Args:
+            message = report of the job
+        """
+
+        if self.watch_job:
+            self.watch_job = False
+            self.lb_watch.setText(f"Updated {len(self.materials_to_create)} at {time.strftime('%H:%M:%S')}")
+            self.lb_watch.setToolTip(message)
+        else:
+            hou.ui.displayMessage(message, severity = hou.severityType.Message)
+
+        if self.watch_queue:
+            self._start_watch_job()
+
+    def _abort_job(self, message):
+        """
+        Stop a job that can't go on, the materials already built are kept and the UI is unlocked
+        The jobs started by the watch mode report the error in the watch status, the next changes start a new job
+        Args:
+            message = reason of the stop
+        """
+
+        self._set_job_running(False)
+
+        if self.output_mode == self.OUTPUT_NODES or self.materials_to_write:
+            self._finish_materials()
+
+        if self.watch_job:
+            self.watch_job = False
+            self.lb_watch.setText(f"Update failed at {time.strftime('%H:%M:%S')}")
+            self.lb_watch.setToolTip(message)
+        else:
+            hou.ui.displayMessage(message, severity = hou.severityType.Error)
+
+    def _update_watch_enabled(self):
+        """
+        The watch mode updates Houdini nodes, it needs a texture folder and a material library
+        """
+
+        can_watch = bool(self.folder_path) and self.node_lib is not None and self.cb_output.currentText() == self.OUTPUT_NODES
+        self.chk_watch.setEnabled(can_watch)
+
+        if not can_watch:
+            self.chk_watch.setChecked(False)
+
+    def on_watch(self, state):
+        """
+        Start or stop watching the texture folder
+        """
+
+        if state == QtCore.Qt.Checked:
+            self._start_watch()
+        else:
+            self._stop_watch()
+
+    def _start_watch(self):
+        """
+        Poll the texture folder in a background thread
+        """
+
+        self.watch_thread = QtCore.QThread(self)
+        self.watch_worker = FolderWatchWorker(ls_texture_watch.TextureFolderWatcher(self.folder_path))
+        self.watch_worker.moveToThread(self.watch_thread)
+
+        self.watch_thread.started.connect(self.watch_worker.start)
+        self.watch_worker.changed.connect(self._on_watch_changes)
+        self.watch_worker.failed.connect(self._on_watch_failed)
+
+        self.lb_watch.setText("Watching")
+        self.lb_watch.setToolTip(self.folder_path)
+        self.watch_thread.start()
+
+    def _stop_watch(self):
+        """
+        Stop the polling thread, the changes not built yet are dropped
+        """
+
+        if self.watch_thread:
+            self.watch_thread.quit()
+            self.watch_thread.wait()
+
+        self.watch_thread = None
+        self.watch_worker = None
+        self.watch_queue = None
+        self.lb_watch.setText("")
+
+    def _on_watch_changes(self, changes):
+        """
+        Queue the materials changed in the watched folder, they are built right away when no job is running
+        Args:
+            changes = result of ls_texture_watch.TextureFolderWatcher.poll
+        """
+
+        if changes["waiting"]:
+            self.lb_watch.setToolTip(f"Waiting for textures : {', '.join(changes['waiting'])}")
+
+        if not changes["ready"]:
+            return
+
+        # Keep the latest index, the materials of the previous changes are built with it too
+        ready = self.watch_queue["ready"] if self.watch_queue else []
+        self.watch_queue = {"index" : changes["index"], 
+                            "ready" : ready + [name for name in changes["ready"] if name not in ready]}
+
+        if not (self.tx_thread or self.preview_thread):
+            self._start_watch_job()
+
+    def _on_watch_failed(self, error):
+        """
+        Stop the watch mode when the folder can't be scanned anymore
+        """
+
+        self.chk_watch.setChecked(False)
+        hou.ui.displayMessage(f"Watch mode stopped : {error}", severity = hou.severityType.Error)
+
+    def _start_watch_job(self):
+        """
+        Update the queued materials in place with the latest index of the watched folder
+        """
+
+        changes = self.watch_queue
+        self.watch_queue = None
+
+        # The materials of the index are the ones the jobs read
+        self.texture_index = changes["index"]
+        self.texture_list = self.texture_index["materials"]
+        self.model.set_materials(self.texture_list)
+        self.filter_materials()
+
+        self.output_mode = self.OUTPUT_NODES
+        self.materials_to_write = []
+        self.sync_report = []
+        self.preview_summary = None
+        self.materials_to_create = [name for name in changes["ready"] if name in self.texture_list]
+        self.watch_job = True
+
+        self.lb_watch.setText(f"Updating {len(self.materials_to_create)} materials")
+        self._run_materials(self.materials_to_create)
+
+    def cancel_creation(self):
+        """
+        Cancel the running preview generation or TX conversion
+        """
+
+        for worker in (self.preview_worker, self.tx_worker):
+            if worker:
+                worker.cancel()
+                self.bt_cancel.setEnabled(False)
+
+    def _set_job_running(self, running):
+        """
+        Toggle the UI while a conversion job is running
+        """
+
+        self.bt_create.setEnabled(not running)
+        self.bt_open_folder.setEnabled(not running)
+        self.bt_lib.setEnabled(not running)
+        self.bt_cancel.setEnabled(running)
+
+    def closeEvent(self, event):
+        """
+        Cancel the running conversion before closing the window
+        """
+
+        self._stop_watch()
+
+        if self.preview_thread:
+            self.preview_worker.cancel()
+            self.preview_thread.quit()
+            self.preview_thread.wait()
+
+        if self.tx_thread:
+            self.tx_worker.cancel()
+            self.tx_thread.quit()
+            self.tx_thread.wait()
+
+        # The finished signals of the stopped threads are not delivered anymore
+        MtlxMaterial.release_prototype()
+
+        super().closeEvent(event)
+
+class MaterialListModel(QtCore.QAbstractListModel):
+    """
+    List model reading the materials straight from the texture index
+    The view only asks for the visible rows, the tooltips and the completeness are computed when they are needed
+    The rows are a list of material names, a row gives its material in O(1)
+    """
+
+    # Completeness filters : None keeps every material, True the complete ones, False the incomplete ones
+    COMPLETENESS_FILTERS = {
+        "All Materials" : None,
+        "Complete" : True,
+        "Missing Channels" : False
+    }
+
+    INCOMPLETE_COLOR = QtGui.QColor(150, 150, 150)
+
+    def __init__(self, parent = None):
+        super().__init__(parent)
+
+        self.texture_list = {}
+        self.material_names = []
+        self.lower_names = []
+        self.rows = []
+        self.missing = {}
+
+    def set_materials(self, texture_list):
+        """
+        Show the materials of a texture index, the filters are cleared
+        Args:
+            texture_list = materials of the texture index
+        """
+
+        self.beginResetModel()
+
+        self.texture_list = texture_list
+        self.material_names = list(texture_list)
+        self.lower_names = [material_name.lower() for material_name in self.material_names]
+        self.rows = self.material_names
+        self.missing = {}
+
+        self.endResetModel()
+
+    def set_filter(self, name_filter = "", completeness = "All Materials"):
+        """
+        Only list the materials matching the filters
+        Args:
+            name_filter = text the material names contain, case insensitive
+            completeness = key of COMPLETENESS_FILTERS
+        """
+
+        name_filter = name_filter.strip().lower()
+        complete = self.COMPLETENESS_FILTERS.get(completeness)
+
+        self.beginResetModel()
+
+        if not name_filter and complete is None:
+            self.rows = self.material_names
+        else:
+            self.rows = [material_name for material_name, lower_name in zip(self.material_names, self.lower_names)
+                         if name_filter in lower_name 
+                         and (complete is None or complete != bool(self.missing_channels(material_name)))]
+
+        self.endResetModel()
+
+    def material_name(self, row):
+        """
+        Get the material shown on a row
+        """
+
+        return self.rows[row]
+
+    def missing_channels(self, material_name):
+        """
+        Get the required channels missing from a material, computed once per material
+        """
+
+        if material_name not in self.missing:
+            self.missing[material_name] = ls_texture_index.missing_channels(self.texture_list[material_name])
+
+        return self.missing[material_name]
+
+    def rowCount(self, parent = QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+
+        return len(self.rows)
+
+    def data(self, index, role = QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        material_name = self.rows[index.row()]
+
+        if role == QtCore.Qt.DisplayRole:
+            return material_name
+
+        if role == QtCore.Qt.ToolTipRole:
+            return self._texture_tooltip(material_name)
+
+        if role == QtCore.Qt.ForegroundRole and self.missing_channels(material_name):
+            return self.INCOMPLETE_COLOR
+
+        return None
+
+    def _texture_tooltip(self, material_name):
         """
-        Get the details for the textures present in the selected folder
+        Describe the textures of a material with the details read from their header
+        Args:
+            material_name = name of the material in the texture index
+        Return:
+            one line per channel, E.g : Color : 4096x4096 RGB 8 bits, and the missing channels
         """
 
-        try:
+        lines = []
 
-            self.texture_list =  defaultdict(lambda : defaultdict(list))
-            
-            # Validate the path
-            if not os.path.exists(path):
-                raise ValueError(f"Path : '{path}' doesn't exist")
-            
-            # Get all the valid textures inside the folder
-            valid_files = []
-            folders = []
-
-            for root, dir, files in os.walk(path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    
-                    # Conditions
-                    is_file = os.path.isfile(file_path)
-                    valid_extension = file.lower().endswith(tuple(self.TEXTURE_EXT))
-                    check_underscore = "_" in file
-
-                    if is_file and valid_extension and check_underscore:
-                        folder = file_path.split(path)[1].split(file)[0]
-                        folders.append(folder)
-                        valid_files.append(file)
-
-            # Process the texture files
-            for index, file in enumerate(valid_files):
-                split_text = file.split("_")
-                material_name = split_text[0]
-
-                # Find the texture type
-                texture_type = None
-                for tex_type in self.TEXTURE_TYPE:
-                    for tex in split_text[1:]:  # [1:] take the rest after the index 0 which is the mat name
-                        if tex_type in tex.lower():
-                            texture_type = tex_type
-                            break
-                if not texture_type:
-                    continue
-                
-                # Get the UDIM and SIZE
-                udim_match = self.UDIM_PATTERN.search(file)
-                size_match = self.SIZE_PATTERN.search(file)
+        for channel, channel_data in self.texture_list[material_name].items():
+            description = (ls_texture_probe.texture_description(channel_data.info) 
+                           if channel_data.info else "unknown format")
 
-                # Update the texture list
-                self.texture_list[material_name][texture_type].append(file)
-                self.texture_list[material_name]["UDIM"] = bool(udim_match)
-                self.texture_list[material_name]["folder"] = folders[index]
+            if channel_data.udim:
+                description += f", {len(channel_data.tiles)} UDIM tiles"
 
-                if size_match:
-                    self.texture_list[material_name]["Size"] = size_match.group(1)
+            lines.append(f"{channel.replace('textures', '')} : {description}")
 
-            # Convert the defaultdict to regular dict
-            _new_dict = {}
+        missing = self.missing_channels(material_name)
+        if missing:
+            lines.append(f"Missing : {', '.join(missing)}")
 
-            for mat, tex_data in self.texture_list.items():
-                _new_dict[mat] = dict(tex_data)
+        return "\n".join(lines)
 
-            self.texture_list = _new_dict
+class FolderWatchWorker(QtCore.QObject):
+    """
+    Poll a TextureFolderWatcher from a timer of the background thread, the UI is never blocked by a scan
+    """
 
-            # Update UI
-            self.model.clear()
-            for mat in self.texture_list:
-                self.model.appendRow(QtGui.QStandardItem(mat))
-            
-            self. bt_sel_all.setEnabled(True)
-            self. bt_sel_non.setEnabled(True)
+    changed = QtCore.Signal(dict)
+    failed = QtCore.Signal(str)
 
-            return self.texture_list
+    def __init__(self, watcher):
+        super().__init__()
 
-        except Exception as e:
-            hou.ui.displayMessage(f"Error retrieving the textures details : {str(e)}", 
-                                  severity = hou.severityType.Error)
+        self.watcher = watcher
+        self.timer = None
 
-    def folder_with_texture(self, folder):
+    def start(self):
         """
-        Check if the folder contains any valid texture files
+        Start polling, called when the thread starts so the timer lives in the thread
+        """
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(int(ls_texture_watch.POLL_INTERVAL * 1000))
+        self.timer.timeout.connect(self.poll)
+        self.timer.start()
+
+        self.poll()
+
+    def poll(self):
+        """
+        Scan the folder once and report the changes ready to build
         """
 
-        if not os.path.exists(folder):
-            return False
-        
         try:
-            for root, dir, files in os.walk(folder):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                
-                    if not os.path.isfile(file_path):
-                        continue
+            changes = self.watcher.poll()
+        except (OSError, ValueError) as e:
+            self.timer.stop()
+            self.failed.emit(str(e))
+            return
 
-                    if not file.lower().endswith(tuple(self.TEXTURE_EXT)):
-                        continue
+        if changes:
+            self.changed.emit(changes)
 
-                    if "_" in file:
-                        return True 
+class TxConversionWorker(QtCore.QObject):
+    """
+    Run a TxConversionScheduler in a background thread and report its progress through Qt signals
+    """
 
-        except (OSError, PermissionError) as e:
-            hou.ui.displayMessage(
-                f"Error loading the texture folder '{folder}' : {str(e)}",
-                severity = hou.severityType.Error
-            )
+    texture_converted = QtCore.Signal(str, bool)
+    material_ready = QtCore.Signal(str)
+    finished = QtCore.Signal(dict)
 
-            return False
-        
-    def on_checkbox(self, state):
-        """
-        Check if the user asks for TX conversion
-        """
+    def __init__(self, scheduler):
+        super().__init__()
 
-        if state == QtCore.Qt.Checked:
-            self.mtlTX = True
-        else:
-            self.mtlTX = False
+        self.scheduler = scheduler
+        self.scheduler.progress_callback = self.texture_converted.emit
+        self.scheduler.material_callback = self.material_ready.emit
 
-    def select_all_materials(self):
+    def run(self):
         """
-        Select all the items present in the material list
+        Convert the textures, called when the thread starts
         """
 
-        selection_model = self.material_list.selectionModel()
+        try:
+            summary = self.scheduler.run()
+        except Exception as e:
+            ls_tx_converter.logger.error(f"TX conversion failed : {str(e)}")
+            summary = {"total" : len(self.scheduler.textures), "skipped" : 0, "converted" : 0, "deduplicated" : 0,
+                       "failed" : len(self.scheduler.textures), "cancelled" : 0}
 
-        for row in range(self.model.rowCount()):
-            index = self.model.index(row, 0)
-            selection_model.select(index, QtCore.QItemSelectionModel.Select)
+        self.finished.emit(summary)
 
-    def deselect_all_materials(self):
+    def cancel(self):
         """
-        Clear all selected item in the material list
+        Ask the scheduler to stop, can be called from the main thread
         """
 
-        self.material_list.clearSelection()
+        self.scheduler.cancel()
 
-    def create_materials(self):
-        """
-        Call the CreateMaterial class and pass all the data fetched from the user
-        """
+def get_houdini_tool_path(tool_name):
+    """
+    Get a command line tool shipped with Houdini, in $HB
+    Args:
+        tool_name = name of the tool without extension, E.g : imaketx
+    Return:
+        path of the executable, None when $HB is not set
+    """
 
-        selected_rows = self.material_list.selectedIndexes()
+    tool_file = f"{tool_name}.exe" if os.name == "nt" else tool_name
+    tool_path = None
 
-        if len(selected_rows) == 0 :
-            hou.ui.displayMessage("Please select at least one material", severity = hou.severityType.Error)
-            return
-        
-        # Set up the progress bar maximum
-        self.progress_bar.setMaximum(len(selected_rows))
-        progress_bar_default = 0
+    houdini_folder = hou.text.expandString("$HB")
 
-        # Common Data
-        common_data = {
-            "mtlTX" : self.mtlTX,
-            "path" : self.node_path,
-            "node" : self.node_lib,
-            "folder_path" : self.folder_path
-        }
+    if houdini_folder:
+        tool_path = os.path.join(houdini_folder, tool_file).replace(os.sep, "/")
+
+        if not os.path.exists(tool_path):
+            raise RuntimeError(f"{tool_name} tool not found at : {tool_path}")
 
-        for index in selected_rows:
-            row = index.row()
-            key = list(self.texture_list.keys())[row]
-            create_material = MtlxMaterial(key, **common_data, texture_list = self.texture_list)
-            create_material.create_materialx()
+    return tool_path
 
-            self.progress_bar.setValue(progress_bar_default + 1)
-            progress_bar_default += 1
+def get_imaketx_path():
+    """
+    Get the imaketx tool shipped with Houdini
+    Return:
+        path of the imaketx executable
+    """
 
-        hou.ui.displayMessage("Material creation completed !", severity = hou.severityType.Message)
+    return get_houdini_tool_path("imaketx")
+
+def get_image_tool_path():
+    """
+    Get the hoiiotool shipped with Houdini, the OpenImageIO command line tool used to resize the previews
+    Return:
+        path of the hoiiotool executable
+    """
+
+    return get_houdini_tool_path("hoiiotool")
 
 class MtlxMaterial:
+
+    # Network holding the prototype material subnet copied for each material
+    PROTOTYPE_NETWORK = "/obj/__ls_mtlx_prototypes"
+    PROTOTYPE_NAME = "mtlx_material"
+
+    # Material parameter switching the image nodes between the preview textures and the full resolution
+    RESOLUTION_PARM = "texture_resolution"
     
-    def __init__(self, mat, mtlTX, path, node, folder_path, texture_list):
+    def __init__(self, mat, mtlTX, path, node, folder_path, texture_list, convert_tx = True, use_prototype = True,
+                 preview_resolutions = None, imaketx_path = None):
         self.material_to_create = mat
+        self.preview_resolutions = preview_resolutions
         self.mtlTX = mtlTX
+        self.convert_tx = convert_tx
+        self.use_prototype = use_prototype
         self.node_path = path
         self.node_lib = node
         self.folder_path = folder_path
         self.texture_list = texture_list
 
         self.init_constants()
-        self._setup_imaketx()
+        self._setup_imaketx(imaketx_path)
 
     def init_constants(self):
-        self.TEXTURE_TYPE_SORTED = {
-            "texturesColor" : ["diffuse", "diff", "albedo", "alb", "base", "col", "color", "basecolor"],
-            "texturesMetal" : ["metallic", "metalness", "metal", "mtl", "met"],
-            "texturesSpecular" : ["specularity", "specular", "spec", "spc"],
-            "texturesRough" : ["roughness", "rough", "rgh"],
-            "texturesGloss" : ["glossiness", "glossy", "gloss"],
-            "texturesTrans" : ["transmission", "transparency", "trans"],
-            "texturesEmm" : ["emission", "emissive", "emit", "emm"],
-            "texturesAlpha" : ["alpha", "opacity", "opac"],
-            "texturesAO" : ["ao", "ambient_occlusion", "occlusion", "cavity"],
-            "texturesBump" : ["bump", "bmp", "heightmap", "height"],
-            "texturesDisp" : ["displacement", "displace", "disp", "dsp"],
-            "texturesExtra" : ["user", "mask"],
-            "texturesNormal" : ["normal", "nor", "nrm", "nrml", "norm"],
-            "texturesSSS" : ["translucency", "sss"]
+        self.TEXTURE_TYPE_SORTED = ls_texture_index.TEXTURE_ALIASES
+
+        # Channels with their own setup, see _setup_color_ao and _setup_bump_normal
+        self.DEDICATED_CHANNELS = ["texturesColor", "texturesAO", "texturesBump", "texturesNormal"]
+
+        # Nodes of each dedicated setup, the whole setup is rebuilt when one of its textures is added or removed
+        self.DEDICATED_SETUPS = {
+            "color_ao" : {
+                "channels" : ["texturesColor", "texturesAO"],
+                "nodes" : ["color", "color_CC", "ao", "ao_ADJ", "mtlxMultiply"],
+                "setup" : self._setup_color_ao
+            },
+            "bump_normal" : {
+                "channels" : ["texturesBump", "texturesNormal"],
+                "nodes" : ["bump", "normal", "mtlxBump", "mtlxNormal"],
+                "setup" : self._setup_bump_normal
+            }
         }
 
+        # Suffixes of the nodes created after a texture node by _connect_texture
+        self.HELPER_SUFFIXES = ["_ADJ", "_CC", "_CONVERSION", "_SPLIT"]
+
+        # User data storing the channel of a texture node, sync_materialx finds the texture nodes with it
+        self.CHANNEL_USER_DATA = "ls_channel"
+
         # Variables to setup the worker pool
-        self.MAX_WORKERS = os.cpu_count()
-        self.WORKER_LIMIT = max(1, int(self.MAX_WORKERS * 0.75))
+        self.MAX_WORKERS = ls_tx_converter.MAX_WORKERS
+        self.WORKER_LIMIT = ls_tx_converter.WORKER_LIMIT
 
-    def _setup_imaketx(self):
+    def _setup_imaketx(self, imaketx_path = None):
         """
-        Initialize the imaketx tool
+        Initialize the imaketx tool, it is only looked up when the material converts its own textures
+        Args:
+            imaketx_path = path of the imaketx executable already found by the caller
         """
 
-        imaketx_tool = "imaketx.exe"
-        self.imaketx_path = None
-
-        houdini_folder = hou.text.expandString("$HB")
-
-        if houdini_folder:
-            self.imaketx_path = os.path.join(houdini_folder, imaketx_tool).replace(os.sep, "/")
+        self.imaketx_path = imaketx_path
 
-            if not os.path.exists(self.imaketx_path):
-                raise RuntimeError(f"imaketx tool not found at : {self.imaketx_path}")
+        if self.mtlTX and self.convert_tx and not self.imaketx_path:
+            self.imaketx_path = get_imaketx_path()
             
     def _convert_to_tx(self, texture_paths):
         """
         Convert textures to .tx files using parallel processing with monitoring
         """
-        self.duration = 0
         if not self.mtlTX:
             return
         
         logging.basicConfig(level=logging.INFO)
-        logger = logging.getLogger("TX conversion")
-
-        def convert_single_texture(texture_path):
-
-            thread_id = threading.current_thread().ident
-            start_time = time.time()
 
-            try:
-                logger.info(f"Thread {thread_id} : Starting conversion of {os.path.basename(texture_path)}")
-
-                # Setup the outfile for the imaketx tool
-                output_path = os.path.splitext(texture_path)[0] + ".tx"
-                command = f'"{self.imaketx_path}" "{texture_path}" "{output_path}" --newer'
-                result = subprocess.run(command, shell = True, capture_output = True, text = True)
-
-                end_time = time.time()
-                duration = round(end_time - start_time, 2)
-                self.duration += duration
-
-                if result.returncode == 0:
-                    logger.info(f"Thread {thread_id} : Completed conversion of {os.path.basename(texture_path)} in {duration} seconds")
-                    return True
-                else:
-                    logger.error(f"Thread {thread_id} : Failed to convert {os.path.basename(texture_path)} in {result.stderr}")
-                    return False
-            
-            except Exception as e:
-                logger.error(f"Thread {thread_id} : Error converting {os.path.basename(texture_path)}: {str(e)}")
-                return False
-        
-        folder = self.texture_list[self.material_to_create]["folder"]
+        folder = self.texture_list[self.material_to_create].folder
         new_folder_path = self.folder_path + folder
 
-        texture_paths = [os.path.join(new_folder_path, tex) for tex in texture_paths]
-        total_textures = len(texture_paths)
-
-        completed = 0
-        failed = 0
-
-        with ThreadPoolExecutor(max_workers = self.WORKER_LIMIT) as executor:
+        scheduler = ls_tx_converter.TxConversionScheduler(self.imaketx_path, self.WORKER_LIMIT)
+        scheduler.add(os.path.join(new_folder_path, tex) for tex in texture_paths)
+        summary = scheduler.run()
 
-            # Submit all the tasks and get the futures
-            future_to_texture = {}
-
-            for path in texture_paths:
-                
-                future_to_texture[executor.submit(convert_single_texture, path)] = path
-
-            # Process completed futures as they finish
-            for future in as_completed(future_to_texture):
-
-                texture_path = future_to_texture[future]
-
-                try:
-                    if future.result():
-                        completed += 1
-                    else:
-                        failed += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing {os.path.basename(texture_path)}: {str(e)}")
-                    failed += 1
-
-                # Log progress
-                progress = ((completed + failed) / total_textures) * 100
-                logger.info(f" Progress : {progress:.1f}% ({completed + failed}/{total_textures})")
-
-        total_time = round(self.duration, 2)
-
-        logger.info(f"Conversion Complete : {total_time} seconds, successfully converted : {completed}, Failed : {failed}")
-
-        return completed > 0 and failed == 0
+        return summary["failed"] == 0
     
     def create_materialx(self):
         """
         Create the MaterialX setup
+        Return:
+            True if the material was created
         """
 
         try:
@@ -541,6 +1330,10 @@ class MtlxMaterial:
             # Create and setup the material for MaterialX
             subnet_context = self._create_material_subnet(material_lib_info)
 
+            # Add the resolution switch when the previews were generated
+            if self.preview_resolutions:
+                self._setup_resolution_parameter(subnet_context)
+
             # Create and connect the main nodes
             mtlx_standard_surface, mtlx_displacement = self._create_main_nodes(subnet_context)
 
@@ -560,7 +1353,183 @@ class MtlxMaterial:
             self._layout_nodes(subnet_context)
 
         except Exception as e:
+            # Without a UI the error is reported to the caller, E.g : the batch tool
+            if not hou.isUIAvailable():
+                raise
+
             hou.ui.displayMessage(f"Error creating MaterialX : {str(e)}", severity = hou.severityType.Error)
+            return False
+
+        return True
+
+    def sync_materialx(self):
+        """
+        Update an existing material from the texture list instead of rebuilding it
+        Only the texture nodes whose textures were added, removed or moved are touched, the other nodes keep the user tweaks
+        The material is created when it doesn't exist and rebuilt when it switches between UDIM and tiled textures
+        Return:
+            dict = {"material" : name, "status" : created, rebuilt, updated or unchanged, "added" : [channels],
+                    "removed" : [channels], "repathed" : [channels]}
+            The status is failed when the material couldn't be updated
+        """
+
+        diff = {"material" : self.material_to_create, "status" : "unchanged", "added" : [], "removed" : [], "repathed" : []}
+
+        try:
+            material_lib_info = self._prepare_material_info()
+            diff["material"] = self._get_material_name(material_lib_info)
+
+            subnet_context = self.node_lib.node(diff["material"])
+            mtlx_standard_surface = subnet_context.node(f"{self.material_to_create}_mtlxSurface") if subnet_context else None
+
+            if not mtlx_standard_surface:
+                diff["status"] = "created" if self.create_materialx() else "failed"
+                return diff
+
+            mtlx_displacement = subnet_context.node(f"{self.material_to_create}_mtlxDisplacement")
+            place2d = subnet_context.node(f"{self.material_to_create}_place2d")
+
+            if self.preview_resolutions:
+                self._setup_resolution_parameter(subnet_context)
+
+            node_type = "mtlximage" if material_lib_info.udim else "mtlxtiledimage"
+
+            # Compare the texture nodes with the texture list
+            existing_nodes = self._find_texture_nodes(subnet_context)
+
+            # The image node type and the place2d setup depend on the UDIM
+            if any(node.type().name() != node_type for node in existing_nodes.values()):
+                diff["status"] = "rebuilt" if self.create_materialx() else "failed"
+                return diff
+
+            for texture_type in self.TEXTURE_TYPE_SORTED:
+                texture_node = existing_nodes.get(texture_type)
+
+                if texture_type not in material_lib_info:
+                    if texture_node:
+                        diff["removed"].append(texture_type)
+                    continue
+
+                if not texture_node:
+                    diff["added"].append(texture_type)
+                    continue
+
+                texture_path = self._get_texture_path(texture_type, material_lib_info)
+                if texture_node.parm("file").unexpandedString() != texture_path:
+                    texture_node.parm("file").set(texture_path)
+                    diff["repathed"].append(texture_type)
+
+            changed_channels = diff["added"] + diff["removed"]
+
+            # Channels with a direct connection
+            input_names = mtlx_standard_surface.inputNames()
+
+            for texture_type in changed_channels:
+                if texture_type in self.DEDICATED_CHANNELS:
+                    continue
+
+                if texture_type in diff["removed"]:
+                    self._remove_texture_node(existing_nodes[texture_type])
+
+                    if texture_type == "texturesSSS":
+                        mtlx_standard_surface.parm("subsurface").set(0)
+                    continue
+
+                texture_info = {
+                    "name" : texture_type.replace("textures", "").lower(),
+                    "file" : material_lib_info[texture_type].file,
+                    "type" : texture_type
+                }
+
+                texture_node = self._create_textures_node(subnet_context, texture_info, material_lib_info)
+                if place2d:
+                    texture_node.setInput(2, place2d)
+
+                self._connect_texture(texture_node, texture_type, mtlx_standard_surface, mtlx_displacement, input_names,
+                                      material_lib_info[texture_type].info)
+
+            # Dedicated setups
+            for setup in self.DEDICATED_SETUPS.values():
+                if not any(texture_type in changed_channels for texture_type in setup["channels"]):
+                    continue
+
+                for node_name in setup["nodes"]:
+                    node = subnet_context.node(node_name)
+                    if node:
+                        node.destroy()
+
+                setup["setup"](subnet_context, mtlx_standard_surface, material_lib_info, place2d)
+
+            if changed_channels:
+                subnet_context.layoutChildren()
+
+            if changed_channels or diff["repathed"]:
+                diff["status"] = "updated"
+
+        except Exception as e:
+            # Without a UI the error is reported to the caller, E.g : the batch tool
+            if not hou.isUIAvailable():
+                raise
+
+            hou.ui.displayMessage(f"Error syncing MaterialX : {str(e)}", severity = hou.severityType.Error)
+            diff["status"] = "failed"
+
+        return diff
+
+    def _find_texture_nodes(self, subnet_context):
+        """
+        Find the texture nodes of a material by the channel stored on them, see _tag_texture_node
+        The nodes created before the channel was stored are found by their name
+        Args:
+            subnet_context = the material subnet
+        Return:
+            dictionnary {channel : texture node}
+        """
+
+        texture_nodes = {}
+
+        for node in subnet_context.children():
+            texture_type = node.userData(self.CHANNEL_USER_DATA)
+
+            if texture_type and texture_type not in texture_nodes:
+                texture_nodes[texture_type] = node
+
+        for texture_type in self.TEXTURE_TYPE_SORTED:
+            if texture_type in texture_nodes:
+                continue
+
+            texture_node = subnet_context.node(texture_type.replace("textures", "").lower())
+
+            if texture_node and not texture_node.userData(self.CHANNEL_USER_DATA):
+                texture_nodes[texture_type] = texture_node
+
+        return texture_nodes
+
+    def _tag_texture_node(self, texture_node, texture_type):
+        """
+        Store the channel of a texture node, so the node is found again whatever its name
+        Args:
+            texture_node = the image node
+            texture_type = the texture channel, E.g : texturesColor
+        """
+
+        texture_node.setUserData(self.CHANNEL_USER_DATA, texture_type)
+
+    def _remove_texture_node(self, texture_node):
+        """
+        Remove a texture node with the helper nodes created by its setup
+        Args:
+            texture_node = the image node to remove
+        """
+
+        subnet_context = texture_node.parent()
+
+        for suffix in self.HELPER_SUFFIXES:
+            helper_node = subnet_context.node(texture_node.name() + suffix)
+            if helper_node:
+                helper_node.destroy()
+
+        texture_node.destroy()
 
     def _prepare_material_info(self):
         """
@@ -570,14 +1539,12 @@ class MtlxMaterial:
         # Get the info for the material to be created in the material dictionnary
         material_lib_info = self.texture_list[self.material_to_create]
 
-        # TX Conversion
-        if self.mtlTX:
+        # TX Conversion, skipped when the textures were already converted for the whole job
+        if self.mtlTX and self.convert_tx:
             all_textures = []
 
-            for texture_type, texture_path in material_lib_info.items():
-                if texture_type not in ["UDIM", "SIZE"]:
-                    if isinstance(texture_path, list):
-                        all_textures.extend(texture_path)
+            for texture_data in material_lib_info.values():
+                all_textures.extend(ls_texture_index.channel_files(texture_data))
 
             self._convert_to_tx(all_textures)
 
@@ -593,29 +1560,105 @@ class MtlxMaterial:
             subnet_context = subnet MtlxMaterial to use as a context to create the material and other nodes
         """
 
-        # Add size to the name
-        material_name = (self.material_to_create + "_" + material_lib_info["Size"] 
-                         if"Size" in material_lib_info 
-                         else self.material_to_create)
+        material_name = self._get_material_name(material_lib_info)
         
         # Remove exisiting material if it exists
         existing_material = self.node_lib.node(material_name)
         if existing_material:
             existing_material.destroy()
 
-        # Create the new subnet
-        mtlx_subnet = self.node_lib.createNode("subnet", material_name)
-        subnet_context = self.node_lib.node(mtlx_subnet.name())
+        # Copy the prototype subnet, it already has the parameters and the main nodes
+        if self.use_prototype:
+            mtlx_subnet = hou.copyNodesTo([self.get_prototype()], self.node_lib)[0]
+            mtlx_subnet.setName(material_name)
+            mtlx_subnet.setMaterialFlag(True)
 
-        delete_subnet_output = subnet_context.allItems()
+            return mtlx_subnet
 
-        for index, _ in enumerate(delete_subnet_output):
-            delete_subnet_output[index].destroy()
+        # Create the new subnet
+        mtlx_subnet = self._create_empty_subnet(self.node_lib, material_name)
 
         self._setup_material_parameters(mtlx_subnet)
         mtlx_subnet.setMaterialFlag(True)
 
-        return subnet_context
+        return mtlx_subnet
+
+    def _get_material_name(self, material_lib_info):
+        """
+        Get the name of the material subnet, the texture size is added when it is known
+        Args:
+            material_lib_info = this is the dictionnary with the information about the material to create
+        Return:
+            name of the subnet
+        """
+
+        # Add size to the name
+        if material_lib_info.size:
+            return self.material_to_create + "_" + material_lib_info.size
+
+        return self.material_to_create
+
+    def _create_empty_subnet(self, parent, name):
+        """
+        Create a subnet without the default input and output nodes
+        Args:
+            parent = where to create the subnet
+            name = name of the subnet
+        Return:
+            the subnet node
+        """
+
+        mtlx_subnet = parent.createNode("subnet", name)
+
+        for item in mtlx_subnet.allItems():
+            item.destroy()
+
+        return mtlx_subnet
+
+    @classmethod
+    def get_prototype(cls):
+        """
+        Get the prototype material subnet, it is built the first time a material is created
+        The prototype contains the material parameters, the standard surface, the displacement and the output connectors
+        It is built outside of the undo history, undoing the tool must not bring it back once released
+        Return:
+            the prototype subnet node
+        """
+
+        prototype = hou.node(f"{cls.PROTOTYPE_NETWORK}/{cls.PROTOTYPE_NAME}")
+
+        if prototype:
+            return prototype
+
+        with hou.undos.disabler():
+            network = hou.node(cls.PROTOTYPE_NETWORK)
+            if not network:
+                network_path, network_name = cls.PROTOTYPE_NETWORK.rsplit("/", 1)
+                network = hou.node(network_path).createNode("matnet", network_name)
+                network.hide(True)
+
+            # Build the prototype with the node by node path
+            builder = cls.__new__(cls)
+            builder.material_to_create = ""
+            builder.use_prototype = False
+
+            prototype = builder._create_empty_subnet(network, cls.PROTOTYPE_NAME)
+            builder._setup_material_parameters(prototype)
+            builder._create_main_nodes(prototype)
+
+        return prototype
+
+    @classmethod
+    def release_prototype(cls):
+        """
+        Delete the prototype network, to call once all the materials of a job are created, even when the job failed
+        """
+
+        network = hou.node(cls.PROTOTYPE_NETWORK)
+
+        if network:
+            with hou.undos.disabler():
+                network.destroy()
 
     def _setup_material_parameters(self, mtlx_subnet):
         """
@@ -670,6 +1713,28 @@ class MtlxMaterial:
 
         return mtlx_subnet
 
+    def _setup_resolution_parameter(self, mtlx_subnet):
+        """
+        Add the texture resolution menu to a material subnet, the menu of an existing material is updated
+        Args :
+            mtlx_subnet = material subnet
+        """
+
+        resolutions = [resolution for resolution in ls_texture_preview.PREVIEW_RESOLUTIONS 
+                       if resolution in self.preview_resolutions]
+
+        hou_parm_template = hou.StringParmTemplate(self.RESOLUTION_PARM, "Texture Resolution", 1, default_value=([ls_texture_preview.FULL_RESOLUTION]), naming_scheme=hou.parmNamingScheme.Base1, string_type=hou.stringParmType.Regular, menu_items=([ls_texture_preview.FULL_RESOLUTION] + resolutions), menu_labels=(["Full Resolution"] + [f"{resolution.upper()} Preview" for resolution in resolutions]), icon_names=([]), item_generator_script="", item_generator_script_language=hou.scriptLanguage.Python, menu_type=hou.menuType.Normal)
+        hou_parm_template.setTags({"sidefx::shader_isparm": "0"})
+
+        hou_parm_template_group = mtlx_subnet.parmTemplateGroup()
+
+        if hou_parm_template_group.find(self.RESOLUTION_PARM):
+            hou_parm_template_group.replace(self.RESOLUTION_PARM, hou_parm_template)
+        else:
+            hou_parm_template_group.append(hou_parm_template)
+
+        mtlx_subnet.setParmTemplateGroup(hou_parm_template_group)
+
     def _create_main_nodes(self,subnet_context):
         """
         Create and connect eh main material nodes
@@ -679,9 +1744,21 @@ class MtlxMaterial:
             tuple = node for standar surface and for the displacement
         """
 
+        surface_name = self.material_to_create + "_mtlxSurface"
+        displacement_name = self.material_to_create + "_mtlxDisplacement"
+
+        # The nodes copied from the prototype only need to be renamed
+        if self.use_prototype and subnet_context.node("_mtlxSurface"):
+            mtlx_standard_surf = subnet_context.node("_mtlxSurface")
+            mtlx_displacement = subnet_context.node("_mtlxDisplacement")
+            mtlx_standard_surf.setName(surface_name)
+            mtlx_displacement.setName(displacement_name)
+
+            return mtlx_standard_surf, mtlx_displacement
+
         # Create the main nodes
-        mtlx_standard_surf = subnet_context.createNode("mtlxstandard_surface", self.material_to_create + "_mtlxSurface")
-        mtlx_displacement = subnet_context.createNode("mtlxdisplacement", self.material_to_create + "_mtlxDisplacement")
+        mtlx_standard_surf = subnet_context.createNode("mtlxstandard_surface", surface_name)
+        mtlx_displacement = subnet_context.createNode("mtlxdisplacement", displacement_name)
         mtlx_displacement.parm("scale").set(0.1)
 
         # Create the output node
@@ -723,7 +1800,7 @@ class MtlxMaterial:
             material_lib_info = texture details
         """
 
-        if not material_lib_info.get("UDIM", True):
+        if not material_lib_info.udim:
             nodes = {
                 "coord" : subnet_context.createNode("mtlxtexcoord", f"{self.material_to_create}_texcoord"),
                 "scale" : subnet_context.createNode("mtlxconstant", f"{self.material_to_create}_scale"),
@@ -762,79 +1839,85 @@ class MtlxMaterial:
             # Create and setup the texture node
             texture_node = self._create_textures_node(subnet_context, texture_info, material_lib_info)
 
-            if place2d and not material_lib_info.get("UDIM", True):
+            if place2d and not material_lib_info.udim:
                 texture_node.setInput(2, place2d)
 
             # Connect textures based on type
-            self._connect_texture(texture_node, texture_type, mtlx_standard_surface, mtlx_displacement, input_names)
+            self._connect_texture(texture_node, texture_type, mtlx_standard_surface, mtlx_displacement, input_names,
+                                  material_lib_info[texture_type].info)
 
     def _iterate_textures(self, material_lib_info):
         """
-        Iterator for processing textures based on their type and ignore the skip keys
+        Iterator for processing textures based on their type, the dedicated channels have their own setup
         """
-        skip_keys = ["UDIM", "Size", 
-                     "bump", "bmp", "height", "heightmap"
-                     "normal", "nor", "nrm", "nrml", "norm", 
-                     "ao", "ambient_occlusion", "occlusion", "cavity",
-                     "diffuse", "diff", "albedo", "alb", "base", "col", "color", "basecolor"
-                    ]
 
-        for texture in material_lib_info:
-            if texture in skip_keys:
+        for texture_type in material_lib_info:
+            if texture_type in self.DEDICATED_CHANNELS:
                 continue
 
-            for texture_type, variants in self.TEXTURE_TYPE_SORTED.items():
+            texture_info = {
+                "name" : texture_type.replace("textures", "").lower(),
+                "file" : material_lib_info[texture_type].file,
+                "type" : texture_type
+            }
 
-                if any(variant in texture.lower() for variant in variants):
-                    texture_info = {
-                        "name" : texture,
-                        "file" : material_lib_info[texture][0],
-                        "type" :texture_type
-                    }
-                    
-                    yield texture_type, texture_info
+            yield texture_type, texture_info
 
     def _create_textures_node(self, subnet_context, texture_info, material_lib_info):
         """
         Create and setup a texture node based on its type
         """
         # Check the node type based on the UDIM
-        node_type = "mtlximage" if material_lib_info.get("UDIM", False) else "mtlxtiledimage"
+        node_type = "mtlximage" if material_lib_info.udim else "mtlxtiledimage"
 
         # Create the node
         texture_node = subnet_context.createNode(node_type, texture_info["name"])
+        self._tag_texture_node(texture_node, texture_info["type"])
 
         # Setup base texture path
-        texture_path = self._get_texture_path(texture_info["name"], material_lib_info)
+        texture_path = self._get_texture_path(texture_info["type"], material_lib_info)
         texture_node.parm("file").set(texture_path)
 
         # Configure node based on the texture type
-        self._configure_texture_node(texture_node, texture_info["type"])
+        self._configure_texture_node(texture_node, texture_info["type"], material_lib_info[texture_info["type"]].info)
 
         return texture_node
 
-    def _get_texture_path(self, texture_name, material_lib_info):
+    def _get_texture_path(self, texture_type, material_lib_info):
         """
         Get the full path for the texture, handling the TX conversion if needed
         Args:
-            texture_name : texture's name
+            texture_type : texture's channel, E.g : texturesColor
             material_lib_info : the dictionnary with the textures for the material to create
         Return :
             path : self.folder_path + texture_value
         """
         
-        texture_value = material_lib_info[texture_name][0]
-        folder_value  = material_lib_info["folder"]
-        
+        # UDIM textures are stored with the <UDIM> token in place of the tile number
+        texture_value = material_lib_info[texture_type].file
+        folder_value  = material_lib_info.folder
+
+        texture_path = f"{self.folder_path}{folder_value}{texture_value}"
 
+        # The .tx file can be in the central TX cache, or shared with an identical texture
         if self.mtlTX:
-            base_name = texture_value.split(".")[0]
-            texture_value = f"{base_name}.tx"
+            texture_path = material_lib_info[texture_type].tx_path or ls_tx_converter.tx_output_path(texture_path)
 
-        texture_path = f"{self.folder_path}{folder_value}{texture_value}"
+        texture_path = self._job_relative_path(texture_path)
+
+        # Switch to the previews smaller than the texture from the resolution parameter of the material
+        if self.preview_resolutions:
+            previews = ls_texture_preview.channel_previews(self.folder_path, material_lib_info, texture_type, 
+                                                           self.preview_resolutions)
+            if previews:
+                return self._resolution_expression(texture_path, previews)
+
+        return texture_path
 
-        if material_lib_info.get("UDIM", False):
-            texture_path = re.sub(r"\d{4}", "<UDIM>", texture_path)
+    def _job_relative_path(self, texture_path):
+        """
+        Replace the start of a path with $JOB when the path is inside the job folder
+        """
 
         env_var = hou.text.expandString("$JOB")
         if texture_path.startswith(env_var):
@@ -842,28 +1925,47 @@ class MtlxMaterial:
 
         return texture_path
 
-    def _configure_texture_node(self, node, texture_type):
+    def _resolution_expression(self, texture_path, previews):
+        """
+        Build the file expression picking a texture from the resolution parameter of the material
+        Args:
+            texture_path = full resolution texture path
+            previews = dictionnary {resolution name : preview path}
+        Return:
+            backtick expression, E.g : `ifs(strcmp(chs("../texture_resolution"), "1k") == 0, "1k path", "full path")`
+        """
+
+        expression = f'"{texture_path}"'
+
+        for resolution, path in previews.items():
+            expression = (f'ifs(strcmp(chs("../{self.RESOLUTION_PARM}"), "{resolution}") == 0, '
+                          f'"{self._job_relative_path(path)}", {expression})')
+
+        return f"`{expression}`"
+
+    def _configure_texture_node(self, node, texture_type, texture_details = None):
         """
         Configure a texture node based on its type
         Args:
             node : image node we want to change
             texture_type : value that defines if we are working with color or raw data
+            texture_details : image details read from the texture header, refine the signature and the colorspace
         """
 
         # Default config
         signature = "float"
-        colorspace = "raw"
 
-        if texture_type in ["texturesColor", "texturesSSS"]:
+        if texture_type in ls_texture_probe.COLOR_CHANNELS:
             signature = "color3"
-            colorspace = "srgb_texture"         
         
-        node.parm("signature").set(signature)
-        node.parm("filecolorspace").set(colorspace)
+        node.parm("signature").set(ls_texture_probe.texture_signature(texture_type, signature, texture_details))
+        node.parm("filecolorspace").set(ls_texture_probe.texture_colorspace(texture_type, texture_details))
 
-    def _connect_texture(self, texture_node, texture_type, mtlx_standard_surface, mtlx_displacement, input_names):
+    def _connect_texture(self, texture_node, texture_type, mtlx_standard_surface, mtlx_displacement, input_names,
+                         texture_details = None):
         """
         Connect a texture node to the material based on its type
+        texture_details are the image details of the texture, None when the texture wasn't probed
         """
 
         connection_map = {
@@ -909,7 +2011,7 @@ class MtlxMaterial:
             self._setup_displacement_texture(texture_node, mtlx_displacement)
 
         if texture_type =="texturesExtra":
-            self._setup_mask_texture(texture_node)
+            self._setup_mask_texture(texture_node, texture_details)
 
     def _setup_color_texture(self, texture_node, mtlx_standard_surface, input_index):
         """
@@ -981,11 +2083,15 @@ class MtlxMaterial:
 
         mtlx_standard_surface.setInput(input_index, convert_node)   
 
-    def _setup_mask_texture(self, texture_node):
+    def _setup_mask_texture(self, texture_node, texture_details = None):
         """
         Setup for user or mask texture
         """
 
+        # Single channel masks are used as they are, the split is kept when the texture wasn't probed
+        if texture_details and texture_node.parm("signature").eval() != "color3":
+            return
+
         separate_node = texture_node.parent().createNode("mtlxseparate3c", texture_node.name()+"_SPLIT")
         separate_node.setInput(0, texture_node)
 
@@ -995,7 +2101,7 @@ class MtlxMaterial:
         """
 
         # Create mtlX Image based on use of UDIM
-        node_type = "mtlximage" if material_lib_info.get("UDIM", False) else "mtlxtiledimage"
+        node_type = "mtlximage" if material_lib_info.udim else "mtlxtiledimage"
 
         def _create_bump():
             """
@@ -1004,12 +2110,13 @@ class MtlxMaterial:
             
             bump_node = subnet_context.createNode("mtlxbump", "mtlxBump")
             bump_image = subnet_context.createNode(node_type, "bump")
+            self._tag_texture_node(bump_image, "texturesBump")
             bump_image.parm("signature").set("float")
             bump_image.parm("filecolorspace").set("raw")
             bump_path = self._get_texture_path(bump_normal_data["bump"], material_lib_info)
             bump_image.parm("file").set(bump_path)
 
-            if place2d and not material_lib_info.get("UDIM", True):
+            if place2d and not material_lib_info.udim:
                 bump_image.setInput(2, place2d)
 
             bump_node.setInput(0, bump_image)
@@ -1023,12 +2130,13 @@ class MtlxMaterial:
             
             normal_node = subnet_context.createNode("mtlxnormalmap", "mtlxNormal")
             normal_image = subnet_context.createNode(node_type, "normal")
+            self._tag_texture_node(normal_image, "texturesNormal")
             normal_image.parm("signature").set("vector3")
             normal_image.parm("filecolorspace").set("raw")
             normal_path = self._get_texture_path(bump_normal_data["normal"], material_lib_info)
             normal_image.parm("file").set(normal_path)
 
-            if place2d and not material_lib_info.get("UDIM", True):
+            if place2d and not material_lib_info.udim:
                 normal_image.setInput(2, place2d)
 
             normal_node.setInput(0, normal_image)
@@ -1067,30 +2175,18 @@ class MtlxMaterial:
         Return:
             dictionnary with bump and normal values
         """
-        texture_type_sorted = {
-            "texturesBump" : ["bump", "bmp", "height", "heightmap"],
-            "texturesNormal" : ["normal", "nor", "nrm", "nrml", "norm"]   
-        }
 
-        result = {
-            "bump" : None,
-            "normal" : None
+        return {
+            "bump" : "texturesBump" if "texturesBump" in material_lib_info else None,
+            "normal" : "texturesNormal" if "texturesNormal" in material_lib_info else None
         }
-
-        for texture in material_lib_info:
-            for texture_name, texture_value in texture_type_sorted.items():
-                if texture in texture_value:
-                    key = "bump" if texture_name == "texturesBump" else "normal"
-                    result[key] = texture
-
-        return result
     
     def _setup_color_ao(self, subnet_context, mtlx_standard_surface, material_lib_info, place2d):
         """
         Create and setup color and ao nodes
         """
         # Create mtlX Image based on use of UDIM
-        node_type = "mtlximage" if material_lib_info.get("UDIM", False) else "mtlxtiledimage"
+        node_type = "mtlximage" if material_lib_info.udim else "mtlxtiledimage"
 
         def _create_color():
             """
@@ -1099,12 +2195,14 @@ class MtlxMaterial:
             
             range_node = subnet_context.createNode("mtlxrange", "color_CC")
             color_image = subnet_context.createNode(node_type, "color")
+            self._tag_texture_node(color_image, "texturesColor")
             color_image.parm("signature").set("color3")
-            color_image.parm("filecolorspace").set("srgb_texture")
+            color_image.parm("filecolorspace").set(
+                ls_texture_probe.texture_colorspace("texturesColor", material_lib_info["texturesColor"].info))
             color_path = self._get_texture_path(color_data["color"], material_lib_info)
             color_image.parm("file").set(color_path)
 
-            if place2d and not material_lib_info.get("UDIM", True):
+            if place2d and not material_lib_info.udim:
                 color_image.setInput(2, place2d)
 
             range_node.setInput(0, color_image)
@@ -1119,12 +2217,13 @@ class MtlxMaterial:
             mult_node = subnet_context.createNode("mtlxmultiply", "mtlxMultiply")
             adjust_node = subnet_context.createNode("mtlxrange", "ao_ADJ")
             ao_image = subnet_context.createNode(node_type, "ao")
+            self._tag_texture_node(ao_image, "texturesAO")
             ao_image.parm("signature").set("float")
             ao_image.parm("filecolorspace").set("raw")
             ao_path = self._get_texture_path(color_data["ao"], material_lib_info)
             ao_image.parm("file").set(ao_path)
 
-            if place2d and not material_lib_info.get("UDIM", True):
+            if place2d and not material_lib_info.udim:
                 ao_image.setInput(2, place2d)
 
             adjust_node.setInput(0,ao_image)
@@ -1160,23 +2259,10 @@ class MtlxMaterial:
             dictionnary with ao value
         """
 
-        texture_type_sorted = {
-            "texturesColor" : ["diffuse", "diff", "albedo", "alb", "base", "col", "color", "basecolor"],
-            "texturesAO" : ["ao", "ambient_occlusion", "occlusion", "cavity"]  
+        return {
+            "color" : "texturesColor" if "texturesColor" in material_lib_info else None,
+            "ao" : "texturesAO" if "texturesAO" in material_lib_info else None
         }
-
-        result = {
-            "color" : None,
-            "ao" : None
-        }
-
-        for texture in material_lib_info:
-            for texture_name, texture_value in texture_type_sorted.items():
-                if texture in texture_value:
-                    key = "ao" if texture_name == "texturesAO" else "color"
-                    result[key] = texture
-
-        return result
     
     def _layout_nodes(self, subnet_context):
         """
@@ -0,0 +1,352 @@
+"""
+Build the MaterialX materials of a whole texture library without the TexToMtlX window
+Every sub folder of the root is an asset, the assets are built in parallel in separate processes
+The textures are converted to TX first with a single conversion scheduler, an asset is built as soon as its textures are ready
+Prints a JSON summary and exits with 1 when an asset failed
+
+Usage:
+    hython scripts/python/tools/ls_tex_to_mtlx_batch.py /library --output /library_materials --format usd --tx
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+from modules import ls_texture_index
+from modules import ls_tx_converter
+
+OUTPUT_FORMATS = ("usd", "hip")
+DEFAULT_MATERIAL_ROOT = "/ASSET/mtl"
+
+def find_assets(root):
+    """
+    List the asset folders of a texture library
+    Args:
+        root = the library folder, each sub folder being an asset
+    Return:
+        sorted list of (asset name, asset texture folder)
+    """
+
+    with os.scandir(root) as entries:
+        assets = [(entry.name, os.path.join(root, entry.name, "").replace(os.sep, "/"))
+                  for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+
+    return sorted(assets)
+
+def find_imaketx():
+    """
+    Get the imaketx tool shipped with Houdini without the hou module
+    Return:
+        path of the imaketx executable or None
+    """
+
+    imaketx_tool = "imaketx.exe" if os.name == "nt" else "imaketx"
+    houdini_folder = os.environ.get("HB")
+
+    if houdini_folder and os.path.exists(os.path.join(houdini_folder, imaketx_tool)):
+        return os.path.join(houdini_folder, imaketx_tool).replace(os.sep, "/")
+
+    return None
+
+def asset_output_path(output, asset_name, output_format):
+    """
+    Get the file written for an asset
+    """
+
+    extension = "usda" if output_format == "usd" else "hip"
+
+    return os.path.join(output, asset_name, f"{asset_name}_materials.{extension}").replace(os.sep, "/")
+
+def build_asset(asset_name, folder, output_path, output_format, use_tx = False, material_root = DEFAULT_MATERIAL_ROOT,
+                tx_outputs = None):
+    """
+    Build the materials of one asset, runs inside a worker process
+    Args:
+        asset_name = name of the asset
+        folder = texture folder of the asset
+        output_path = .usda or .hip file to write
+        output_format = usd or hip
+        use_tx = point at the .tx files, they must be converted already
+        material_root = scope of the materials in the USD layer
+        tx_outputs = dictionnary {texture path : .tx path} of the textures sharing the .tx of an identical texture
+    Return:
+        amount of materials built
+    """
+
+    texture_list = ls_texture_index.build_texture_index(folder, probe = True)["materials"]
+
+    if not texture_list:
+        raise ValueError(f"No valid texture set found in {folder}")
+
+    if tx_outputs:
+        for material in texture_list.values():
+            ls_texture_index.apply_tx_outputs(folder, material, tx_outputs)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok = True)
+
+    if output_format == "usd":
+        from modules import ls_usd_material_writer
+
+        ls_usd_material_writer.write_material_layer(output_path, texture_list, folder, material_root = material_root,
+                                                    use_tx = use_tx)
+        return len(texture_list)
+
+    import hou
+    from modules import ls_node_batch
+    from tools import ls_tex_to_mtlx
+
+    hou.hipFile.clear(suppress_save_prompt = True)
+
+    material_library = hou.node("/stage").createNode("materiallibrary", f"{asset_name}_mtl")
+    material_library.parm("matpathprefix").set(material_root.rstrip("/") + "/")
+
+    common_data = {
+        "mtlTX" : use_tx,
+        "path" : material_library.path(),
+        "node" : material_library,
+        "folder_path" : folder
+    }
+
+    try:
+        with ls_node_batch.node_build_batch("Create MaterialX"):
+            for material_name in texture_list:
+                material = ls_tex_to_mtlx.MtlxMaterial(material_name, **common_data, texture_list = texture_list, 
+                                                       convert_tx = False)
+                material.create_materialx()
+
+    finally:
+        # The prototype network must not be saved with the scene
+        ls_tex_to_mtlx.MtlxMaterial.release_prototype()
+
+    hou.hipFile.save(output_path)
+
+    return len(texture_list)
+
+def run_worker(args):
+    """
+    Entry point of a worker process, the result is written as JSON in the result file
+    """
+
+    start_time = time.time()
+    result = {"asset" : args.asset, "output" : args.output_file}
+
+    try:
+        tx_outputs = None
+        if args.tx_outputs:
+            with open(args.tx_outputs, "r") as tx_outputs_file:
+                tx_outputs = json.load(tx_outputs_file)
+
+        result["materials"] = build_asset(args.asset, args.folder, args.output_file, args.format, args.tx, 
+                                          args.material_root, tx_outputs)
+        result["status"] = "ok"
+
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {str(e)}"
+
+    result["duration"] = round(time.time() - start_time, 2)
+
+    with open(args.result_file, "w") as result_file:
+        json.dump(result, result_file)
+
+    return 0 if result["status"] == "ok" else 1
+
+def launch_worker(asset_name, folder, args, tx_outputs = None):
+    """
+    Build an asset in a new process, with the same interpreter as the batch (hython for the .hip output)
+    Args:
+        tx_outputs = shared .tx files of the asset textures, see build_asset
+    Return:
+        result of the asset, see run_worker
+    """
+
+    output_file = asset_output_path(args.output, asset_name, args.format)
+    result_handle, result_path = tempfile.mkstemp(prefix = "ls_mtlx_batch_", suffix = ".json")
+    os.close(result_handle)
+    temp_paths = [result_path]
+
+    command = [sys.executable, os.path.abspath(__file__), "--worker",
+               "--asset", asset_name, "--folder", folder, "--output-file", output_file, "--result-file", result_path,
+               "--format", args.format, "--material-root", args.material_root]
+
+    if args.tx:
+        command.append("--tx")
+
+    if tx_outputs:
+        tx_outputs_handle, tx_outputs_path = tempfile.mkstemp(prefix = "ls_mtlx_batch_tx_", suffix = ".json")
+        with os.fdopen(tx_outputs_handle, "w") as tx_outputs_file:
+            json.dump(tx_outputs, tx_outputs_file)
+
+        command.extend(["--tx-outputs", tx_outputs_path])
+        temp_paths.append(tx_outputs_path)
+
+    try:
+        process = subprocess.run(command, capture_output = True, text = True)
+
+        try:
+            with open(result_path, "r") as result_file:
+                return json.load(result_file)
+
+        except (OSError, ValueError):
+            # The worker died before writing its result
+            error = (process.stderr or process.stdout).strip().splitlines()
+            return {"asset" : asset_name, "status" : "failed", "output" : output_file,
+                    "error" : error[-1] if error else f"Worker exited with code {process.returncode}"}
+
+    finally:
+        for temp_path in temp_paths:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+def run_batch(args):
+    """
+    Convert the textures and build every asset of the library
+    Return:
+        dict = summary of the batch
+    """
+
+    start_time = time.time()
+
+    assets = find_assets(args.root)
+    if args.assets:
+        assets = [asset for asset in assets if asset[0] in args.assets]
+
+    results = {}
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers = args.workers)
+
+    def submit(asset_name, tx_outputs = None):
+        futures[asset_name] = executor.submit(launch_worker, asset_name, asset_folders[asset_name], args, tx_outputs)
+
+    asset_folders = dict(assets)
+    tx_summary = None
+
+    try:
+        if not args.tx:
+            for asset_name in asset_folders:
+                submit(asset_name)
+
+        else:
+            scheduler = ls_tx_converter.TxConversionScheduler(args.imaketx, max_workers = args.tx_workers, 
+                                                              dedupe = args.dedupe)
+            asset_textures = {}
+
+            for asset_name, folder in assets:
+                try:
+                    materials = ls_texture_index.build_texture_index(folder, probe = True)["materials"]
+                except (OSError, ValueError) as e:
+                    results[asset_name] = {"asset" : asset_name, "status" : "failed", "error" : str(e)}
+                    continue
+
+                if not materials:
+                    results[asset_name] = {"asset" : asset_name, "status" : "failed", 
+                                           "error" : f"No valid texture set found in {folder}"}
+                    continue
+
+                asset_textures[asset_name] = []
+
+                for material in materials.values():
+                    texture_info = ls_texture_index.material_texture_info(folder, material)
+
+                    # The UDIM tiles keep their own .tx files, the materials find them from the tile name
+                    for udim in (False, True):
+                        texture_paths = ls_texture_index.material_texture_paths(folder, material, udim = udim)
+                        asset_textures[asset_name].extend(texture_paths)
+                        scheduler.add(texture_paths, material = asset_name, texture_info = texture_info, dedupe = not udim)
+
+            def asset_ready(asset_name):
+                # Called by the scheduler run loop once all the textures of the asset are done
+                failed = [path for path in asset_textures[asset_name] if not scheduler.results.get(path)]
+
+                if failed:
+                    results[asset_name] = {"asset" : asset_name, "status" : "failed",
+                                           "error" : f"{len(failed)} textures failed the TX conversion"}
+                    return
+
+                # Only the textures using the .tx of an identical texture are sent to the worker
+                tx_outputs = {path : scheduler.tx_outputs[path] for path in asset_textures[asset_name]
+                              if scheduler.tx_outputs.get(path, ls_tx_converter.tx_output_path(path)) 
+                              != ls_tx_converter.tx_output_path(path)}
+
+                submit(asset_name, tx_outputs)
+
+            scheduler.material_callback = asset_ready
+            tx_summary = scheduler.run()
+
+        for asset_name, future in list(futures.items()):
+            results[asset_name] = future.result()
+
+    finally:
+        executor.shutdown(wait = True)
+
+    asset_results = [results[asset_name] for asset_name, _ in assets if asset_name in results]
+
+    return {
+        "root" : args.root,
+        "format" : args.format,
+        "assets" : asset_results,
+        "succeeded" : sum(result["status"] == "ok" for result in asset_results),
+        "failed" : sum(result["status"] != "ok" for result in asset_results),
+        "materials" : sum(result.get("materials", 0) for result in asset_results),
+        "tx" : tx_summary,
+        "duration" : round(time.time() - start_time, 2)
+    }
+
+def parse_args(argv = None):
+    parser = argparse.ArgumentParser(description = "Build the MaterialX materials of a texture library")
+    parser.add_argument("root", nargs = "?", help = "library folder, each sub folder is an asset")
+    parser.add_argument("--output", help = "folder receiving one sub folder per asset, the library folder by default")
+    parser.add_argument("--format", choices = OUTPUT_FORMATS, default = "usd")
+    parser.add_argument("--assets", nargs = "*", help = "only build these assets")
+    parser.add_argument("--workers", type = int, default = max(1, (os.cpu_count() or 1) // 4),
+                        help = "amount of assets built at the same time")
+    parser.add_argument("--tx", action = "store_true", help = "convert the textures to TX and use them in the materials")
+    parser.add_argument("--tx-workers", type = int, default = ls_tx_converter.WORKER_LIMIT)
+    parser.add_argument("--dedupe", action = "store_true", help = "convert the byte identical textures only once")
+    parser.add_argument("--imaketx", default = find_imaketx())
+    parser.add_argument("--material-root", default = DEFAULT_MATERIAL_ROOT)
+
+    # Worker process arguments
+    parser.add_argument("--worker", action = "store_true", help = argparse.SUPPRESS)
+    parser.add_argument("--asset", help = argparse.SUPPRESS)
+    parser.add_argument("--folder", help = argparse.SUPPRESS)
+    parser.add_argument("--output-file", help = argparse.SUPPRESS)
+    parser.add_argument("--result-file", help = argparse.SUPPRESS)
+    parser.add_argument("--tx-outputs", help = argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+
+    if not args.worker:
+        if not args.root or not os.path.isdir(args.root):
+            parser.error(f"Library folder not found : {args.root}")
+
+        if args.tx and not args.imaketx:
+            parser.error("imaketx not found, run with hython or give --imaketx")
+
+        if args.workers < 1:
+            parser.error("--workers must be at least 1")
+
+        args.output = args.output or args.root
+
+    return args
+
+def main(argv = None):
+    args = parse_args(argv)
+
+    if args.worker:
+        return run_worker(args)
+
+    summary = run_batch(args)
+    print(json.dumps(summary, indent = 2))
+
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())